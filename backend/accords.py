@@ -0,0 +1,87 @@
+import ast
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+def parse_accords(value):
+    """Accord names from a 'Main Accords' cell: a list literal, a comma-separated string or a list"""
+    if isinstance(value, (list, tuple)):
+        accords = value
+    elif not isinstance(value, str) or not value:
+        return []
+    elif value.startswith('['):
+        try:
+            accords = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            accords = value.strip('[]').replace("'", "").split(',')
+    else:
+        accords = value.split(',')
+    return [str(a).strip() for a in accords if str(a).strip()]
+
+
+class AccordIndex:
+    """Accord vocabulary and sparse item x accord incidence matrix.
+
+    `counts` keeps accord names as written in the dataset (how often each
+    appears in an item's list); `folded` is binary over lowercased names.
+    Scoring a set of desired accords for every item is one mat-vec product.
+    """
+
+    def __init__(self, counts, vocabulary):
+        self.counts = csr_matrix(counts)
+        self.vocabulary = {accord: column for column, accord in enumerate(vocabulary)}
+
+        self.folded_vocabulary = {}
+        fold = np.array([self.folded_vocabulary.setdefault(accord.lower(), len(self.folded_vocabulary))
+                         for accord in vocabulary], dtype=np.int64)
+        coo = self.counts.tocoo()
+        folded = csr_matrix((np.ones(coo.nnz, dtype=np.int32), (coo.row, fold[coo.col])),
+                            shape=(self.counts.shape[0], len(self.folded_vocabulary)))
+        folded.data[:] = 1
+        self.folded = folded
+
+    @classmethod
+    def from_lists(cls, accord_lists):
+        """Build from one list of accord names per item"""
+        vocabulary = {}
+        rows, cols = [], []
+        for row, accords in enumerate(accord_lists):
+            for accord in accords:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(accord, len(vocabulary)))
+        # Duplicate (row, accord) pairs are summed into counts
+        counts = csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                            shape=(len(accord_lists), len(vocabulary)))
+        return cls(counts, list(vocabulary))
+
+    @classmethod
+    def from_series(cls, accords):
+        """Build from a 'Main Accords' column, parsing every cell once"""
+        return cls.from_lists([parse_accords(value) for value in accords])
+
+    def __len__(self):
+        return self.counts.shape[0]
+
+    def match_counts(self, desired):
+        """Per item, how many of its accords are in `desired` (exact names)"""
+        weights = np.zeros(len(self.vocabulary), dtype=np.int32)
+        for accord in set(desired):
+            if accord in self.vocabulary:
+                weights[self.vocabulary[accord]] = 1
+        return self.counts @ weights
+
+    def has_accord(self, accord):
+        """Per item, whether its accord list contains `accord` (exact name)"""
+        column = self.vocabulary.get(accord)
+        if column is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.counts[:, column].toarray().ravel() > 0
+
+    def desired_matches(self, desired):
+        """Per item, how many entries of `desired` it has, ignoring case"""
+        weights = np.zeros(len(self.folded_vocabulary), dtype=np.int32)
+        for accord in desired:
+            column = self.folded_vocabulary.get(str(accord).lower())
+            if column is not None:
+                weights[column] += 1
+        return self.folded @ weights
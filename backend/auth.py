@@ -1,6 +1,6 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, g
 from models import db, User
-import bcrypt
+from passwords import get_password_hasher, PasswordHasherBusy
 from functools import wraps
 
 # Create a Blueprint for authentication routes
@@ -15,11 +15,27 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-# Get current user from session
+@auth_bp.before_app_request
+def forget_current_user():
+    # g outlives the request when an app context was already pushed
+    g.pop('current_user', None)
+
+# Get current user's ID from session, without touching the database
+def get_current_user_id():
+    return session.get('user_id')
+
+# Get current user from session, loaded at most once per request
 def get_current_user():
-    if 'user_id' in session:
-        return User.query.get(session['user_id'])
-    return None
+    if 'current_user' not in g:
+        user_id = get_current_user_id()
+        g.current_user = db.session.get(User, user_id) if user_id is not None else None
+    return g.current_user
+
+# Response for a full password hashing queue
+def _busy():
+    response = jsonify({"error": "Too many sign-in attempts right now, please try again shortly"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
@@ -34,9 +50,13 @@ def signup():
     # Check if user already exists
     if User.query.filter_by(email=email).first():
         return jsonify({"error": "Email already registered"}), 400
+    db.session.rollback()  # Don't hold a connection while hashing
 
     # Hash the password
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    try:
+        hashed_password = get_password_hasher().hash(password)
+    except PasswordHasherBusy:
+        return _busy()
 
     # Create a new user
     new_user = User(email=email, password=hashed_password)
@@ -62,13 +82,25 @@ def login():
 
     # Find the user
     user = User.query.filter_by(email=email).first()
+    user_id, stored_password = (user.id, user.password) if user else (None, None)
+    # Hand the connection back to the pool instead of holding it while bcrypt runs
+    db.session.rollback()
 
     # Check if user exists and password is correct
-    if user and bcrypt.checkpw(password.encode('utf-8'), user.password):
-        session['user_id'] = user.id
-        return jsonify({"message": "Login successful", "user_id": user.id}), 200
-    else:
-        return jsonify({"error": "Invalid email or password"}), 401
+    hasher = get_password_hasher()
+    try:
+        if not user or not hasher.verify(password, stored_password):
+            return jsonify({"error": "Invalid email or password"}), 401
+        
+        # Upgrade hashes made at a different cost while the password is at hand
+        if hasher.needs_rehash(stored_password):
+            user.password = hasher.hash(password)
+            db.session.commit()
+    except PasswordHasherBusy:
+        return _busy()
+    
+    session['user_id'] = user_id
+    return jsonify({"message": "Login successful", "user_id": user_id}), 200
 
 @auth_bp.route('/logout', methods=['POST'])
 def logout():
@@ -0,0 +1,80 @@
+"""Cold-start time of the fragrance catalog: CSV parse versus binary snapshot.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_catalog --synthetic-size 100000 --runs 3
+
+Each measurement is a fresh Python process that imports the catalog, loads
+it and builds the accord index, which is what a new worker pays before it
+can answer the first quiz or recommendation request.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import numpy as np
+from catalog import CATALOG_FILENAME
+from catalog_snapshot import SNAPSHOT_DIRNAME, write_snapshot
+from benchmarks.synthetic import synthetic_catalog
+
+_COLD_START = """
+import time
+started = time.perf_counter()
+from catalog import FragranceCatalog
+catalog = FragranceCatalog.load({base_dir!r}, use_snapshot={use_snapshot})
+catalog.accord_index
+print(time.perf_counter() - started)
+"""
+
+
+def _cold_start_seconds(base_dir, use_snapshot, runs):
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = _COLD_START.format(base_dir=base_dir, use_snapshot=use_snapshot)
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', code], cwd=backend_dir, check=True,
+                                capture_output=True, text=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return float(np.median(timings))
+
+
+def run(label, csv_path, runs):
+    work_dir = tempfile.mkdtemp()
+    try:
+        shutil.copy(csv_path, os.path.join(work_dir, CATALOG_FILENAME))
+        write_snapshot(os.path.join(work_dir, CATALOG_FILENAME), os.path.join(work_dir, SNAPSHOT_DIRNAME))
+        csv_seconds = _cold_start_seconds(work_dir, False, runs)
+        snapshot_seconds = _cold_start_seconds(work_dir, True, runs)
+        size_mb = os.path.getsize(csv_path) / 1024 / 1024
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n{label}: {size_mb:.1f} MB CSV, median of {runs} cold starts")
+    print(f"  CSV parse:       {csv_seconds * 1000:8.0f} ms")
+    print(f"  binary snapshot: {snapshot_seconds * 1000:8.0f} ms  ({csv_seconds / snapshot_seconds:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--synthetic-size', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    shipped = os.path.join(base_dir, CATALOG_FILENAME)
+    if os.path.exists(shipped):
+        run('shipped catalog', shipped, args.runs)
+    else:
+        print(f"{CATALOG_FILENAME} not found, skipping the shipped catalog")
+
+    if args.synthetic_size:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, CATALOG_FILENAME)
+            synthetic_catalog(args.synthetic_size).to_csv(csv_path, index=False)
+            run('synthetic catalog', csv_path, args.runs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Sparse fieldsets: bytes and latency of list pages with and without `fields=`.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_fields --size 20000
+
+Serves the fragrance blueprint over a temporary database (see
+bench_http_cache) and requests listing pages and single fragrances with every
+field, with the fields the list cards show, and with names only.
+"""
+import argparse
+import tempfile
+import time
+import numpy as np
+from benchmarks.bench_http_cache import build_app
+
+FIELDSETS = [
+    ('all fields', ''),
+    ('card fields', '&fields=name,brand,rating_value,rating_count,description'),
+    ('without description', '&fields=name,brand,gender,rating_value,rating_count,main_accords'),
+    ('name only', '&fields=name'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        client = build_app(tmp_dir, args.size).test_client()
+        ratings = rng.choice(np.arange(30, 46) / 10, args.requests)
+        print(f"{args.size} fragrances, listing pages of {args.limit}, mean per request")
+        print(f"  {'fields':<22} {'ms':>7} {'bytes':>8}")
+        for label, fields in FIELDSETS:
+            timings, sizes = [], []
+            for rating in ratings:
+                # A distinct URL per request so no cached response is reused
+                url = f'/api/fragrances?limit={args.limit}&min_rating={rating:.1f}&offset={rng.integers(0, 500)}{fields}'
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+                sizes.append(len(response.data))
+            print(f"  {label:<22} {np.mean(timings):>7.3f} {np.mean(sizes):>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Listing text filters in SQLite: LIKE scans against the FTS5 index.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_fts --size 100000
+
+Builds a synthetic fragrances table with import_catalog and the schema
+migrations, then times what GET /api/fragrances runs for a text filter: the
+total count and the first page in rating order.
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from sqlalchemy import create_engine, text
+from models import db
+from migrations import run_migrations
+from import_catalog import import_catalog
+from routes.fragrances import fts_match
+from benchmarks.synthetic import synthetic_catalog, BRANDS, NAME_WORDS
+
+TEXT_COLUMNS = ('name', 'brand', 'main_accords', 'perfumers', 'description')
+ORDER = "ORDER BY rating_value DESC, id DESC LIMIT 20"
+
+
+def like_filter(text_query, brand):
+    """WHERE clause of the LIKE-based filters"""
+    clauses, params = [], {}
+    if text_query:
+        for i, word in enumerate(text_query.split()):
+            params[f'w{i}'] = f'%{word}%'
+            clauses.append('(' + ' OR '.join(f"{column} LIKE :w{i}" for column in TEXT_COLUMNS) + ')')
+    if brand:
+        params['brand'] = f'%{brand}%'
+        clauses.append("brand LIKE :brand")
+    return ' AND '.join(clauses), params
+
+
+def fts_filter(text_query, brand):
+    return ("id IN (SELECT rowid FROM fragrances_fts WHERE fragrances_fts MATCH :match)",
+            {'match': fts_match(text_query, brand)})
+
+
+def _timed(connection, where, params, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        total = connection.execute(text(f"SELECT COUNT(*) FROM fragrances WHERE {where}"), params).scalar()
+        connection.execute(text(f"SELECT * FROM fragrances WHERE {where} {ORDER}"), params).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return total, float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'catalog.csv')
+        synthetic_catalog(args.size, description_words=40).to_csv(csv_path, index=False)
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        db.metadata.create_all(engine)
+        run_migrations(engine)
+        import_catalog(engine, csv_path, chunk_size=5000, verbose=False)
+
+        cases = [('brand', None, BRANDS[3]), ('one word', NAME_WORDS[5], None),
+                 ('two words', f"{NAME_WORDS[1]} {NAME_WORDS[9]}", None),
+                 ('word + brand', NAME_WORDS[2], BRANDS[0])]
+        print(f"{args.size} fragrances, median ms for count + first page")
+        print(f"  {'filter':<14} {'LIKE ms':>9} {'hits':>7} {'FTS5 ms':>9} {'hits':>7} {'speedup':>8}")
+        with engine.connect() as connection:
+            for label, text_query, brand in cases:
+                like_hits, like_ms = _timed(connection, *like_filter(text_query, brand), args.runs)
+                fts_hits, fts_ms = _timed(connection, *fts_filter(text_query, brand), args.runs)
+                print(f"  {label:<14} {like_ms:>9.2f} {like_hits:>7} {fts_ms:>9.2f} {fts_hits:>7} "
+                      f"{like_ms / fts_ms:>7.0f}x")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Catalog endpoints with conditional GET and compression: latency and bytes per response.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_http_cache --size 20000
+
+Serves the fragrance blueprint over a temporary database through the Flask
+test client and requests fragrance detail pages and listing pages as a
+browser would: first without validators, then revalidating with
+If-None-Match, and with gzip accepted.
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from flask import Flask
+from models import db
+from migrations import run_migrations
+from import_catalog import import_catalog
+from http_cache import init_http_cache, clear_precompressed
+from routes.fragrances import fragrances_bp
+from benchmarks.synthetic import synthetic_catalog
+
+
+def build_app(tmp_dir, size):
+    csv_path = os.path.join(tmp_dir, 'catalog.csv')
+    synthetic_catalog(size, description_words=60).to_csv(csv_path, index=False)
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    db.init_app(app)
+    init_http_cache(app)
+    app.register_blueprint(fragrances_bp, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+        run_migrations(db.engine)
+        import_catalog(db.engine, csv_path, verbose=False)
+    return app
+
+
+def _timed(client, urls, headers=None, before=None):
+    """Mean ms and bytes per request"""
+    timings, sizes = [], []
+    for url in urls:
+        if before is not None:
+            before()
+        request_headers = headers(url) if callable(headers) else headers
+        started = time.perf_counter()
+        response = client.get(url, headers=request_headers)
+        timings.append((time.perf_counter() - started) * 1000)
+        sizes.append(len(response.data))
+    return float(np.mean(timings)), float(np.mean(sizes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app = build_app(tmp_dir, args.size)
+        client = app.test_client()
+        # A hot set of detail pages, each requested several times
+        hot = rng.integers(1, args.size + 1, 50)
+        details = [f'/api/fragrances/{hot[i]}' for i in rng.integers(0, len(hot), args.requests)]
+        listings = [f'/api/fragrances?limit=20&min_rating={rating:.1f}'
+                    for rating in rng.choice(np.arange(30, 46) / 10, args.requests // 5)]
+
+        print(f"{args.size} fragrances, mean per request")
+        print(f"  {'endpoint':<10} {'request':<34} {'ms':>7} {'bytes':>7}")
+        for label, urls in (('detail', details), ('listing', listings)):
+            etags = {url: client.get(url).headers['ETag'] for url in set(urls)}
+            cases = [
+                ('full response', None, None),
+                ('If-None-Match -> 304', lambda url: {'If-None-Match': etags[url]}, None),
+                ('gzip, compressed per request', {'Accept-Encoding': 'gzip'}, clear_precompressed),
+                ('gzip', {'Accept-Encoding': 'gzip'}, None),
+            ]
+            for name, headers, before in cases:
+                ms, size = _timed(client, urls, headers, before)
+                print(f"  {label:<10} {name:<34} {ms:>7.3f} {size:>7.0f}")
+
+
+if __name__ == '__main__':
+    main()
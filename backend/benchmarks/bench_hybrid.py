@@ -0,0 +1,172 @@
+"""Hybrid recommendation scoring: the vectorized engine against the previous list-based code.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_hybrid --sizes 1000 10000 100000
+
+Each case combines a content seed, saved quiz preferences and favourites,
+like hybrid_recommendations does for a signed-in user. Both implementations
+must return the same page of rows; the script stops if they ever differ.
+"""
+import argparse
+import json
+import time
+import numpy as np
+import pandas as pd
+from catalog import FragranceCatalog
+from hybrid import ScoreVector, add_quiz_signal, CONTENT_WEIGHT, FAVORITE_WEIGHT, POPULAR_WEIGHT
+from benchmarks.synthetic import synthetic_catalog
+
+CASES = [
+    {'prefs': {'experience_level': 'Beginner', 'vibe': 'Warm and cosy'}, 'favorites': [3, 7, 11]},
+    {'prefs': {'gender': 'Women', 'min_rating': 4.0, 'desired_accords': ['citrus', 'woody']}, 'favorites': [5]},
+    {'prefs': {'gender': 'Nobody'}, 'favorites': []},
+    {'prefs': {'min_rating': 4.9, 'desired_accords': ['Vanilla']}, 'favorites': [1, 2]},
+]
+
+
+def _similar(n_items):
+    """Deterministic stand-in for the similarity lookup"""
+    def similar(idx, top_n):
+        rng = np.random.default_rng(idx)
+        return [int(i) for i in rng.choice(n_items, size=top_n, replace=False) if i != idx][:top_n]
+    return similar
+
+
+def legacy_hybrid(df, similar, title_idx, prefs, fav_ids, top_n, start_idx, end_idx):
+    """hybrid_recommendations before vectorization, without the database lookups"""
+    all_recs = []
+    if title_idx is not None:
+        for idx in similar(title_idx, 10):
+            if idx < len(df):
+                all_recs.append((df.iloc[idx], 0.8))
+
+    if prefs is not None:
+        try:
+            prefs = dict(prefs)
+            if prefs.get('experience_level') == 'Beginner' and prefs.get('vibe'):
+                vibe_map = {
+                    'Fresh and clean': ['Fresh', 'Citrus', 'Aquatic', 'Green'],
+                    'Warm and cosy': ['Vanilla', 'Amber', 'Gourmand', 'Woody'],
+                    'Bold and attention-grabbing': ['Spicy', 'Woody', 'Leather', 'Oriental'],
+                    'Light and subtle': ['Floral', 'Citrus', 'Powdery', 'Fresh']
+                }
+                prefs['desired_accords'] = vibe_map.get(prefs['vibe'], [])
+            candidates = []
+            if 'gender' in prefs:
+                candidates.extend(list(df[df['Gender'] == prefs['gender']].index))
+            if candidates or 'gender' not in prefs:
+                if 'min_rating' in prefs:
+                    rating_matches = df[df['Rating Value'] >= float(prefs['min_rating'])]
+                    if candidates:
+                        candidates = [idx for idx in candidates if idx in rating_matches.index]
+                    else:
+                        candidates = list(rating_matches.index)
+                if 'desired_accords' in prefs:
+                    desired_accords = prefs['desired_accords']
+                    for idx in (candidates if candidates else range(len(df))):
+                        accords = df.iloc[idx]['Main Accords']
+                        if isinstance(accords, str) and accords:
+                            if accords.startswith('['):
+                                try:
+                                    accord_list = json.loads(accords)
+                                except ValueError:
+                                    accord_list = accords.strip('[]').replace("'", "").split(',')
+                            else:
+                                accord_list = [a.strip() for a in accords.split(',')]
+                            score = sum(1 for accord in desired_accords
+                                        if any(a.strip().lower() == accord.lower() for a in accord_list))
+                            if score > 0:
+                                all_recs.append((df.iloc[idx], score * 0.2 + 0.5))
+            if not all_recs:
+                for _, row in df.sort_values('Rating Value', ascending=False).head(5).iterrows():
+                    all_recs.append((row, 0.5))
+        except Exception as e:
+            print(f"Error processing quiz preferences: {str(e)}")
+
+    for fav_id in fav_ids[:3]:
+        if fav_id in df.index:
+            for idx in similar(fav_id, 3):
+                if idx < len(df):
+                    all_recs.append((df.iloc[idx], 0.7))
+
+    if not all_recs:
+        for _, row in df.sort_values('Rating Value', ascending=False).head(top_n).iterrows():
+            all_recs.append((row, 0.3))
+
+    unique_recs = {}
+    for fragrance, score in all_recs:
+        name = fragrance['Name']
+        if name not in unique_recs or unique_recs[name][1] < score:
+            unique_recs[name] = (fragrance, score)
+    sorted_recs = sorted(unique_recs.values(), key=lambda x: x[1], reverse=True)
+    return pd.DataFrame([rec[0] for rec in sorted_recs[start_idx:end_idx]])
+
+
+def vectorized_hybrid(catalog, similar, title_idx, prefs, fav_ids, top_n, start_idx, end_idx):
+    """The ScoreVector engine with the same inputs"""
+    scores = ScoreVector(len(catalog))
+    if title_idx is not None:
+        scores.add(similar(title_idx, 10), CONTENT_WEIGHT)
+    if prefs is not None:
+        try:
+            add_quiz_signal(scores, catalog, dict(prefs))
+        except Exception as e:
+            print(f"Error processing quiz preferences: {str(e)}")
+    for fav_id in fav_ids[:3]:
+        if fav_id in catalog.frame.index:
+            scores.add(similar(fav_id, 3), FAVORITE_WEIGHT)
+    if not scores:
+        scores.add(catalog.rating_order[:top_n], POPULAR_WEIGHT)
+    return catalog.frame.iloc[scores.ranked(catalog.name_codes, start_idx, end_idx)]
+
+
+def _timed(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, float(np.median(timings))
+
+
+def run(n_items, runs, legacy_runs):
+    df = synthetic_catalog(n_items, description_words=5)
+    # Repeat some names so the per-name dedupe is exercised
+    df.loc[df.index[1::7], 'Name'] = df['Name'].iloc[0::7].to_numpy()[:len(df.index[1::7])]
+    catalog = FragranceCatalog(df)
+    catalog.accord_index
+    similar = _similar(n_items)
+
+    legacy_ms, vector_ms = [], []
+    for case in CASES:
+        for page in (1, 3):
+            args = (similar, 0, case['prefs'], case['favorites'], 20, (page - 1) * 5, page * 5)
+            old, old_ms = _timed(lambda: legacy_hybrid(catalog.frame, *args), legacy_runs)
+            new, new_ms = _timed(lambda: vectorized_hybrid(catalog, *args), runs)
+            # repr() so missing values compare equal
+            if (list(old.index) != list(new.index)
+                    or repr(old.to_dict(orient='records')) != repr(new.to_dict(orient='records'))):
+                raise SystemExit(f"Mismatch for {case} page {page} at {n_items} items")
+            legacy_ms.append(old_ms)
+            vector_ms.append(new_ms)
+
+    print(f"  {n_items:>8} {np.mean(legacy_ms):>14.2f} {np.mean(vector_ms):>14.2f} "
+          f"{np.mean(legacy_ms) / np.mean(vector_ms):>9.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--legacy-runs', type=int, default=1)
+    args = parser.parse_args()
+
+    print("Mean latency per request over quiz/favourite cases, identical pages checked")
+    print(f"  {'items':>8} {'previous ms':>14} {'vectorized ms':>14} {'speedup':>10}")
+    for n_items in args.sizes:
+        run(n_items, args.runs, args.legacy_runs)
+
+
+if __name__ == '__main__':
+    main()
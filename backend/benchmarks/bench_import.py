@@ -0,0 +1,83 @@
+"""Catalog import into SQLite: the previous row-by-row ORM loop against import_catalog.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_import --sizes 10000 100000
+
+Each size is imported into a fresh database file, then imported again
+unchanged, which is what a routine re-run of the importer costs.
+"""
+import argparse
+import os
+import tempfile
+import time
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from models import db, Fragrance
+from import_catalog import import_catalog
+from benchmarks.synthetic import synthetic_catalog
+
+
+def legacy_import(engine, csv_path):
+    """populate_fragrances before the bulk importer"""
+    df = pd.read_csv(csv_path)
+    with Session(engine) as session:
+        for _, row in df.iterrows():
+            session.add(Fragrance(
+                name=row['Name'],
+                brand=row['Name'].split(' ')[0] if ' ' in row['Name'] else 'Unknown',
+                gender=row['Gender'],
+                rating_value=row['Rating Value'],
+                rating_count=row['Rating Count'],
+                main_accords=str(row['Main Accords']),
+                perfumers=str(row['Perfumers']),
+                description=row['Description'],
+                url=row['url']
+            ))
+        session.commit()
+
+
+def _fresh_engine(tmp_dir, name):
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, name)}")
+    db.metadata.create_all(engine)
+    return engine
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def run(n_items, tmp_dir, legacy_limit):
+    csv_path = os.path.join(tmp_dir, f'catalog_{n_items}.csv')
+    synthetic_catalog(n_items, description_words=40).to_csv(csv_path, index=False)
+
+    legacy = None
+    if n_items <= legacy_limit:
+        legacy = _timed(lambda: legacy_import(_fresh_engine(tmp_dir, f'legacy_{n_items}.db'), csv_path))
+    engine = _fresh_engine(tmp_dir, f'bulk_{n_items}.db')
+    bulk = _timed(lambda: import_catalog(engine, csv_path, verbose=False))
+    rerun = _timed(lambda: import_catalog(engine, csv_path, verbose=False))
+
+    legacy_rate = f"{n_items / legacy:>12.0f}" if legacy else f"{'-':>12}"
+    print(f"  {n_items:>8} {legacy_rate} {n_items / bulk:>12.0f} {n_items / rerun:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--legacy-limit', type=int, default=20000,
+                        help="Skip the row-by-row import above this many rows")
+    args = parser.parse_args()
+
+    print("Rows per second")
+    print(f"  {'items':>8} {'previous':>12} {'bulk':>12} {'re-run':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_items in args.sizes:
+            run(n_items, tmp_dir, args.legacy_limit)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Neighbor store refresh after a few catalog edits: full rebuild versus incremental update.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_incremental_similarity --sizes 20000 100000 --added 5 --changed 5
+
+"full" is what optimize_cosine_sim.py does with an existing vectorizer:
+transform every row, build the blocked top-k matrix and cut the neighbor
+arrays from it. "incremental" transforms only the added and changed rows
+and patches the previous neighbor arrays. Both use the same vocabulary and
+are timed in process without file I/O; their results are compared.
+"""
+import argparse
+import time
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+from optimize_cosine_sim import build_similarity_matrix, NEIGHBOR_STORE_K, SIMILARITY_THRESHOLD
+from neighbor_store import topk_from_csr
+from incremental_similarity import update_neighbors
+from benchmarks.synthetic import synthetic_catalog
+
+
+def _texts(size, seed=0):
+    df = synthetic_catalog(size, seed=seed)
+    return (df['Description'] + " " + df['Main Accords']).tolist()
+
+
+def full_build(texts, vectorizer, block_size):
+    """Normalized features and neighbor arrays of every row"""
+    X = vectorizer.transform(texts)
+    matrix = build_similarity_matrix(X, top_k=NEIGHBOR_STORE_K, block_size=block_size)
+    indices, scores = topk_from_csr(matrix, NEIGHBOR_STORE_K)
+    return normalize(X), indices, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--added', type=int, default=5)
+    parser.add_argument('--changed', type=int, default=5)
+    parser.add_argument('--block-size', type=int, default=256)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"top-{NEIGHBOR_STORE_K} neighbors, {args.added} added and {args.changed} changed fragrances")
+    print(f"  {'items':>8} {'full s':>8} {'incr s':>8} {'speedup':>8} {'patched':>8} {'recomp':>7} {'equal':>6}")
+    for size in args.sizes:
+        texts = _texts(size)
+        vectorizer = TfidfVectorizer(stop_words='english', max_features=5000).fit(texts)
+        X, indices, scores = full_build(texts, vectorizer, args.block_size)
+
+        # Edits: a few rows get another fragrance's text, a few new ones are appended
+        edited = list(texts)
+        rows = np.sort(rng.choice(size, args.changed, replace=False))
+        donors = _texts(args.changed + args.added, seed=1)
+        for row, donor in zip(rows, donors):
+            edited[row] = donor
+        edited.extend(donors[args.changed:])
+        rows = np.concatenate((rows, np.arange(size, size + args.added)))
+
+        started = time.perf_counter()
+        X_rows = vectorizer.transform([edited[row] for row in rows])
+        _, new_indices, new_scores, stats = update_neighbors(X, indices, scores, rows, X_rows,
+                                                             SIMILARITY_THRESHOLD)
+        incremental = time.perf_counter() - started
+
+        started = time.perf_counter()
+        _, want_indices, want_scores = full_build(edited, vectorizer, args.block_size)
+        full = time.perf_counter() - started
+        equal = np.array_equal(new_indices, want_indices) and np.allclose(new_scores, want_scores)
+
+        print(f"  {size:>8} {full:>8.2f} {incremental:>8.3f} {full / incremental:>7.0f}x "
+              f"{stats['patched']:>8} {stats['recomputed']:>7} {str(equal):>6}")
+
+
+if __name__ == '__main__':
+    main()
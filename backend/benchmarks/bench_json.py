@@ -0,0 +1,64 @@
+"""Response encoding: DataFrame.to_dict + jsonify against cached per-row JSON fragments.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_json --size 100000 --page-sizes 5 20 100
+
+Encodes random pages of a synthetic catalog the way the recommendation and
+search endpoints used to (`to_dict(orient='records')`, then jsonify) and with
+RecordEncoder on each JSON backend, once with cold fragments and once with
+every row already encoded. Both must decode to the same records.
+"""
+import argparse
+import json
+import time
+import numpy as np
+from flask import Flask, jsonify
+import fast_json
+from fast_json import RecordEncoder, json_response
+from benchmarks.synthetic import synthetic_catalog
+
+
+def _timed(fn, pages):
+    started = time.perf_counter()
+    for rows in pages:
+        body = fn(rows)
+    return (time.perf_counter() - started) * 1000 / len(pages), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[5, 20, 100])
+    parser.add_argument('--pages', type=int, default=500)
+    args = parser.parse_args()
+
+    frame = synthetic_catalog(args.size, description_words=60)
+    app = Flask(__name__)
+    rng = np.random.default_rng(0)
+
+    print(f"{args.size} fragrances, mean ms per response over {args.pages} random pages")
+    print(f"  {'page':>5} {'to_dict+jsonify':>16} " + ' '.join(f"{name + ' cold':>11} {name + ' warm':>11}"
+                                                        for name in fast_json.BACKENDS))
+    with app.app_context():
+        for page_size in args.page_sizes:
+            pages = [rng.integers(0, args.size, page_size) for _ in range(args.pages)]
+            legacy_ms, legacy = _timed(
+                lambda rows: jsonify({'recommendations': frame.iloc[rows].to_dict(orient='records')}).get_data(),
+                pages)
+            cells = [f"{legacy_ms:>16.3f}"]
+            for name in fast_json.BACKENDS:
+                fast_json.use_backend(name)
+                encoder = RecordEncoder(frame)
+                encode = lambda rows: json_response({'recommendations': encoder.encode(rows)}).get_data()
+                cold_ms, _ = _timed(encode, pages)
+                warm_ms, body = _timed(encode, pages)
+                # jsonify writes NaN for missing numbers where the encoder writes null
+                if json.loads(body) != json.loads(legacy.replace(b'NaN', b'null')):
+                    raise SystemExit(f"Mismatch with the {name} backend at page size {page_size}")
+                cells += [f"{cold_ms:>11.3f}", f"{warm_ms:>11.3f}"]
+            print(f"  {page_size:>5} " + ' '.join(cells))
+
+
+if __name__ == '__main__':
+    main()
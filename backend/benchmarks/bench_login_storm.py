@@ -0,0 +1,127 @@
+"""Listing latency during a login storm: bcrypt on request threads against the bounded pool.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_login_storm --logins 200 --concurrency 32
+
+Serves the auth and fragrance blueprints from a threaded server over a
+temporary database, fires concurrent logins at /api/login and meanwhile
+times GET /api/fragrances from a single client. "inline" hashes on every
+request thread with no cap, like login did before the pool; "pool" uses the
+PasswordHasher defaults.
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import numpy as np
+from flask import Flask
+from werkzeug.serving import make_server
+from models import db, User
+from migrations import run_migrations
+from import_catalog import import_catalog
+from passwords import configure_password_hasher, DEFAULT_WORKERS, DEFAULT_MAX_PENDING
+from auth import auth_bp
+from routes.fragrances import fragrances_bp
+from benchmarks.synthetic import synthetic_catalog
+
+USERS = 8
+PASSWORD = 'storm-password'
+
+
+def build_app(tmp_dir, size):
+    csv_path = os.path.join(tmp_dir, 'catalog.csv')
+    synthetic_catalog(size, description_words=10).to_csv(csv_path, index=False)
+
+    app = Flask(__name__)
+    app.secret_key = 'bench'
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    db.init_app(app)
+    app.register_blueprint(auth_bp, url_prefix='/api')
+    app.register_blueprint(fragrances_bp, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+        run_migrations(db.engine)
+        import_catalog(db.engine, csv_path, verbose=False)
+        hasher = configure_password_hasher(workers=0, max_pending=1)
+        hashed = hasher.hash(PASSWORD)
+        db.session.add_all([User(email=f'user{i}@example.com', password=hashed) for i in range(USERS)])
+        db.session.commit()
+    return app
+
+
+def _request(url, payload=None):
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def run(base_url, logins, concurrency, probe_interval):
+    """Login statuses, and listing latencies in ms while the logins run"""
+    statuses, latencies = [], []
+    remaining = iter(range(logins))
+    lock = threading.Lock()
+
+    def login_worker():
+        while True:
+            with lock:
+                i = next(remaining, None)
+            if i is None:
+                return
+            status = _request(f'{base_url}/api/login',
+                              {'email': f'user{i % USERS}@example.com', 'password': PASSWORD})
+            with lock:
+                statuses.append(status)
+
+    threads = [threading.Thread(target=login_worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        probe_started = time.perf_counter()
+        _request(f'{base_url}/api/fragrances?limit=20')
+        latencies.append((time.perf_counter() - probe_started) * 1000)
+        time.sleep(probe_interval)
+    elapsed = time.perf_counter() - started
+    return statuses, latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=5000)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--probe-interval', type=float, default=0.01)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app = build_app(tmp_dir, args.size)
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+
+        print(f"{args.logins} logins from {args.concurrency} clients, {os.cpu_count()} CPUs, "
+              f"GET /api/fragrances latency while they run")
+        print(f"  {'hashing':<28} {'p50 ms':>8} {'p99 ms':>8} {'probes':>7} {'200':>5} {'503':>5} {'logins/s':>9}")
+        modes = [('inline, uncapped', 0, 10 ** 6),
+                 (f'pool, {DEFAULT_WORKERS} workers, cap {DEFAULT_MAX_PENDING}', DEFAULT_WORKERS, DEFAULT_MAX_PENDING)]
+        for label, workers, max_pending in modes:
+            configure_password_hasher(workers=workers, max_pending=max_pending)
+            statuses, latencies, elapsed = run(base_url, args.logins, args.concurrency, args.probe_interval)
+            print(f"  {label:<28} {np.percentile(latencies, 50):>8.1f} {np.percentile(latencies, 99):>8.1f} "
+                  f"{len(latencies):>7} {statuses.count(200):>5} {statuses.count(503):>5} "
+                  f"{statuses.count(200) / elapsed:>9.1f}")
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Latency and recall@10 of BM25 search against the TF-IDF search path.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_search --synthetic-size 100000 --queries 200
+
+The shipped catalog uses the real search files when they exist; otherwise,
+like the synthetic catalog, it gets a TF-IDF vectorizer fitted on the fly.
+Recall@10 treats the TF-IDF top 10 (positive scores only) as the reference.
+"""
+import argparse
+import os
+import time
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from search_index import SearchIndex
+from search_bm25 import BM25Index
+from benchmarks.synthetic import synthetic_catalog, sample_queries
+
+TOP_N = 10
+
+
+def _fitted_search_index(df):
+    text = df['Name'].fillna('') + ' ' + df['Main Accords'].fillna('') + ' ' + df['Description'].fillna('')
+    vectorizer = TfidfVectorizer(stop_words='english')
+    return SearchIndex(df, vectorizer.fit_transform(text), vectorizer)
+
+
+def _timed(fn, queries):
+    results, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(fn(query))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return results, np.array(latencies)
+
+
+def _tfidf_reference(index, query):
+    rows = index.top_matches(query, TOP_N)
+    query_vec = index.vectorizer.transform([query])
+    scores = (index.normalized_matrix[rows] @ query_vec.T).toarray().ravel()
+    return set(rows[scores > 0].tolist())
+
+
+def _recall(got, want):
+    hits = [len(set(g) & w) / len(w) for g, w in zip(got, want) if w]
+    return float(np.mean(hits)) if hits else float('nan')
+
+
+def run(label, search_index, queries):
+    started = time.perf_counter()
+    bm25 = BM25Index(search_index.df)
+    build_seconds = time.perf_counter() - started
+
+    tfidf_results, tfidf_ms = _timed(lambda q: _tfidf_reference(search_index, q), queries)
+    maxscore_results, maxscore_ms = _timed(lambda q: bm25.search(q, TOP_N)[0].tolist(), queries)
+    exhaustive_results, exhaustive_ms = _timed(
+        lambda q: set(bm25.search(q, TOP_N, exhaustive=True)[0].tolist()), queries)
+
+    print(f"\n{label}: {len(search_index.df)} fragrances, {len(queries)} queries")
+    print(f"  BM25 build: {build_seconds:.2f}s, {len(bm25.postings)} terms, "
+          f"postings {bm25.postings_bytes() / 1024 / 1024:.1f} MB")
+    print(f"  {'engine':<18}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'recall@10':>12}")
+    rows = [
+        ('tfidf', tfidf_ms, 1.0),
+        ('bm25 exhaustive', exhaustive_ms, _recall(exhaustive_results, tfidf_results)),
+        ('bm25 maxscore', maxscore_ms, _recall(maxscore_results, tfidf_results)),
+    ]
+    for name, latencies, recall in rows:
+        print(f"  {name:<18}{latencies.mean():>10.3f}{np.percentile(latencies, 50):>10.3f}"
+              f"{np.percentile(latencies, 95):>10.3f}{recall:>12.3f}")
+    print(f"  maxscore vs exhaustive recall@10: {_recall(maxscore_results, exhaustive_results):.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--synthetic-size', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if os.path.exists(os.path.join(base_dir, 'perfume_data_clean.csv')):
+        shipped = SearchIndex.load(base_dir)
+        if not shipped.available:
+            shipped = _fitted_search_index(shipped.df)
+        run('shipped catalog', shipped, sample_queries(shipped.df, args.queries))
+    else:
+        print("perfume_data_clean.csv not found, skipping the shipped catalog")
+
+    if args.synthetic_size:
+        df = synthetic_catalog(args.synthetic_size)
+        run('synthetic catalog', _fitted_search_index(df), sample_queries(df, args.queries))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Search result cache on a skewed query stream.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_search_cache --size 100000 --requests 5000
+
+Draws queries from a Zipf distribution over a pool of distinct queries, so a
+few popular ones dominate like brand and accord searches do, with random
+case and spacing. Times search_rows as /api/search calls it, with the result
+cache and with it emptied before every query, and reports the cache
+counters.
+"""
+import argparse
+import time
+import numpy as np
+from routes.fragrances import search_rows, clear_search_cache, search_cache_stats
+from benchmarks.bench_search import _fitted_search_index
+from benchmarks.synthetic import synthetic_catalog, sample_queries
+
+
+def _vary(query, rng):
+    """Same query with different case and spacing"""
+    words = [word.upper() if rng.random() < 0.2 else word for word in query.split()]
+    return (' ' * int(rng.integers(1, 3))).join(words)
+
+
+def _timed(queries, search_index, backend, cold):
+    latencies = []
+    for query in queries:
+        if cold:
+            clear_search_cache()
+        started = time.perf_counter()
+        search_rows(query, search_index, backend)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--distinct', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--zipf', type=float, default=1.1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = synthetic_catalog(args.size)
+    search_index = _fitted_search_index(df)
+    pool = list(dict.fromkeys(sample_queries(df, args.distinct * 2)))[:args.distinct]
+    ranks = np.minimum(rng.zipf(args.zipf, args.requests), len(pool)) - 1
+    queries = [_vary(pool[rank], rng) for rank in ranks]
+
+    print(f"{args.size} fragrances, {args.requests} searches over {len(pool)} distinct queries (zipf {args.zipf})")
+    print(f"  {'engine':<8} {'cache':<6} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for backend in ('tfidf', 'bm25'):
+        search_index.bm25  # Built before timing
+        for label, cold in (('off', True), ('on', False)):
+            clear_search_cache()
+            before = search_cache_stats()
+            latencies = _timed(queries, search_index, backend, cold)
+            print(f"  {backend:<8} {label:<6} {latencies.mean():>9.3f} {np.percentile(latencies, 50):>9.3f} "
+                  f"{np.percentile(latencies, 99):>9.3f}")
+        stats = search_cache_stats()
+        hits, misses = stats['hits'] - before['hits'], stats['misses'] - before['misses']
+        print(f"  {'':<8} hit rate {hits / (hits + misses):.0%}, {stats['entries']} entries, "
+              f"{stats['bytes'] / 1024:.0f} kB, {stats['evictions']} evictions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import random
+import numpy as np
+import pandas as pd
+
+BRANDS = [
+    'Dior', 'Chanel', 'Versace', 'Gucci', 'Tom Ford', 'Creed', 'Armani', 'Prada',
+    'Hermes', 'Guerlain', 'Lancome', 'Byredo', 'Le Labo', 'Montblanc', 'YSL',
+    'Givenchy', 'Maison Margiela', 'Paco Rabanne', 'Dolce Gabbana', 'Kilian',
+]
+NAME_WORDS = [
+    'Light', 'Blue', 'Noir', 'Oud', 'Rose', 'Amber', 'Night', 'Eau', 'Sauvage',
+    'Bleu', 'Vanilla', 'Wood', 'Musk', 'Aqua', 'Silver', 'Gold', 'Velvet', 'Citrus',
+    'Santal', 'Iris', 'Leather', 'Spice', 'Intense', 'Sport', 'Homme', 'Femme',
+    'Mystic', 'Garden', 'Ocean', 'Smoke', 'Absolu', 'Elixir', 'Royal', 'Wild',
+]
+ACCORDS = [
+    'citrus', 'woody', 'fresh', 'aquatic', 'green', 'vanilla', 'amber', 'gourmand',
+    'spicy', 'leather', 'floral', 'powdery', 'musky', 'fruity', 'sweet', 'aromatic',
+    'warm spicy', 'oud', 'rose', 'white floral', 'earthy', 'smoky', 'tobacco', 'balsamic',
+]
+GENDERS = ['Women', 'Men', 'Unisex']
+PERFUMERS = ['Francois Demachy', 'Alberto Morillas', 'Olivier Cresp', 'Dominique Ropion',
+             'Jacques Cavallier', 'Quentin Bisch', 'Nathalie Lorson']
+
+
+def _description_vocabulary(size, rng):
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    lengths = rng.integers(4, 10, size * 2)
+    words = {''.join(letters[rng.integers(0, 26, length)]) for length in lengths}
+    words = np.array(sorted(words)[:size])
+    rng.shuffle(words)
+    return words
+
+
+def synthetic_catalog(n_items, seed=0, description_words=40, vocabulary_size=20000):
+    """A perfume_data_clean.csv-shaped DataFrame of n_items random fragrances.
+
+    Description words follow a Zipf distribution so posting list lengths look
+    like natural text: a few very common terms and a long tail of rare ones.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = _description_vocabulary(vocabulary_size, rng)
+    zipf_weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    zipf_weights /= zipf_weights.sum()
+
+    brands = rng.choice(BRANDS, n_items)
+    lengths = rng.integers(description_words // 2, description_words * 2, n_items)
+    words = vocabulary[rng.choice(len(vocabulary), lengths.sum(), p=zipf_weights)]
+    word_offsets = np.concatenate(([0], np.cumsum(lengths)))
+    ratings = np.round(rng.uniform(2.5, 4.9, n_items), 2)
+    rating_counts = rng.integers(0, 20000, n_items)
+
+    # Small per-row draws are much cheaper through the stdlib generator
+    py_rng = random.Random(seed)
+    rows = []
+    for i in range(n_items):
+        name_words = py_rng.sample(NAME_WORDS, py_rng.randint(1, 3))
+        accords = py_rng.sample(ACCORDS, py_rng.randint(2, 6))
+        description = ' '.join(words[word_offsets[i]:word_offsets[i + 1]])
+        rows.append({
+            'Name': f"{brands[i]} {' '.join(name_words)} {i}",
+            'Gender': GENDERS[i % 3],
+            'Rating Value': float(ratings[i]),
+            'Rating Count': int(rating_counts[i]),
+            'Main Accords': repr(accords),
+            'Perfumers': repr(py_rng.sample(PERFUMERS, py_rng.randint(1, 2))),
+            'Description': f"{' and '.join(accords[:2])} fragrance by {brands[i]} {description}",
+            'url': f"https://www.fragrantica.com/perfume/{brands[i].replace(' ', '-')}/{i}.html",
+        })
+    return pd.DataFrame(rows)
+
+
+def sample_queries(df, n_queries, seed=0):
+    """Search queries mixing accords, brands, name fragments and description words"""
+    rng = np.random.default_rng(seed + 1)
+    descriptions = df['Description'].to_numpy()
+    names = df['Name'].to_numpy()
+    queries = []
+    for i in range(n_queries):
+        kind = i % 4
+        if kind == 0:
+            queries.append(' '.join(rng.choice(ACCORDS, rng.integers(1, 3), replace=False)))
+        elif kind == 1:
+            queries.append(str(rng.choice(BRANDS)))
+        elif kind == 2:
+            queries.append(' '.join(str(names[rng.integers(len(names))]).split()[:2]))
+        else:
+            words = str(descriptions[rng.integers(len(descriptions))]).split()
+            queries.append(' '.join(rng.choice(words, min(3, len(words)), replace=False)))
+    return queries
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe mapping with a size bound, evicting the least recently used entry.
+
+    Optionally entries also expire `ttl` seconds after they were set, and the
+    total of `sizeof(key, value)` over all entries is kept under `maxbytes`.
+    Hits, misses, evictions and expirations are counted; see stats().
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, maxbytes=None, sizeof=None, clock=time.monotonic):
+        if maxbytes is not None and sizeof is None:
+            raise ValueError("maxbytes needs a sizeof function")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self._sizeof = sizeof
+        self._clock = clock
+        # key -> (value, expiry time or None, size in bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry)
+
+    def _expired(self, entry):
+        return entry[1] is not None and entry[1] <= self._clock()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[2]
+        return entry
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if self._expired(entry):
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        size = self._sizeof(key, value) if self._sizeof is not None else 0
+        expires = self._clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.maxbytes is not None and size > self.maxbytes:
+                return  # Would evict everything else and still not fit
+            self._entries[key] = (value, expires, size)
+            self._bytes += size
+            while len(self._entries) > self.maxsize or (self.maxbytes is not None and self._bytes > self.maxbytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            return self._remove(key)[0]
+
+    def discard_where(self, predicate):
+        """Drop every entry whose key matches `predicate`"""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def nbytes(self):
+        """Total size of the entries, as measured by `sizeof`"""
+        return self._bytes
+
+    def stats(self):
+        """Counters and current size"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
@@ -0,0 +1,153 @@
+import os
+import threading
+import uuid
+import numpy as np
+import pandas as pd
+from accords import AccordIndex
+from name_index import NameIndex
+from cache import LRUCache
+from fast_json import RecordEncoder, RECORD_PROJECTION_CACHE_SIZE
+from catalog_snapshot import SNAPSHOT_DIRNAME, MANIFEST_FILENAME, file_checksum, load_snapshot
+
+CATALOG_FILENAME = 'perfume_data_clean.csv'
+
+# Text columns where a missing value means "empty", not "unknown"
+TEXT_COLUMNS = ('Description', 'Main Accords')
+
+
+def _readonly(values):
+    values = np.asarray(values)
+    values.flags.writeable = False
+    return values
+
+
+def find_catalog_csv(base_dir=None):
+    """Path of the dataset CSV next to the backend modules, or in the current directory"""
+    if base_dir is None:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    path = os.path.join(base_dir, CATALOG_FILENAME)
+    if not os.path.exists(path):
+        path = CATALOG_FILENAME  # Try current directory
+    return path
+
+
+class FragranceCatalog:
+    """Immutable, columnar snapshot of the fragrance dataset.
+
+    One instance per process is shared by every blueprint through
+    get_catalog(). Row positions are the fragrance IDs used by the search and
+    recommendation endpoints. `frame` is kept for code that still works on a
+    DataFrame and must be treated as read-only; the typed columns and the
+    name and accord indexes are derived from it once, or for accords read
+    pre-tokenized from the binary snapshot.
+    """
+
+    def __init__(self, frame, source=None, checksum=None, accord_index=None):
+        frame = frame.reset_index(drop=True)
+        for column in TEXT_COLUMNS:
+            if column in frame.columns:
+                frame[column] = frame[column].fillna('')
+        self.frame = frame
+        self.source = source
+        # SHA-256 of the source CSV, when the catalog came from one
+        self.checksum = checksum
+        # Changes whenever the data may have: the CSV checksum, or unique per instance
+        self.version = checksum[:16] if checksum else uuid.uuid4().hex[:16]
+
+        self.ids = _readonly(np.arange(len(frame), dtype=np.int64))
+        self.names = _readonly(frame['Name'].astype(str).to_numpy())
+        self.genders = _readonly(frame['Gender'].fillna('').astype(str).to_numpy())
+        self.rating_values = _readonly(pd.to_numeric(frame['Rating Value'], errors='coerce').to_numpy(dtype=np.float64))
+        self.rating_counts = _readonly(pd.to_numeric(frame['Rating Count'], errors='coerce').fillna(0).to_numpy(dtype=np.int64))
+        self.main_accords = _readonly(frame['Main Accords'].to_numpy())
+        self.descriptions = _readonly(frame['Description'].to_numpy())
+        # Rows sharing a name share a code; recommendations treat them as one fragrance
+        self.name_codes = _readonly(pd.factorize(frame['Name'])[0])
+        # Rows by rating, best first, in the order frame.sort_values gives
+        self.rating_order = _readonly(frame['Rating Value'].sort_values(ascending=False).index.to_numpy())
+
+        self._name_index = None
+        self._accord_index = accord_index
+        # Full-column encoders per converter set, and projections of them
+        self._record_encoders = {}
+        self._projections = LRUCache(RECORD_PROJECTION_CACHE_SIZE)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, base_dir=None, use_snapshot=True):
+        """Load the catalog from its binary snapshot, or from the CSV if the snapshot is missing or stale"""
+        path = find_catalog_csv(base_dir)
+        checksum = file_checksum(path) if os.path.exists(path) else None
+
+        snapshot_dir = os.path.join(os.path.dirname(os.path.abspath(path)), SNAPSHOT_DIRNAME)
+        if use_snapshot and os.path.exists(os.path.join(snapshot_dir, MANIFEST_FILENAME)):
+            try:
+                frame, accord_index, manifest = load_snapshot(snapshot_dir, checksum)
+                print(f"Fragrance catalog loaded from snapshot: {len(frame)} fragrances")
+                return cls(frame, source=snapshot_dir, checksum=manifest['source_checksum'],
+                           accord_index=accord_index)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Ignoring catalog snapshot, falling back to CSV: {str(e)}")
+
+        print(f"Loading fragrance catalog from: {path}")
+        catalog = cls(pd.read_csv(path), source=path, checksum=checksum)
+        print(f"Fragrance catalog loaded: {len(catalog)} fragrances")
+        return catalog
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def name_index(self):
+        """Exact and fuzzy name lookup, built on first use"""
+        if self._name_index is None:
+            with self._lock:
+                if self._name_index is None:
+                    self._name_index = NameIndex(self.names)
+        return self._name_index
+
+    @property
+    def accord_index(self):
+        """Accord vocabulary and item x accord matrix, built on first use"""
+        if self._accord_index is None:
+            with self._lock:
+                if self._accord_index is None:
+                    self._accord_index = AccordIndex.from_series(self.main_accords)
+        return self._accord_index
+
+    def record_encoder(self, columns=None, converters=None):
+        """Shared RecordEncoder for these columns (all by default), built on first use.
+
+        Column sets can come from a client's `fields=`, so only the last few
+        projections are kept; they share the values of the full encoder.
+        """
+        key = tuple(sorted((converters or {}).items()))
+        encoder = self._record_encoders.get(key)
+        if encoder is None:
+            with self._lock:
+                encoder = self._record_encoders.get(key)
+                if encoder is None:
+                    encoder = self._record_encoders[key] = RecordEncoder(self.frame, converters=converters)
+        if columns is None:
+            return encoder
+
+        projection_key = (tuple(columns), key)
+        projection = self._projections.get(projection_key)
+        if projection is None:
+            projection = encoder.project(columns)
+            self._projections.set(projection_key, projection)
+        return projection
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Return the process-wide fragrance catalog, loading it on first use"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = FragranceCatalog.load()
+    return _catalog
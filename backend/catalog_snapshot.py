@@ -0,0 +1,152 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from accords import AccordIndex
+
+# Layout of a snapshot directory:
+#
+#   manifest.json            format version, source CSV checksum, column list
+#   <n>.npy                  numeric column n, stored as-is
+#   <n>.text.npy             text column n as one UTF-8 byte array
+#   <n>.offsets.npy          int64 character offsets of each value (n_items + 1)
+#   <n>.nulls.npy            bool mask of missing values, only when there are any
+#   accords.*.npy            pre-tokenized item x accord CSR matrix and vocabulary
+#
+# Every array is opened with np.load(mmap_mode='r'); text is decoded with one
+# bytes.decode() per column instead of parsing CSV quoting row by row.
+
+SNAPSHOT_DIRNAME = 'catalog_snapshot'
+FORMAT_VERSION = 1
+MANIFEST_FILENAME = 'manifest.json'
+
+
+def file_checksum(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _save(out_dir, name, values):
+    np.save(os.path.join(out_dir, f"{name}.npy"), values, allow_pickle=False)
+
+
+def _load(snapshot_dir, name):
+    return np.load(os.path.join(snapshot_dir, f"{name}.npy"), mmap_mode='r', allow_pickle=False)
+
+
+def _write_text(out_dir, name, values):
+    nulls = pd.isna(values)
+    strings = ['' if null else str(value) for value, null in zip(values, nulls)]
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in strings], out=offsets[1:])
+    _save(out_dir, f"{name}.text", np.frombuffer(''.join(strings).encode('utf-8'), dtype=np.uint8))
+    _save(out_dir, f"{name}.offsets", offsets)
+    if nulls.any():
+        _save(out_dir, f"{name}.nulls", np.asarray(nulls, dtype=bool))
+        return True
+    return False
+
+
+def _read_text(snapshot_dir, name, has_nulls):
+    text = bytes(_load(snapshot_dir, f"{name}.text")).decode('utf-8')
+    offsets = _load(snapshot_dir, f"{name}.offsets").tolist()
+    values = np.array([text[start:end] for start, end in zip(offsets[:-1], offsets[1:])], dtype=object)
+    if has_nulls:
+        values[np.asarray(_load(snapshot_dir, f"{name}.nulls"))] = np.nan
+    return values
+
+
+def write_snapshot(csv_path, out_dir):
+    """Compile the dataset CSV into a snapshot directory, replacing any existing one"""
+    frame = pd.read_csv(csv_path)
+    tmp_dir = f"{out_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for i, name in enumerate(frame.columns):
+        values = frame[name]
+        if values.dtype == object:
+            has_nulls = _write_text(tmp_dir, str(i), values.to_numpy())
+            columns.append({'name': name, 'kind': 'text', 'nulls': has_nulls})
+        else:
+            _save(tmp_dir, str(i), values.to_numpy())
+            columns.append({'name': name, 'kind': 'numeric', 'dtype': values.dtype.str})
+
+    accords = AccordIndex.from_series(frame['Main Accords'])
+    _save(tmp_dir, 'accords.indptr', accords.counts.indptr)
+    _save(tmp_dir, 'accords.indices', accords.counts.indices)
+    _save(tmp_dir, 'accords.data', accords.counts.data)
+    _write_text(tmp_dir, 'accords.vocabulary', np.array(list(accords.vocabulary), dtype=object))
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'source_checksum': file_checksum(csv_path),
+        'n_items': len(frame),
+        'columns': columns,
+        'n_accords': len(accords.vocabulary),
+    }
+    # The manifest goes last so a partially written snapshot is never valid
+    with open(os.path.join(tmp_dir, MANIFEST_FILENAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return manifest
+
+
+def read_manifest(snapshot_dir):
+    with open(os.path.join(snapshot_dir, MANIFEST_FILENAME)) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported catalog snapshot version {manifest.get('format_version')}")
+    return manifest
+
+
+def load_snapshot(snapshot_dir, checksum=None):
+    """Read a snapshot as (frame, accord index, manifest).
+
+    Raises ValueError if it was compiled from a different CSV than `checksum`.
+    """
+    manifest = read_manifest(snapshot_dir)
+    if checksum is not None and manifest['source_checksum'] != checksum:
+        raise ValueError("Catalog snapshot is stale: it was built from a different CSV")
+
+    data = {}
+    for i, column in enumerate(manifest['columns']):
+        if column['kind'] == 'text':
+            data[column['name']] = _read_text(snapshot_dir, str(i), column['nulls'])
+        else:
+            data[column['name']] = np.asarray(_load(snapshot_dir, str(i)), dtype=column['dtype'])
+    frame = pd.DataFrame(data)
+    if len(frame) != manifest['n_items']:
+        raise ValueError("Catalog snapshot is truncated or corrupt")
+
+    counts = csr_matrix((_load(snapshot_dir, 'accords.data'), _load(snapshot_dir, 'accords.indices'),
+                         _load(snapshot_dir, 'accords.indptr')),
+                        shape=(manifest['n_items'], manifest['n_accords']))
+    vocabulary = _read_text(snapshot_dir, 'accords.vocabulary', False).tolist()
+    return frame, AccordIndex(counts, vocabulary), manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the fragrance CSV into a binary catalog snapshot")
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser.add_argument('--csv', default=os.path.join(base_dir, 'perfume_data_clean.csv'))
+    parser.add_argument('--out', default=os.path.join(base_dir, SNAPSHOT_DIRNAME))
+    args = parser.parse_args()
+
+    manifest = write_snapshot(args.csv, args.out)
+    print(f"Wrote catalog snapshot of {manifest['n_items']} fragrances to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,6 @@
 from flask import Flask
 from models import db, User
-import bcrypt
+from passwords import get_password_hasher
 
 def create_test_user():
     # Create Flask app
@@ -15,8 +15,7 @@ def create_test_user():
         # Check if test user already exists
         if not User.query.filter_by(email='test@example.com').first():
             # Create test user
-            password = 'Test123'.encode('utf-8')
-            hashed_password = bcrypt.hashpw(password, bcrypt.gensalt())
+            hashed_password = get_password_hasher().hash('Test123')
             
             test_user = User(
                 email='test@example.com',
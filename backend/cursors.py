@@ -0,0 +1,17 @@
+import base64
+import json
+
+
+def encode_cursor(payload):
+    """Opaque, URL-safe token for a JSON-serializable pagination position"""
+    data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Position encoded by encode_cursor; raises ValueError for a malformed token"""
+    try:
+        data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        return json.loads(data)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -1,8 +1,11 @@
 import os
-import pandas as pd
 from flask_sqlalchemy import SQLAlchemy
-from flask import Flask
+from flask import Flask, g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from models import db, User, Fragrance, Rating, Favorite, QuizResult
+from migrations import run_migrations
+from import_catalog import import_catalog
 
 def init_db(app):
     """Initialize the database with SQLAlchemy"""
@@ -14,48 +17,43 @@ def init_db(app):
     # Initialize SQLAlchemy with the app
     db.init_app(app)
     
+    # Count SQL statements per request, reported in the X-SQL-Queries header
+    if not event.contains(Engine, 'before_cursor_execute', count_query):
+        event.listen(Engine, 'before_cursor_execute', count_query)
+    app.before_request(reset_query_count)
+    app.after_request(add_query_count_header)
+    
     # Create database if it doesn't exist
     with app.app_context():
         db.create_all()
+        run_migrations(db.engine)
         
-        # Check if we need to populate the fragrances table
-        if Fragrance.query.count() == 0:
-            populate_fragrances(app)
+        # The catalog is imported offline with import_catalog.py, never at start-up
+        if Fragrance.query.first() is None:
+            print("Warning: the fragrances table is empty. Run `python import_catalog.py` to import the catalog.")
     
     return db
 
-def populate_fragrances(app):
-    """Populate the fragrances table with data from CSV file"""
-    
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    """Count a statement against the current request, if there is one"""
+    if has_request_context():
+        g.sql_queries = g.get('sql_queries', 0) + 1
+
+def reset_query_count():
+    # g outlives the request when an app context was already pushed
+    g.sql_queries = 0
+
+def add_query_count_header(response):
+    response.headers['X-SQL-Queries'] = str(g.get('sql_queries', 0))
+    return response
+
+def populate_fragrances(app, limit=None):
+    """Import the fragrance CSV into the fragrances table; see import_catalog.py"""
     csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perfume_data_clean.csv')
     
     if not os.path.exists(csv_path):
         print(f"Warning: {csv_path} not found. Skipping fragrance import.")
         return
     
-    # Load the CSV file
-    print("Loading fragrance data from CSV...")
-    df = pd.read_csv(csv_path)
-    
-    # Limit to first 200 fragrances for demonstration (remove this limitation in production)
-    df = df.head(200)
-    
     with app.app_context():
-        # Insert fragrances into the database
-        for _, row in df.iterrows():
-            fragrance = Fragrance(
-                name=row['Name'],
-                brand=row['Name'].split(' ')[0] if ' ' in row['Name'] else 'Unknown',  # Extract brand from name
-                gender=row['Gender'],
-                rating_value=row['Rating Value'],
-                rating_count=row['Rating Count'],
-                main_accords=str(row['Main Accords']),
-                perfumers=str(row['Perfumers']),
-                description=row['Description'],
-                url=row['url']
-            )
-            db.session.add(fragrance)
-        
-        # Commit the changes
-        db.session.commit()
-        print(f"Imported {len(df)} fragrances into the database.") 
\ No newline at end of file
+        import_catalog(db.engine, csv_path, limit=limit, verbose=False)
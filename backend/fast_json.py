@@ -0,0 +1,144 @@
+import json
+import math
+import numpy as np
+from flask import current_app
+
+try:
+    import orjson
+except ImportError:  # Optional; the standard library encoder is used instead
+    orjson = None
+
+BACKENDS = ('orjson', 'json')
+
+_backend = 'orjson' if orjson is not None else 'json'
+
+
+class RawJSON(bytes):
+    """Already-encoded JSON, embedded verbatim by dumps()"""
+
+
+def _default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps_value(value):
+    if _backend == 'orjson':
+        return orjson.dumps(value, default=_default,
+                            option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default, sort_keys=True, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def _contains_raw(value):
+    if isinstance(value, RawJSON):
+        return True
+    if isinstance(value, dict):
+        return any(_contains_raw(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_contains_raw(item) for item in value)
+    return False
+
+
+def dumps(value):
+    """Compact UTF-8 JSON with sorted keys, like jsonify; RawJSON values are copied in as they are"""
+    if isinstance(value, RawJSON):
+        return bytes(value)
+    if not _contains_raw(value):
+        return _dumps_value(value)
+    if isinstance(value, dict):
+        return b'{' + b','.join(_dumps_value(str(key)) + b':' + dumps(value[key])
+                                for key in sorted(value)) + b'}'
+    return b'[' + b','.join(dumps(item) for item in value) + b']'
+
+
+def json_response(payload):
+    """A JSON response like jsonify(payload), encoded with the active backend"""
+    return current_app.response_class(dumps(payload), mimetype='application/json')
+
+
+def use_backend(name):
+    """Switch the JSON backend ('orjson' or 'json'); returns the previous one"""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    if name == 'orjson' and orjson is None:
+        raise ValueError("orjson is not installed")
+    previous, _backend = _backend, name
+    return previous
+
+
+def get_backend():
+    return _backend
+
+
+def _plain(value):
+    """Missing numbers become null instead of the NaN that jsonify writes"""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+# Column projections of a full-record encoder kept per catalog or search index.
+# Clients choose them through `fields=`, so they are bounded
+RECORD_PROJECTION_CACHE_SIZE = 32
+
+
+class RecordEncoder:
+    """JSON records for rows of a DataFrame, cached per row.
+
+    Gives the same records as `frame.iloc[rows].to_dict(orient='records')`,
+    but each row is encoded once, straight from plain Python column lists, and
+    kept as bytes; a page of results is a join of those fragments. `converters`
+    maps a column to a function applied to its raw value when the row is first
+    encoded. Fragments are cached for the lifetime of the encoder, so the frame
+    must not be modified.
+    """
+
+    def __init__(self, frame, columns=None, converters=None):
+        columns = frame.columns if columns is None else columns
+        self._setup({column: frame[column].tolist() for column in columns}, converters or {}, len(frame))
+
+    def _setup(self, values, converters, n_rows):
+        self._columns = values
+        self._converter_map = converters
+        self.columns = sorted(values)
+        self._converters = [converters.get(column) for column in self.columns]
+        self._values = [values[column] for column in self.columns]
+        self._fragments = [None] * n_rows
+        self._backend = None
+
+    def project(self, columns):
+        """Encoder for some of these columns, sharing their values instead of copying the frame again"""
+        projection = RecordEncoder.__new__(RecordEncoder)
+        projection._setup({column: self._columns[column] for column in columns}, self._converter_map,
+                          len(self._fragments))
+        return projection
+
+    def _record(self, row):
+        record = {}
+        for column, values, convert in zip(self.columns, self._values, self._converters):
+            record[column] = convert(values[row]) if convert is not None else _plain(values[row])
+        return record
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def fragment(self, row):
+        """Encoded record of one row position"""
+        if self._backend != _backend:
+            # Fragments from another backend could differ in number formatting
+            self._fragments = [None] * len(self._fragments)
+            self._backend = _backend
+        fragment = self._fragments[row]
+        if fragment is None:
+            fragment = _dumps_value(self._record(row))
+            self._fragments[row] = fragment
+        return fragment
+
+    def encode(self, rows):
+        """A JSON array of the records at the given row positions"""
+        return RawJSON(b'[' + b','.join(self.fragment(int(row)) for row in rows) + b']')
@@ -0,0 +1,51 @@
+from sqlalchemy.orm import load_only
+from models import Fragrance
+
+# Fields a client can ask for with `fields=`, in response order. Fragrance
+# payloads with an `id` always keep it
+FRAGRANCE_FIELDS = ('name', 'brand', 'gender', 'rating_value', 'rating_count',
+                    'main_accords', 'perfumers', 'description', 'url')
+
+# Column of the catalog frame behind each field of a catalog record
+CATALOG_COLUMNS = {
+    'name': 'Name',
+    'gender': 'Gender',
+    'rating_value': 'Rating Value',
+    'rating_count': 'Rating Count',
+    'main_accords': 'Main Accords',
+    'perfumers': 'Perfumers',
+    'description': 'Description',
+    'url': 'url',
+}
+
+# Fields of catalog records; the catalog has no brand column
+CATALOG_FIELDS = tuple(field for field in FRAGRANCE_FIELDS if field in CATALOG_COLUMNS)
+
+
+def parse_fields(value, allowed=FRAGRANCE_FIELDS):
+    """Fields named in a comma-separated `fields` parameter, in `allowed` order; None when absent.
+
+    Raises ValueError naming any field outside `allowed`.
+    """
+    if value is None:
+        return None
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = names.difference(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. "
+                         f"Valid fields: {', '.join(allowed)}")
+    return tuple(field for field in allowed if field in names)
+
+
+def catalog_columns(fields, columns):
+    """The catalog columns among `columns` that hold `fields`; all of `columns` when fields is None"""
+    if fields is None:
+        return tuple(columns)
+    return tuple(CATALOG_COLUMNS[field] for field in fields if CATALOG_COLUMNS[field] in columns)
+
+
+def fragrance_columns(fields, *required):
+    """Loader option reading only the id, `required` and the columns of `fields`; None for all columns"""
+    if fields is None:
+        return None
+    return load_only(Fragrance.id, *required, *[getattr(Fragrance, field) for field in fields])
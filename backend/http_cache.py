@@ -0,0 +1,141 @@
+import gzip
+import hashlib
+from functools import wraps
+from flask import current_app, request
+from cache import LRUCache
+
+try:
+    import brotli
+except ImportError:  # Optional; responses are gzipped instead
+    brotli = None
+
+# Responses smaller than this are sent uncompressed
+DEFAULT_COMPRESS_MIN_SIZE = 1024
+DEFAULT_COMPRESS_LEVEL = 6
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript')
+
+# Compressed bodies of the hottest precompressed pages, per (ETag, encoding)
+PRECOMPRESSED_CACHE_SIZE = 512
+_precompressed = LRUCache(PRECOMPRESSED_CACHE_SIZE)
+
+
+def init_http_cache(app):
+    """Compress responses above a size threshold for clients that accept it"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', DEFAULT_COMPRESS_MIN_SIZE)
+    app.config.setdefault('COMPRESS_LEVEL', DEFAULT_COMPRESS_LEVEL)
+    app.after_request(compress_response)
+
+
+def clear_precompressed():
+    _precompressed.clear()
+
+
+def _encodings():
+    """Encodings this server can produce, best first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding():
+    """The best encoding the client accepts, or None for identity"""
+    for encoding in _encodings():
+        if request.accept_encodings[encoding] > 0:
+            return encoding
+    return None
+
+
+def _compress(data, encoding):
+    level = current_app.config.get('COMPRESS_LEVEL', DEFAULT_COMPRESS_LEVEL)
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _compressible(response):
+    return (response.status_code == 200
+            and not response.direct_passthrough
+            and 'Content-Encoding' not in response.headers
+            and response.mimetype in COMPRESSIBLE_MIMETYPES
+            and response.content_length is not None
+            and response.content_length >= current_app.config.get('COMPRESS_MIN_SIZE', DEFAULT_COMPRESS_MIN_SIZE))
+
+
+def _set_body(response, body, encoding):
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        # A strong ETag names one exact representation, so the encoded body gets its own
+        response.set_etag(f'{etag}-{encoding}', weak=weak)
+
+
+def compress_response(response):
+    """after_request hook: compress a large enough body with the negotiated encoding"""
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding()
+    if encoding is None or not _compressible(response):
+        return response
+    _set_body(response, _compress(response.get_data(), encoding), encoding)
+    return response
+
+
+def catalog_etag(version):
+    """Strong ETag for the current URL at a catalog version"""
+    digest = hashlib.sha1(f'{version}|{request.full_path}'.encode('utf-8')).hexdigest()
+    return digest[:32]
+
+
+def _matching_etag(etag):
+    """The tag in If-None-Match naming any encoding of `etag`, or None"""
+    tags = request.if_none_match
+    if not tags or tags.star_tag:
+        return None
+    for tag in (etag, f'{etag}-gzip', f'{etag}-br'):
+        if tags.contains_weak(tag):
+            return tag
+    return None
+
+
+def conditional(version, max_age, precompress=False):
+    """Conditional GET for a view whose body depends only on its URL and the catalog.
+
+    `version` returns the current catalog version. The ETag is derived from
+    it and the URL, so it is known before the view runs: a matching
+    If-None-Match gets a 304 without doing any work. Successful responses
+    carry the ETag and a public Cache-Control with `max_age`. With
+    `precompress`, compressed bodies are kept in an LRU by ETag and encoding
+    and served from there, which suits detail pages hit over and over.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = catalog_etag(version())
+            cache_control = f'public, max-age={max_age}'
+
+            matching = _matching_etag(etag)
+            if matching:
+                response = current_app.response_class(status=304)
+                response.set_etag(matching)
+                response.headers['Cache-Control'] = cache_control
+                return response
+
+            encoding = negotiate_encoding() if precompress else None
+            body = _precompressed.get((etag, encoding)) if encoding else None
+            if body is not None:
+                response = current_app.response_class(body, mimetype='application/json')
+                response.set_etag(f'{etag}-{encoding}')
+                response.headers['Content-Encoding'] = encoding
+                response.headers['Cache-Control'] = cache_control
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = cache_control
+            if encoding and _compressible(response):
+                _set_body(response, _compress(response.get_data(), encoding), encoding)
+                _precompressed.set((etag, encoding), response.get_data())
+            return response
+        return wrapper
+    return decorator
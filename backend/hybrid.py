@@ -0,0 +1,105 @@
+import numpy as np
+
+# Weight of each recommendation signal
+CONTENT_WEIGHT = 0.8
+FAVORITE_WEIGHT = 0.7
+QUIZ_DEFAULT_WEIGHT = 0.5
+POPULAR_WEIGHT = 0.3
+
+# Accords a beginner's quiz vibe stands for
+VIBE_ACCORDS = {
+    'Fresh and clean': ['Fresh', 'Citrus', 'Aquatic', 'Green'],
+    'Warm and cosy': ['Vanilla', 'Amber', 'Gourmand', 'Woody'],
+    'Bold and attention-grabbing': ['Spicy', 'Woody', 'Leather', 'Oriental'],
+    'Light and subtle': ['Floral', 'Citrus', 'Powdery', 'Fresh']
+}
+
+
+class ScoreVector:
+    """Hybrid recommendation scores for every item in the catalog.
+
+    Signals propose items in order. Each item keeps its best score, the
+    position of the proposal that first reached it, and the position of its
+    first proposal at all; ranking needs nothing else. Items sharing a name
+    count as one recommendation, as they always have: the best-scored row
+    represents the name, and ties keep the order names were first proposed.
+    """
+
+    def __init__(self, n_items):
+        self.scores = np.full(n_items, -np.inf)
+        self.best_position = np.zeros(n_items, dtype=np.int64)
+        self.first_position = np.full(n_items, np.iinfo(np.int64).max, dtype=np.int64)
+        self.proposed = 0
+
+    def __bool__(self):
+        return self.proposed > 0
+
+    def add(self, rows, scores):
+        """Propose distinct `rows`, in order, with the given score(s)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return
+        scores = np.broadcast_to(np.asarray(scores, dtype=np.float64), rows.shape)
+        positions = self.proposed + np.arange(len(rows))
+        self.proposed += len(rows)
+
+        # Later proposals only win with a strictly higher score
+        improved = scores > self.scores[rows]
+        self.scores[rows[improved]] = scores[improved]
+        self.best_position[rows[improved]] = positions[improved]
+        self.first_position[rows] = np.minimum(self.first_position[rows], positions)
+
+    def ranked(self, name_codes, start, stop):
+        """Rows of ranks [start, stop), one per name, best score first"""
+        rows = np.flatnonzero(self.scores > -np.inf)
+        if len(rows) == 0 or stop <= start:
+            return np.empty(0, dtype=np.int64)
+
+        # One row per name: the best score, reached by the earliest proposal
+        codes = name_codes[rows]
+        order = np.lexsort((self.best_position[rows], -self.scores[rows], codes))
+        rows, codes = rows[order], codes[order]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        first = np.minimum.reduceat(self.first_position[rows], starts)
+        rows = rows[starts]
+        scores = self.scores[rows]
+
+        # Only names scoring at least the stop-th best score can reach the page
+        if stop < len(rows):
+            kth = np.partition(-scores, stop - 1)[stop - 1]
+            keep = np.flatnonzero(-scores <= kth)
+            rows, scores, first = rows[keep], scores[keep], first[keep]
+        order = np.lexsort((first, -scores))[start:stop]
+        return rows[order]
+
+
+def add_quiz_signal(score_vector, catalog, prefs):
+    """Score items against saved quiz preferences"""
+    frame = catalog.frame
+
+    # Map vibe to accords for beginners
+    if prefs.get('experience_level') == 'Beginner' and prefs.get('vibe'):
+        prefs['desired_accords'] = VIBE_ACCORDS.get(prefs['vibe'], [])
+
+    # Candidates are the gender matches, narrowed by rating; no gender match means no candidates
+    candidates = np.zeros(len(catalog), dtype=bool)
+    if 'gender' in prefs:
+        candidates = (frame['Gender'] == prefs['gender']).to_numpy()
+
+    if candidates.any() or 'gender' not in prefs:
+        if 'min_rating' in prefs:
+            min_rating = float(prefs['min_rating'])
+            rating_matches = (frame['Rating Value'] >= min_rating).to_numpy()
+            candidates = candidates & rating_matches if candidates.any() else rating_matches
+
+        if 'desired_accords' in prefs:
+            matches = catalog.accord_index.desired_matches(prefs['desired_accords'])
+            # Without candidates every fragrance is considered
+            if candidates.any():
+                matches = np.where(candidates, matches, 0)
+            rows = np.flatnonzero(matches > 0)  # Only rows with at least one match
+            score_vector.add(rows, matches[rows] * 0.2 + 0.5)
+
+    # A quiz with no matches still recommends the best rated fragrances
+    if not score_vector:
+        score_vector.add(catalog.rating_order[:5], QUIZ_DEFAULT_WEIGHT)
@@ -0,0 +1,141 @@
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, select, insert, update, bindparam
+from models import db, Fragrance, CatalogImport
+from migrations import run_migrations
+from catalog import find_catalog_csv
+from catalog_snapshot import file_checksum
+
+# Rows read from the CSV, looked up and written per batch
+CHUNK_SIZE = 2000
+
+# Columns compared to decide whether an existing fragrance changed
+FIELDS = ('name', 'brand', 'gender', 'rating_value', 'rating_count',
+          'main_accords', 'perfumers', 'description')
+
+
+def _text(values):
+    """Strings, with missing values as None"""
+    return [None if pd.isna(value) else str(value) for value in values]
+
+
+def chunk_records(chunk):
+    """Fragrance rows for one CSV chunk, keyed by url; rows without a url are dropped"""
+    names = chunk['Name'].astype(str)
+    if 'Brand' in chunk.columns:
+        brands = chunk['Brand'].fillna('Unknown').astype(str)
+    else:
+        # Extract brand from name
+        brands = names.str.split(' ', n=1).str[0].where(names.str.contains(' '), 'Unknown')
+    ratings = pd.to_numeric(chunk['Rating Value'], errors='coerce')
+    counts = pd.to_numeric(chunk['Rating Count'], errors='coerce')
+
+    columns = {
+        'url': _text(chunk['url']),
+        'name': names.tolist(),
+        'brand': brands.tolist(),
+        'gender': _text(chunk['Gender']),
+        'rating_value': [None if np.isnan(value) else float(value) for value in ratings],
+        'rating_count': [None if np.isnan(value) else int(value) for value in counts],
+        'main_accords': _text(chunk['Main Accords']),
+        'perfumers': _text(chunk['Perfumers']),
+        'description': _text(chunk['Description']),
+    }
+    return [record for record in (dict(zip(columns, values)) for values in zip(*columns.values()))
+            if record['url'] is not None]
+
+
+def import_catalog(engine, csv_path, chunk_size=CHUNK_SIZE, limit=None, verbose=True):
+    """Upsert the catalog CSV into the fragrances table, keyed by url.
+
+    New fragrances are inserted in CSV order and changed ones updated in
+    place, so their ids (and favorites pointing at them) survive re-imports;
+    unchanged rows are not written at all. Everything happens in one
+    transaction and is recorded in catalog_imports. Returns that record's
+    values as a dict.
+    """
+    table = Fragrance.__table__
+    started = time.perf_counter()
+    stats = {'rows_read': 0, 'inserted': 0, 'updated': 0, 'skipped': 0}
+
+    lookup = select(table.c.id, table.c.url, *[table.c[field] for field in FIELDS]) \
+        .where(table.c.url.in_(bindparam('urls', expanding=True))) \
+        .order_by(table.c.id)
+    update_row = update(table).where(table.c.id == bindparam('_id')) \
+        .values({field: bindparam(f'_{field}') for field in FIELDS})
+
+    with engine.begin() as connection:
+        seen = set()
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size, nrows=limit):
+            records = chunk_records(chunk)
+            stats['rows_read'] += len(chunk)
+            stats['skipped'] += len(chunk) - len(records)
+
+            # Existing rows by url; the oldest one wins if a url is repeated
+            existing = {}
+            for row in connection.execute(lookup, {'urls': [record['url'] for record in records]}):
+                existing.setdefault(row.url, row._mapping)
+
+            new_rows, changed_rows = [], []
+            for record in records:
+                if record['url'] in seen:
+                    continue  # Repeated url in the CSV, even across chunks: the first occurrence wins
+                seen.add(record['url'])
+                row = existing.get(record['url'])
+                if row is None:
+                    new_rows.append(record)
+                elif any(row[field] != record[field] for field in FIELDS):
+                    changed_rows.append({'_id': row['id'], **{f'_{field}': record[field] for field in FIELDS}})
+
+            if new_rows:
+                connection.execute(insert(table), new_rows)
+            if changed_rows:
+                connection.execute(update_row, changed_rows)
+            stats['inserted'] += len(new_rows)
+            stats['updated'] += len(changed_rows)
+
+            if verbose:
+                elapsed = time.perf_counter() - started
+                print(f"  {stats['rows_read']} rows read, {stats['inserted']} inserted, "
+                      f"{stats['updated']} updated ({stats['rows_read'] / elapsed:.0f} rows/s)")
+
+        record = {
+            'source': os.path.basename(csv_path),
+            'checksum': file_checksum(csv_path),
+            'rows_read': stats['rows_read'],
+            'inserted': stats['inserted'],
+            'updated': stats['updated'],
+        }
+        connection.execute(insert(CatalogImport.__table__), record)
+
+    elapsed = time.perf_counter() - started
+    if verbose:
+        print(f"Imported {csv_path}: {stats['inserted']} inserted, {stats['updated']} updated, "
+              f"{stats['rows_read'] - stats['inserted'] - stats['updated']} unchanged or skipped "
+              f"in {elapsed:.2f}s ({stats['rows_read'] / max(elapsed, 1e-9):.0f} rows/s)")
+    if stats['skipped']:
+        print(f"Warning: skipped {stats['skipped']} rows without a url")
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the fragrance CSV into the database")
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser.add_argument('--csv', default=find_catalog_csv(base_dir))
+    parser.add_argument('--db', default=os.path.join(base_dir, 'instance', 'database.db'))
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--limit', type=int, default=None, help="Only import the first N rows")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.db)), exist_ok=True)
+    engine = create_engine(f"sqlite:///{os.path.abspath(args.db)}")
+    db.metadata.create_all(engine)
+    run_migrations(engine)
+    import_catalog(engine, args.csv, chunk_size=args.chunk_size, limit=args.limit)
+
+
+if __name__ == '__main__':
+    main()
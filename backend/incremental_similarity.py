@@ -0,0 +1,203 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix, vstack
+from sklearn.preprocessing import normalize
+from neighbor_store import row_topk
+
+# Everything an incremental update needs besides the vectorizer and the neighbor
+# store, in one uncompressed .npz:
+#
+#   data, indices, indptr, shape   normalized TF-IDF rows of the catalog (CSR)
+#   row_hashes                     uint64 hash of each row's text, to find changed rows
+#   threshold                      similarity threshold the neighbor lists were built with
+#   fit_tokens, fit_oov            tokens and out-of-vocabulary tokens of the corpus
+#                                  the vectorizer was fitted on
+#   update_tokens, update_oov      the same for every row transformed incrementally since
+
+SIMILARITY_STATE_FILENAME = 'similarity_state.npz'
+
+# Vocabulary refitted after drift. Only the similarity data uses it: vectorizer.pkl
+# stays as it is because the search matrix was built with it
+SIMILARITY_VECTORIZER_FILENAME = 'similarity_vectorizer.pkl'
+
+# Rebuild from scratch once the out-of-vocabulary share of incrementally added
+# text exceeds the fit corpus's own share by this much
+DRIFT_THRESHOLD = 0.1
+
+
+def row_hashes(text_data):
+    """Stable uint64 hash of each row of a text Series"""
+    return pd.util.hash_pandas_object(text_data, index=False).to_numpy()
+
+
+def count_oov(vectorizer, texts):
+    """(tokens, out-of-vocabulary tokens) of texts under the vectorizer's analyzer"""
+    analyze = vectorizer.build_analyzer()
+    vocabulary = vectorizer.vocabulary_
+    tokens = oov = 0
+    for text in texts:
+        terms = analyze(text)
+        tokens += len(terms)
+        oov += sum(term not in vocabulary for term in terms)
+    return tokens, oov
+
+
+class SimilarityState:
+    """Feature rows and bookkeeping saved next to the neighbor store"""
+
+    def __init__(self, features, hashes, threshold, fit_tokens, fit_oov, update_tokens=0, update_oov=0):
+        self.features = features
+        self.hashes = hashes
+        self.threshold = threshold
+        self.fit_tokens = fit_tokens
+        self.fit_oov = fit_oov
+        self.update_tokens = update_tokens
+        self.update_oov = update_oov
+
+    @property
+    def n_items(self):
+        return self.features.shape[0]
+
+    def drift(self, tokens=0, oov=0):
+        """Out-of-vocabulary share of updated text above the fit corpus's, counting `tokens` more"""
+        update_tokens = self.update_tokens + tokens
+        if update_tokens == 0:
+            return 0.0
+        baseline = self.fit_oov / self.fit_tokens if self.fit_tokens else 0.0
+        return (self.update_oov + oov) / update_tokens - baseline
+
+    def save(self, path):
+        """Write the state to `path`, replacing any existing file atomically"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, data=self.features.data, indices=self.features.indices,
+                     indptr=self.features.indptr, shape=np.array(self.features.shape),
+                     row_hashes=self.hashes, threshold=self.threshold,
+                     fit_tokens=self.fit_tokens, fit_oov=self.fit_oov,
+                     update_tokens=self.update_tokens, update_oov=self.update_oov)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            features = csr_matrix((f['data'], f['indices'], f['indptr']), shape=tuple(f['shape']))
+            return cls(features, f['row_hashes'], float(f['threshold']),
+                       int(f['fit_tokens']), int(f['fit_oov']),
+                       int(f['update_tokens']), int(f['update_oov']))
+
+
+def changed_rows(state, hashes):
+    """Row ids whose text differs from the state's or that were appended"""
+    n_old = min(state.n_items, len(hashes))
+    changed = np.flatnonzero(hashes[:n_old] != state.hashes[:n_old])
+    return np.concatenate((changed, np.arange(n_old, len(hashes)))).astype(np.int64)
+
+
+def replace_rows(X, rows, X_rows):
+    """X with `rows` replaced by the rows of X_rows; ids past the end of X are appended"""
+    n_old = X.shape[0]
+    n_items = max(n_old, int(rows[-1]) + 1) if len(rows) else n_old
+    appended = np.arange(n_old, n_items)
+    if not np.isin(appended, rows).all():
+        raise ValueError("Appended rows must be contiguous with the existing ones")
+    source = np.arange(n_items)
+    source[rows] = n_old + np.arange(len(rows))
+    return vstack([X, X_rows], format='csr')[source]
+
+
+def _similarity_columns(X, ids, block_size):
+    """Yield (block of ids, dense similarities of every item to them) one block at a time"""
+    for start in range(0, len(ids), block_size):
+        block = ids[start:start + block_size]
+        # sparse @ dense, as in build_similarity_matrix: the columns come out nearly dense
+        yield block, X @ X[block].T.toarray()
+
+
+def _column_topk(sims, block, threshold, k):
+    """Top-k neighbor arrays of each item of `block` from its similarity column, excluding self"""
+    indices = np.full((len(block), k), -1, dtype=np.int32)
+    scores = np.zeros((len(block), k), dtype=np.float32)
+    for i, item in enumerate(block):
+        column = sims[:, i]
+        cols = np.flatnonzero(column > threshold)
+        cols = cols[cols != item]
+        cols, data = row_topk(cols, column[cols], k)
+        indices[i, :len(cols)] = cols
+        scores[i, :len(cols)] = data
+    return indices, scores
+
+
+def update_neighbors(X, indices, scores, rows, X_rows, threshold, block_size=256):
+    """Patch top-k neighbor arrays after the feature rows `rows` changed or were appended.
+
+    X holds the normalized feature rows the arrays were built from and X_rows
+    the new rows for `rows` (sorted, unique; ids past the end of X append).
+    The changed rows get fresh top-k lists from their similarity columns
+    against the updated matrix, block_size rows at a time. Every other item
+    only merges the changed rows into the list it already has; a full list is
+    recomputed only when one of its neighbors changed and scored lower, since
+    items ranked below the k-th were never stored. The result matches a full
+    rebuild, up to the order of neighbors whose scores only differ beyond
+    float32 precision.
+
+    Returns (X, indices, scores, stats) for the updated catalog.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    if len(rows) == 0:
+        return X, indices, scores, {'changed': 0, 'patched': 0, 'recomputed': 0}
+    X_rows = normalize(csr_matrix(X_rows))
+    X = replace_rows(X, rows, X_rows)
+    n_old, k = indices.shape
+    n_items = X.shape[0]
+    changed = np.zeros(n_items, dtype=bool)
+    changed[rows] = True
+
+    new_indices = np.full((n_items, k), -1, dtype=np.int32)
+    new_scores = np.zeros((n_items, k), dtype=np.float32)
+    new_indices[:n_old], new_scores[:n_old] = indices, scores
+
+    # Changed rows that could enter another item's list: above the threshold and
+    # at least as good as its current k-th neighbor, or the list has a free slot
+    items, sources, values = [], [], []
+    for block, sims in _similarity_columns(X, rows, block_size):
+        new_indices[block], new_scores[block] = _column_topk(sims, block, threshold, k)
+        item, column = np.nonzero((sims > threshold) & ~changed[:, None])
+        # Merged with stored float32 scores, so compared at that precision: exact ties stay ties
+        value = sims[item, column].astype(np.float32)
+        keep = (indices[item, k - 1] < 0) | (value >= scores[item, k - 1])
+        items.append(item[keep])
+        sources.append(block[column[keep]])
+        values.append(value[keep])
+    items, sources, values = np.concatenate(items), np.concatenate(sources), np.concatenate(values)
+    order = np.argsort(items, kind='stable')
+    items, sources, values = items[order], sources[order], values[order]
+
+    # Items whose stored list mentions a changed row hold a stale score for it
+    stale = changed[np.maximum(indices, 0)] & (indices >= 0)
+    stale[changed[:n_old]] = False
+
+    affected = np.union1d(items, np.flatnonzero(stale.any(axis=1)))
+    bounds = np.searchsorted(items, affected), np.searchsorted(items, affected, side='right')
+    recompute = []
+    for item, start, end in zip(affected, *bounds):
+        valid = (indices[item] >= 0) & ~stale[item]
+        cols = np.concatenate((indices[item][valid], sources[start:end]))
+        data = np.concatenate((scores[item][valid], values[start:end]))
+        cols, data = row_topk(cols, data, k)
+        kth_col, kth_score = indices[item, k - 1], scores[item, k - 1]
+        if stale[item].any() and kth_col >= 0 and (
+                len(cols) < k or data[-1] < kth_score or (data[-1] == kth_score and cols[-1] > kth_col)):
+            # Unstored items rank below the old k-th, so the merge is only exact above it
+            recompute.append(item)
+            continue
+        new_indices[item] = -1
+        new_scores[item] = 0
+        new_indices[item, :len(cols)] = cols
+        new_scores[item, :len(cols)] = data
+
+    for block, sims in _similarity_columns(X, np.array(recompute, dtype=np.int64), block_size):
+        new_indices[block], new_scores[block] = _column_topk(sims, block, threshold, k)
+
+    stats = {'changed': len(rows), 'patched': len(affected) - len(recompute), 'recomputed': len(recompute)}
+    return X, new_indices, new_scores, stats
@@ -7,6 +7,8 @@ from db_setup import init_db
 
 # Import authentication routes
 from auth import auth_bp
+from http_cache import init_http_cache, DEFAULT_COMPRESS_MIN_SIZE
+from passwords import configure_password_hasher, DEFAULT_ROUNDS, DEFAULT_WORKERS, DEFAULT_MAX_PENDING
 
 # Import route modules
 from routes.quiz import quiz_bp
@@ -31,6 +33,20 @@ def create_app(test_config=None):
     # Secret key
     app.secret_key = os.environ.get('SECRET_KEY', 'dev_secret_key')
     
+    # Search engine behind /api/search: 'tfidf' (default) or 'bm25'
+    app.config['SEARCH_BACKEND'] = os.environ.get('SEARCH_BACKEND', 'tfidf')
+    
+    # Password hashing: bcrypt cost, hashes running at once, and hashes admitted at once
+    app.config['BCRYPT_ROUNDS'] = int(os.environ.get('BCRYPT_ROUNDS', DEFAULT_ROUNDS))
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', DEFAULT_WORKERS))
+    app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', DEFAULT_MAX_PENDING))
+    configure_password_hasher(app.config['BCRYPT_ROUNDS'], app.config['PASSWORD_HASH_WORKERS'],
+                              app.config['PASSWORD_HASH_MAX_PENDING'])
+    
+    # Responses at least this many bytes are gzipped (or brotli-compressed) when the client accepts it
+    app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', DEFAULT_COMPRESS_MIN_SIZE))
+    init_http_cache(app)
+    
     # Initialize database
     init_db(app)
     
@@ -0,0 +1,99 @@
+from datetime import datetime
+from sqlalchemy import text
+
+# Schema changes for databases created before models.py declared them. Fresh
+# databases get the same objects from db.create_all(), so every statement must
+# be safe to run against a schema that already has them.
+#
+# Each migration is (version, name, statements); applied versions are recorded
+# in schema_migrations and never run twice.
+
+MIGRATIONS = [
+    (1, 'Indexes for hot query paths', [
+        # Keep the oldest of any duplicate favorites so the unique index can be built
+        """DELETE FROM favorites WHERE id NOT IN (
+               SELECT MIN(id) FROM favorites GROUP BY user_id, fragrance_id)""",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_favorites_user_fragrance ON favorites (user_id, fragrance_id)",
+        "CREATE INDEX IF NOT EXISTS ix_quiz_results_user_id ON quiz_results (user_id)",
+        "CREATE INDEX IF NOT EXISTS ix_fragrances_gender_rating ON fragrances (gender, rating_value)",
+        "CREATE INDEX IF NOT EXISTS ix_fragrances_rating_value ON fragrances (rating_value)",
+    ]),
+    (2, 'Catalog import key and log', [
+        "CREATE INDEX IF NOT EXISTS ix_fragrances_url ON fragrances (url)",
+        """CREATE TABLE IF NOT EXISTS catalog_imports (
+               id INTEGER NOT NULL PRIMARY KEY,
+               source VARCHAR(255) NOT NULL,
+               checksum VARCHAR(64),
+               rows_read INTEGER NOT NULL,
+               inserted INTEGER NOT NULL,
+               updated INTEGER NOT NULL,
+               finished_at DATETIME)""",
+    ]),
+    (3, 'Full-text index of fragrances', [
+        # External-content FTS5 table: it stores only the index, rows live in fragrances
+        """CREATE VIRTUAL TABLE IF NOT EXISTS fragrances_fts USING fts5(
+               name, brand, main_accords, perfumers, description,
+               content='fragrances', content_rowid='id', prefix='2 3')""",
+        """CREATE TRIGGER IF NOT EXISTS fragrances_fts_insert AFTER INSERT ON fragrances BEGIN
+               INSERT INTO fragrances_fts (rowid, name, brand, main_accords, perfumers, description)
+               VALUES (new.id, new.name, new.brand, new.main_accords, new.perfumers, new.description);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS fragrances_fts_delete AFTER DELETE ON fragrances BEGIN
+               INSERT INTO fragrances_fts (fragrances_fts, rowid, name, brand, main_accords, perfumers, description)
+               VALUES ('delete', old.id, old.name, old.brand, old.main_accords, old.perfumers, old.description);
+           END""",
+        # Fires whenever a text column is in the SET list, even if unchanged; see migration 4
+        """CREATE TRIGGER IF NOT EXISTS fragrances_fts_update
+               AFTER UPDATE OF name, brand, main_accords, perfumers, description ON fragrances BEGIN
+               INSERT INTO fragrances_fts (fragrances_fts, rowid, name, brand, main_accords, perfumers, description)
+               VALUES ('delete', old.id, old.name, old.brand, old.main_accords, old.perfumers, old.description);
+               INSERT INTO fragrances_fts (rowid, name, brand, main_accords, perfumers, description)
+               VALUES (new.id, new.name, new.brand, new.main_accords, new.perfumers, new.description);
+           END""",
+        "INSERT INTO fragrances_fts (fragrances_fts) VALUES ('rebuild')",
+    ]),
+    (4, 'Reindex fragrance text only when it changed', [
+        # A catalog import SETs every column, so a rating refresh names the text
+        # columns too; WHEN keeps it from re-indexing rows whose text is the same
+        "DROP TRIGGER IF EXISTS fragrances_fts_update",
+        """CREATE TRIGGER fragrances_fts_update
+               AFTER UPDATE OF name, brand, main_accords, perfumers, description ON fragrances
+               WHEN old.name IS NOT new.name OR old.brand IS NOT new.brand
+                    OR old.main_accords IS NOT new.main_accords OR old.perfumers IS NOT new.perfumers
+                    OR old.description IS NOT new.description BEGIN
+               INSERT INTO fragrances_fts (fragrances_fts, rowid, name, brand, main_accords, perfumers, description)
+               VALUES ('delete', old.id, old.name, old.brand, old.main_accords, old.perfumers, old.description);
+               INSERT INTO fragrances_fts (rowid, name, brand, main_accords, perfumers, description)
+               VALUES (new.id, new.name, new.brand, new.main_accords, new.perfumers, new.description);
+           END""",
+    ]),
+]
+
+
+def applied_versions(connection):
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, applied_at DATETIME NOT NULL)"
+    ))
+    return {row[0] for row in connection.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def run_migrations(engine):
+    """Apply pending migrations in order, each in its own transaction"""
+    with engine.begin() as connection:
+        done = applied_versions(connection)
+
+    applied = []
+    for version, name, statements in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+            connection.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+                {'version': version, 'name': name, 'applied_at': datetime.utcnow()}
+            )
+        print(f"Applied migration {version}: {name}")
+        applied.append(version)
+    return applied
@@ -20,6 +20,13 @@ class User(db.Model):
 
 class Fragrance(db.Model):
     __tablename__ = 'fragrances'
+    __table_args__ = (
+        # Listing filters and its ORDER BY rating_value DESC, id DESC
+        db.Index('ix_fragrances_gender_rating', 'gender', 'rating_value'),
+        db.Index('ix_fragrances_rating_value', 'rating_value'),
+        # Stable key of a fragrance across catalog imports
+        db.Index('ix_fragrances_url', 'url'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -38,7 +45,10 @@ class Fragrance(db.Model):
     def __repr__(self):
         return f'<Fragrance {self.name}>'
     
-    def to_dict(self):
+    def to_dict(self, fields=None):
+        """Payload of the fragrance; with `fields`, only the id and those attributes"""
+        if fields is not None:
+            return {'id': self.id, **{field: getattr(self, field) for field in fields}}
         return {
             'id': self.id,
             'name': self.name,
@@ -52,6 +62,20 @@ class Fragrance(db.Model):
             'url': self.url
         }
 
+class CatalogImport(db.Model):
+    __tablename__ = 'catalog_imports'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(255), nullable=False)
+    checksum = db.Column(db.String(64))
+    rows_read = db.Column(db.Integer, nullable=False)
+    inserted = db.Column(db.Integer, nullable=False)
+    updated = db.Column(db.Integer, nullable=False)
+    finished_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CatalogImport {self.id} {self.source}>'
+
 class Rating(db.Model):
     __tablename__ = 'ratings'
     
@@ -66,6 +90,10 @@ class Rating(db.Model):
 
 class Favorite(db.Model):
     __tablename__ = 'favorites'
+    __table_args__ = (
+        # A fragrance is favorited at most once per user; also serves lookups by user
+        db.Index('ix_favorites_user_fragrance', 'user_id', 'fragrance_id', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -77,6 +105,9 @@ class Favorite(db.Model):
 
 class QuizResult(db.Model):
     __tablename__ = 'quiz_results'
+    __table_args__ = (
+        db.Index('ix_quiz_results_user_id', 'user_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -0,0 +1,92 @@
+import numpy as np
+
+# Gender suffixes that are part of many dataset names but rarely of user queries
+NAME_SUFFIXES = ('for women and men', 'for men', 'for women')
+
+# Minimum trigram (Jaccard) similarity for a fuzzy match that is not a substring
+FUZZY_THRESHOLD = 0.3
+
+
+def normalize_name(name):
+    """Lowercase a fragrance name and drop the 'for women/men' suffixes"""
+    normalized = str(name).lower().strip()
+    for suffix in NAME_SUFFIXES:
+        normalized = normalized.replace(suffix, '').strip()
+    return normalized
+
+
+def trigrams(text):
+    """Character trigrams of a normalized name, padded so word edges count"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Exact and fuzzy lookup of dataset rows by fragrance name.
+
+    Built once per dataset: a dict from normalized name to its first row,
+    and an inverted index from character trigram to the rows containing it.
+    """
+
+    def __init__(self, names):
+        self.names = [normalize_name(name) for name in names]
+
+        self.exact_rows = {}
+        postings = {}
+        self.trigram_counts = np.zeros(len(self.names), dtype=np.int32)
+        for row, name in enumerate(self.names):
+            # First row wins on duplicate names
+            self.exact_rows.setdefault(name, row)
+            grams = trigrams(name)
+            self.trigram_counts[row] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+        self.postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def exact(self, name):
+        """Row of the first fragrance whose normalized name equals `name`, or -1"""
+        return self.exact_rows.get(normalize_name(name), -1)
+
+    def fuzzy(self, name, limit=5):
+        """Up to `limit` (row, similarity) pairs for a partial or misspelled name.
+
+        Names containing the query come first, then the rest by trigram
+        Jaccard similarity above FUZZY_THRESHOLD; ties go to the lowest row.
+        """
+        query = normalize_name(name)
+        query_grams = trigrams(query)
+        known_grams = [gram for gram in query_grams if gram in self.postings]
+        if not query or not known_grams:
+            return []
+
+        # Shared trigram count for every row that has at least one of them
+        shared = np.bincount(np.concatenate([self.postings[gram] for gram in known_grams]),
+                             minlength=len(self.names))
+        rows = np.flatnonzero(shared)
+        shared = shared[rows]
+        similarity = shared / (len(query_grams) + self.trigram_counts[rows] - shared)
+
+        # A name can only contain the query if it holds every unpadded query trigram
+        inner_grams = {query[i:i + 3] for i in range(len(query) - 2)}
+        maybe_contains = np.ones(len(rows), dtype=bool)
+        for gram in inner_grams:
+            maybe_contains &= np.isin(rows, self.postings.get(gram, ()), assume_unique=True)
+        contains = np.zeros(len(rows), dtype=bool)
+        for i in np.flatnonzero(maybe_contains):
+            contains[i] = query in self.names[rows[i]]
+
+        keep = contains | (similarity >= FUZZY_THRESHOLD)
+        rows, similarity, contains = rows[keep], similarity[keep], contains[keep]
+        order = np.lexsort((rows, -similarity, ~contains))[:limit]
+        return [(int(rows[i]), float(similarity[i])) for i in order]
+
+    def lookup(self, name):
+        """Best row for a name: exact match first, then the best fuzzy match, or -1"""
+        row = self.exact(name)
+        if row >= 0:
+            return row
+        matches = self.fuzzy(name, limit=1)
+        return matches[0][0] if matches else -1
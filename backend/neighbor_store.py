@@ -0,0 +1,136 @@
+import os
+import struct
+import numpy as np
+
+# On-disk layout of a neighbor store (little endian):
+#
+#   header   32 bytes   magic, format version, score dtype code, n_items, k
+#   indices  int32[n_items, k]              neighbor row ids, -1 marks an empty slot
+#   scores   float16/float32[n_items, k]    similarity scores, best first
+#
+# Both arrays are opened with np.memmap so every worker process shares the
+# same page-cache pages instead of unpickling a private copy of the matrix.
+
+NEIGHBOR_STORE_FILENAME = 'cosine_neighbors.bin'
+
+MAGIC = b'FRNB'
+FORMAT_VERSION = 1
+HEADER_SIZE = 32
+_HEADER = struct.Struct('<4sHHII')
+
+_SCORE_DTYPES = {
+    1: np.dtype('<f2'),
+    2: np.dtype('<f4'),
+}
+_SCORE_CODES = {dtype: code for code, dtype in _SCORE_DTYPES.items()}
+
+
+def row_topk(cols, scores, k):
+    """Return the k best (cols, scores) of one row, best first, ties by lowest col"""
+    if len(scores) > k:
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        keep = scores >= kth
+        cols, scores = cols[keep], scores[keep]
+    order = np.lexsort((cols, -scores))[:k]
+    return cols[order], scores[order]
+
+
+def topk_from_csr(matrix, k, exclude_self=True):
+    """Build fixed-width neighbor arrays from a sparse similarity matrix"""
+    matrix = matrix.tocsr()
+    n_items = matrix.shape[0]
+    indices = np.full((n_items, k), -1, dtype=np.int32)
+    scores = np.zeros((n_items, k), dtype=np.float32)
+
+    for row in range(n_items):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        cols = matrix.indices[start:end]
+        data = matrix.data[start:end]
+        # Explicit zeros are not neighbors; they rank with every other unscored item
+        keep = data > 0
+        if exclude_self:
+            keep &= cols != row
+        cols, data = cols[keep], data[keep]
+        cols, data = row_topk(cols, data, k)
+        indices[row, :len(cols)] = cols
+        scores[row, :len(cols)] = data
+
+    return indices, scores
+
+
+def write_neighbor_store(path, indices, scores, score_dtype=np.float32):
+    """Write neighbor arrays to `path`, replacing any existing store atomically"""
+    indices = np.ascontiguousarray(indices, dtype='<i4')
+    score_dtype = np.dtype(score_dtype).newbyteorder('<')
+    if score_dtype not in _SCORE_CODES:
+        raise ValueError(f"Unsupported score dtype: {score_dtype}")
+    scores = np.ascontiguousarray(scores, dtype=score_dtype)
+    if indices.ndim != 2 or indices.shape != scores.shape:
+        raise ValueError("indices and scores must be 2-D arrays of the same shape")
+
+    n_items, k = indices.shape
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, _SCORE_CODES[score_dtype], n_items, k)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header.ljust(HEADER_SIZE, b'\0'))
+        f.write(indices.tobytes())
+        f.write(scores.tobytes())
+    # Readers that already mapped the old file keep their inode until they reopen
+    os.replace(tmp_path, path)
+
+
+class NeighborStore:
+    """Read-only, memory-mapped view over a neighbor store file"""
+
+    def __init__(self, path, indices, scores):
+        self.path = path
+        self.indices = indices
+        self.scores = scores
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"{path} is too short to be a neighbor store")
+
+        magic, version, dtype_code, n_items, k = _HEADER.unpack_from(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a neighbor store")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported neighbor store version {version} in {path}")
+        if dtype_code not in _SCORE_DTYPES:
+            raise ValueError(f"Unknown score dtype code {dtype_code} in {path}")
+
+        score_dtype = _SCORE_DTYPES[dtype_code]
+        indices_size = n_items * k * 4
+        expected_size = HEADER_SIZE + indices_size + n_items * k * score_dtype.itemsize
+        if os.path.getsize(path) != expected_size:
+            raise ValueError(f"{path} is truncated or corrupt")
+
+        if n_items == 0 or k == 0:
+            indices = np.empty((n_items, k), dtype='<i4')
+            scores = np.empty((n_items, k), dtype=score_dtype)
+        else:
+            indices = np.memmap(path, dtype='<i4', mode='r', offset=HEADER_SIZE,
+                                shape=(n_items, k))
+            scores = np.memmap(path, dtype=score_dtype, mode='r',
+                               offset=HEADER_SIZE + indices_size, shape=(n_items, k))
+        return cls(path, indices, scores)
+
+    @property
+    def n_items(self):
+        return self.indices.shape[0]
+
+    @property
+    def k(self):
+        return self.indices.shape[1]
+
+    def __len__(self):
+        return self.n_items
+
+    def neighbors(self, idx, top_n):
+        """Return up to `top_n` neighbor ids of one item, best first"""
+        row = np.asarray(self.indices[idx, :top_n])
+        return row[row >= 0]
@@ -1,74 +1,301 @@
-from sklearn.metrics.pairwise import cosine_similarity
-from scipy.sparse import csr_matrix, save_npz, load_npz
+from sklearn.preprocessing import normalize
+from scipy.sparse import coo_matrix, csr_matrix, vstack
+from concurrent.futures import ProcessPoolExecutor
+import argparse
 import pickle
 import gzip
+import time
 import pandas as pd
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 import os
+from neighbor_store import row_topk, topk_from_csr, write_neighbor_store, NeighborStore, NEIGHBOR_STORE_FILENAME
+from incremental_similarity import (SimilarityState, count_oov, changed_rows, row_hashes, update_neighbors,
+                                    DRIFT_THRESHOLD, SIMILARITY_STATE_FILENAME, SIMILARITY_VECTORIZER_FILENAME)
 
-print("Starting optimization of cosine similarity matrix...")
+# Number of neighbors kept per fragrance in the memory-mapped store
+NEIGHBOR_STORE_K = 20
 
-# Step 1: Load fragrance data
-df_path = 'perfume_data_clean.csv'
-df = pd.read_csv(df_path)
-print(f"Loaded dataset with {len(df)} fragrances")
+# Only keep similarity values above threshold
+SIMILARITY_THRESHOLD = 0.1
 
-# Fill missing values
-df['Description'] = df['Description'].fillna('')
-df['Main Accords'] = df['Main Accords'].fillna('')
+# Rows multiplied against X^T at a time; peak memory is ~block_size * n_items scores
+DEFAULT_BLOCK_SIZE = 256
+
+# Outcomes of an --incremental run
+UPDATED, REBUILD, REFIT = 'updated', 'rebuild', 'refit'
+
+
+def _threshold_block(block, threshold):
+    """Drop entries at or below the threshold from a sparse block in place"""
+    block.data[block.data <= threshold] = 0
+    block.eliminate_zeros()
+    return block
+
+
+def _topk_block(sims, start, threshold, top_k):
+    """Keep each row's top_k neighbors above threshold, plus its self-similarity"""
+    n_rows, n_cols = sims.shape
+    rows = np.arange(n_rows)
+    diagonal = rows + start
+    self_scores = sims[rows, diagonal].copy()
+    sims[rows, diagonal] = -np.inf
+    sims[sims <= threshold] = -np.inf
+
+    if top_k < n_cols:
+        cols = np.argpartition(-sims, top_k - 1, axis=1)[:, :top_k]
+        scores = np.take_along_axis(sims, cols, axis=1)
+        # argpartition picks arbitrarily among values tied with the k-th best,
+        # so those rows are redone exactly (ties broken by lowest index)
+        kth = scores.min(axis=1)
+        tied = (kth > -np.inf) & ((sims >= kth[:, None]).sum(axis=1) > top_k)
+        for row in np.nonzero(tied)[0]:
+            candidates = np.nonzero(sims[row] >= kth[row])[0]
+            cols[row], scores[row] = row_topk(candidates, sims[row, candidates], top_k)
+    else:
+        cols = np.broadcast_to(np.arange(n_cols), sims.shape)
+        scores = sims
+
+    row_ids = np.broadcast_to(rows[:, None], cols.shape)
+    keep = scores > -np.inf
+    row_ids, cols, scores = row_ids[keep], cols[keep], scores[keep]
+
+    has_self = self_scores > threshold
+    row_ids = np.concatenate((row_ids, rows[has_self]))
+    cols = np.concatenate((cols, diagonal[has_self]))
+    scores = np.concatenate((scores, self_scores[has_self]))
+
+    block = coo_matrix((scores, (row_ids, cols)), shape=(n_rows, n_cols)).tocsr()
+    block.sort_indices()
+    return block
+
+
+def _similarity_rows(X, start, stop, threshold, top_k):
+    """Similarity rows [start, stop) of the normalized matrix X against every item"""
+    if top_k is None:
+        return _threshold_block(csr_matrix(X[start:stop] @ X.T), threshold)
+    # The dense block is needed for top-k selection anyway, and sparse @ dense is
+    # much cheaper than a sparse @ sparse product that comes out nearly dense
+    sims = np.ascontiguousarray((X @ X[start:stop].T.toarray()).T)
+    return _topk_block(sims, start, threshold, top_k)
+
+
+# Worker state for the process pool, set once per worker by _init_worker
+_worker_args = None
+
+def _init_worker(X, threshold, top_k):
+    global _worker_args
+    _worker_args = (X, threshold, top_k)
+
+def _worker_rows(bounds):
+    X, threshold, top_k = _worker_args
+    return _similarity_rows(X, bounds[0], bounds[1], threshold, top_k)
+
+
+def build_similarity_matrix(X, threshold=SIMILARITY_THRESHOLD, top_k=None,
+                            block_size=DEFAULT_BLOCK_SIZE, n_jobs=1):
+    """Blocked, thresholded cosine similarity of the rows of X.
+
+    Row blocks of X are multiplied against X^T one at a time, so only
+    block_size * n_items scores are ever materialized. With top_k=None every
+    entry above the threshold is kept, which matches cosine_similarity()
+    followed by thresholding. Otherwise each row keeps its top_k neighbors
+    (ties broken by lowest index) plus its own self-similarity.
+    """
+    X = normalize(csr_matrix(X))
+    n_items = X.shape[0]
+    bounds = [(start, min(start + block_size, n_items))
+              for start in range(0, n_items, block_size)]
+
+    if n_jobs == 1 or len(bounds) <= 1:
+        blocks = [_similarity_rows(X, start, stop, threshold, top_k) for start, stop in bounds]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(X, threshold, top_k)) as pool:
+            blocks = list(pool.map(_worker_rows, bounds))
+
+    if not blocks:
+        return csr_matrix((n_items, n_items))
+    return vstack(blocks, format='csr')
+
+
+def similarity_vectorizer_path():
+    """The vectorizer the similarity data was built with: a refitted one if any, else the search vectorizer"""
+    if os.path.exists(SIMILARITY_VECTORIZER_FILENAME):
+        return SIMILARITY_VECTORIZER_FILENAME
+    return "vectorizer.pkl"
+
+
+def load_or_fit_vectorizer(df, refit=False):
+    path = similarity_vectorizer_path()
+    if os.path.exists(path) and not refit:
+        print(f"Loading existing vectorizer from {path}...")
+        with open(path, "rb") as f:
+            return pickle.load(f)
 
-# Step 2: Create or load vectorizer
-if os.path.exists("vectorizer.pkl"):
-    print("Loading existing vectorizer...")
-    with open("vectorizer.pkl", "rb") as f:
-        vectorizer = pickle.load(f)
-else:
     print("Creating new vectorizer...")
     # Use max_features to limit vocabulary size for better performance
     vectorizer = TfidfVectorizer(stop_words='english', max_features=5000)
     vectorizer.fit(df['Description'] + " " + df['Main Accords'])
-    # Save vectorizer for future use
-    with open("vectorizer.pkl", "wb") as f:
+    # Save vectorizer for future use. vectorizer.pkl is also paired with
+    # tfidf_matrix_search.pkl, so a refit must not replace it under the search index
+    path = SIMILARITY_VECTORIZER_FILENAME if refit else "vectorizer.pkl"
+    with open(path, "wb") as f:
         pickle.dump(vectorizer, f)
-    print("Vectorizer saved.")
+    print(f"Vectorizer saved to {path}.")
+    return vectorizer
 
-# Step 3: Transform the text data
-print("Transforming text data...")
-text_data = df['Description'] + " " + df['Main Accords']
-with open("text_data.pkl", "wb") as f:
-    pickle.dump(text_data, f)
 
-X = vectorizer.transform(text_data)
-print(f"Created TF-IDF matrix of shape {X.shape}")
+def neighbor_matrix(X, indices, scores, threshold=SIMILARITY_THRESHOLD):
+    """Sparse similarity matrix of neighbor arrays plus each item's self-similarity, like a top-k build"""
+    n_items, k = indices.shape
+    self_scores = np.asarray(X.multiply(X).sum(axis=1)).ravel()
+    row_ids = np.concatenate((np.repeat(np.arange(n_items), k), np.arange(n_items)))
+    cols = np.concatenate((indices.ravel(), np.arange(n_items)))
+    data = np.concatenate((scores.ravel().astype(np.float64), self_scores))
+    keep = (cols >= 0) & (data > threshold)
+    matrix = coo_matrix((data[keep], (row_ids[keep], cols[keep])), shape=(n_items, n_items)).tocsr()
+    matrix.sort_indices()
+    return matrix
 
-# Step 4: Calculate cosine similarity (sparse format)
-print("Calculating cosine similarity (this may take some time)...")
-cosine_sim = cosine_similarity(X, dense_output=False)
-print(f"Cosine similarity matrix created with shape {cosine_sim.shape}, density: {cosine_sim.nnz / (cosine_sim.shape[0] * cosine_sim.shape[1]):.4f}")
 
-# Step 5: Apply threshold to make matrix more sparse
-# Only keep similarity values above threshold
-threshold = 0.1  # Adjust this value as needed
-cosine_sim_data = cosine_sim.data
-cosine_sim_indices = cosine_sim.indices
-cosine_sim_indptr = cosine_sim.indptr
+def save_similarity_matrix(cosine_sim_sparse, compresslevel=9):
+    print("Saving compressed matrix...")
+    with gzip.open("cosine_sim.pkl.gz", "wb", compresslevel=compresslevel) as f:
+        pickle.dump(cosine_sim_sparse, f)
+
+
+def update_incrementally(text_data, drift_threshold=DRIFT_THRESHOLD, block_size=DEFAULT_BLOCK_SIZE):
+    """Patch the neighbor store for new or changed rows only.
+
+    Returns UPDATED, REBUILD when there is no previous build to patch or rows
+    were removed, or REFIT when the vocabulary drifted too far to keep.
+    """
+    vectorizer_path = similarity_vectorizer_path()
+    paths = (vectorizer_path, SIMILARITY_STATE_FILENAME, NEIGHBOR_STORE_FILENAME)
+    if not all(os.path.exists(path) for path in paths):
+        print("No previous build to update")
+        return REBUILD
+
+    state = SimilarityState.load(SIMILARITY_STATE_FILENAME)
+    store = NeighborStore.open(NEIGHBOR_STORE_FILENAME)
+    if store.n_items != state.n_items or len(text_data) < state.n_items:
+        # Removed rows shift the ids of every row after them
+        print(f"Neighbor store has {store.n_items} items, state {state.n_items}, dataset {len(text_data)}")
+        return REBUILD
+
+    hashes = row_hashes(text_data)
+    rows = changed_rows(state, hashes)
+    if len(rows) == 0:
+        print("No new or changed fragrances")
+        return UPDATED
+
+    with open(vectorizer_path, "rb") as f:
+        vectorizer = pickle.load(f)
+    texts = text_data.iloc[rows]
+    tokens, oov = count_oov(vectorizer, texts)
+    drift = state.drift(tokens, oov)
+    if drift > drift_threshold:
+        print(f"Vocabulary drift {drift:.3f} is above {drift_threshold}")
+        return REFIT
+
+    print(f"Updating {len(rows)} new or changed fragrances (vocabulary drift {drift:.3f})...")
+    started = time.perf_counter()
+    X, indices, scores, stats = update_neighbors(state.features, np.asarray(store.indices),
+                                                 np.asarray(store.scores), rows,
+                                                 vectorizer.transform(texts), state.threshold, block_size)
+    print(f"Neighbors updated in {time.perf_counter() - started:.2f}s: {stats['patched']} lists patched, "
+          f"{stats['recomputed']} recomputed")
+
+    write_neighbor_store(NEIGHBOR_STORE_FILENAME, indices, scores, score_dtype=store.scores.dtype)
+    print(f"Neighbor store saved to {NEIGHBOR_STORE_FILENAME}")
+    # The pickle is only a fallback for a missing store; level 9 would take longer than the update
+    save_similarity_matrix(neighbor_matrix(X, indices, scores, state.threshold), compresslevel=1)
+
+    state.features = X
+    state.hashes = hashes
+    state.update_tokens += tokens
+    state.update_oov += oov
+    state.save(SIMILARITY_STATE_FILENAME)
+    return UPDATED
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the fragrance similarity matrix and neighbor store")
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                        help="rows multiplied against X^T per block")
+    parser.add_argument('--top-k', type=int, default=NEIGHBOR_STORE_K,
+                        help="neighbors kept per fragrance, 0 keeps every neighbor above the threshold")
+    parser.add_argument('--threshold', type=float, default=SIMILARITY_THRESHOLD)
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="worker processes for the blocked multiply, 0 uses every core")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only update new or changed fragrances, using the existing vocabulary")
+    parser.add_argument('--drift-threshold', type=float, default=DRIFT_THRESHOLD,
+                        help="out-of-vocabulary share above the fit corpus's that forces a full rebuild")
+    args = parser.parse_args()
+
+    print("Starting optimization of cosine similarity matrix...")
+
+    # Step 1: Load fragrance data
+    df_path = 'perfume_data_clean.csv'
+    df = pd.read_csv(df_path)
+    print(f"Loaded dataset with {len(df)} fragrances")
+
+    # Fill missing values
+    df['Description'] = df['Description'].fillna('')
+    df['Main Accords'] = df['Main Accords'].fillna('')
+
+    text_data = df['Description'] + " " + df['Main Accords']
+    with open("text_data.pkl", "wb") as f:
+        pickle.dump(text_data, f)
+
+    refit = False
+    if args.incremental:
+        outcome = update_incrementally(text_data, args.drift_threshold, args.block_size)
+        if outcome == UPDATED:
+            return
+        refit = outcome == REFIT
+        print("Rebuilding from scratch" + (" with a refitted vocabulary..." if refit else "..."))
+
+    # Step 2: Create or load vectorizer
+    vectorizer = load_or_fit_vectorizer(df, refit=refit)
+
+    # Step 3: Transform the text data
+    print("Transforming text data...")
+    X = vectorizer.transform(text_data)
+    print(f"Created TF-IDF matrix of shape {X.shape}")
+
+    # Step 4: Calculate thresholded cosine similarity one row block at a time
+    top_k = args.top_k or None
+    n_jobs = args.jobs or os.cpu_count()
+    print(f"Calculating cosine similarity in blocks of {args.block_size} rows "
+          f"(top_k={top_k}, threshold={args.threshold}, jobs={n_jobs})...")
+    started = time.perf_counter()
+    cosine_sim_sparse = build_similarity_matrix(X, threshold=args.threshold, top_k=top_k,
+                                                block_size=args.block_size, n_jobs=n_jobs)
+    n_items = cosine_sim_sparse.shape[0]
+    print(f"Similarity matrix built in {time.perf_counter() - started:.2f}s, "
+          f"density: {cosine_sim_sparse.nnz / max(1, n_items * n_items):.4f}")
+
+    # Step 5: Save compressed similarity matrix
+    save_similarity_matrix(cosine_sim_sparse)
 
-mask = cosine_sim_data > threshold
-filtered_data = cosine_sim_data[mask]
-filtered_indices = cosine_sim_indices[mask]
+    print("Cosine similarity matrix optimized and saved successfully.")
+    print(f"Optimized matrix size: ~{cosine_sim_sparse.data.nbytes / 1024 / 1024:.2f} MB")
 
-# Rebuild the CSR matrix
-cosine_sim_sparse = csr_matrix((filtered_data, filtered_indices, cosine_sim_indptr), 
-                              shape=cosine_sim.shape)
+    # Step 6: Save fixed-width top-K neighbor store for memory-mapped lookups
+    print(f"Saving top-{NEIGHBOR_STORE_K} neighbor store...")
+    neighbor_indices, neighbor_scores = topk_from_csr(cosine_sim_sparse, NEIGHBOR_STORE_K)
+    write_neighbor_store(NEIGHBOR_STORE_FILENAME, neighbor_indices, neighbor_scores)
+    print(f"Neighbor store saved to {NEIGHBOR_STORE_FILENAME}")
 
-print(f"Applied threshold: new density: {cosine_sim_sparse.nnz / (cosine_sim_sparse.shape[0] * cosine_sim_sparse.shape[1]):.4f}")
+    # Step 7: Save the feature rows and row hashes that --incremental updates start from
+    tokens, oov = count_oov(vectorizer, text_data)
+    SimilarityState(normalize(csr_matrix(X)), row_hashes(text_data), args.threshold, tokens, oov).save(
+        SIMILARITY_STATE_FILENAME)
+    print(f"Incremental update state saved to {SIMILARITY_STATE_FILENAME}")
 
-# Step 6: Save compressed similarity matrix
-print("Saving compressed matrix...")
-with gzip.open("cosine_sim.pkl.gz", "wb", compresslevel=9) as f:
-    pickle.dump(cosine_sim_sparse, f)
 
-print("Cosine similarity matrix optimized and saved successfully.")
-print(f"Original matrix size: ~{cosine_sim.data.nbytes / 1024 / 1024:.2f} MB")
-print(f"Optimized matrix size: ~{cosine_sim_sparse.data.nbytes / 1024 / 1024:.2f} MB")
+if __name__ == '__main__':
+    main()
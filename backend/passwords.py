@@ -0,0 +1,93 @@
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+
+# bcrypt cost factor for new hashes; every +1 doubles the work
+DEFAULT_ROUNDS = 12
+
+# Hashes running at once; the rest of the CPU stays free for other requests
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+# Hashes admitted at once, running or queued; beyond this callers are turned away
+DEFAULT_MAX_PENDING = 32
+
+_COST = re.compile(rb'^\$2[abxy]?\$(\d{2})\$')
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+
+class PasswordHasher:
+    """bcrypt hashing on a bounded worker pool.
+
+    bcrypt releases the GIL, so hashing on request threads lets a burst of
+    logins take every core. Here at most `workers` hashes run at once, at most
+    `max_pending` wait for a worker, and callers beyond that get
+    PasswordHasherBusy straight away instead of queueing. With workers=0 hashes
+    run inline on the calling thread, still bounded by `max_pending`.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix='bcrypt') if workers else None
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Too many password checks in progress")
+        try:
+            if self._pool is None:
+                return fn(*args)
+            return self._pool.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """bcrypt hash of a str password at the configured cost"""
+        return self._run(lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds)))
+
+    def verify(self, password, hashed):
+        """Whether a str password matches a stored hash"""
+        if isinstance(hashed, str):
+            hashed = hashed.encode('utf-8')
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), hashed)
+
+    def needs_rehash(self, hashed):
+        """Whether a stored hash was made at a different cost than the configured one"""
+        if isinstance(hashed, str):
+            hashed = hashed.encode('utf-8')
+        match = _COST.match(hashed)
+        return match is None or int(match.group(1)) != self.rounds
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def configure_password_hasher(rounds=DEFAULT_ROUNDS, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+    """Replace the process-wide hasher, e.g. with settings from the app config"""
+    global _hasher
+    with _hasher_lock:
+        previous, _hasher = _hasher, PasswordHasher(rounds, workers, max_pending)
+    if previous is not None:
+        previous.shutdown()
+    return _hasher
+
+
+def get_password_hasher():
+    """Return the process-wide hasher, creating it with the defaults on first use"""
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher()
+    return _hasher
@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import IntegrityError
 from models import db, Favorite, Fragrance
-from auth import login_required, get_current_user
+from auth import login_required, get_current_user_id
+from routes.recommendations import invalidate_recommendations
+from fieldsets import parse_fields, fragrance_columns
 
 
 favourites_bp = Blueprint('favourites', __name__)
@@ -9,7 +12,7 @@ favourites_bp = Blueprint('favourites', __name__)
 @login_required
 def add_favourite():
     """Add a fragrance to the user's favorites"""
-    user = get_current_user()
+    user_id = get_current_user_id()
     data = request.json
     fragrance_id = data.get('fragrance_id')
     
@@ -23,7 +26,7 @@ def add_favourite():
     
     # Check if the favorite already exists
     existing_favorite = Favorite.query.filter_by(
-        user_id=user.id, 
+        user_id=user_id, 
         fragrance_id=fragrance_id
     ).first()
     
@@ -31,15 +34,20 @@ def add_favourite():
         return jsonify({"message": "Fragrance is already in favorites"}), 200
     
     
-    new_favorite = Favorite(user_id=user.id, fragrance_id=fragrance_id)
+    new_favorite = Favorite(user_id=user_id, fragrance_id=fragrance_id)
     db.session.add(new_favorite)
     
     try:
         db.session.commit()
+        invalidate_recommendations(user_id)
         return jsonify({
             "message": "Added to favorites",
             "favorite_id": new_favorite.id
         }), 201
+    except IntegrityError:
+        # A concurrent request added it first; the unique index kept one row
+        db.session.rollback()
+        return jsonify({"message": "Fragrance is already in favorites"}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Error adding to favorites: {str(e)}"}), 500
@@ -48,18 +56,25 @@ def add_favourite():
 @login_required
 def get_favourites():
     """Get all favorites for the current user"""
-    user = get_current_user()
-    
+    user_id = get_current_user_id()
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
    
-    favorites = db.session.query(Favorite, Fragrance).\
+    query = db.session.query(Favorite, Fragrance).\
         join(Fragrance, Favorite.fragrance_id == Fragrance.id).\
-        filter(Favorite.user_id == user.id).all()
+        filter(Favorite.user_id == user_id)
+    columns = fragrance_columns(fields)
+    if columns is not None:
+        query = query.options(columns)
+    favorites = query.all()
     
   
     result = [{
         "favorite_id": favorite.id,
         "date_added": favorite.created_at.isoformat() if hasattr(favorite, 'created_at') else None,
-        "fragrance": fragrance.to_dict()
+        "fragrance": fragrance.to_dict(fields)
     } for favorite, fragrance in favorites]
     
     return jsonify({
@@ -71,10 +86,10 @@ def get_favourites():
 @login_required
 def remove_favourite(favourite_id):
     """Remove a fragrance from the user's favorites"""
-    user = get_current_user()
+    user_id = get_current_user_id()
     
     # Find the favorite
-    favorite = Favorite.query.filter_by(id=favourite_id, user_id=user.id).first()
+    favorite = Favorite.query.filter_by(id=favourite_id, user_id=user_id).first()
     
     if not favorite:
         return jsonify({"error": "Favorite not found"}), 404
@@ -84,6 +99,7 @@ def remove_favourite(favourite_id):
     
     try:
         db.session.commit()
+        invalidate_recommendations(user_id)
         return jsonify({"message": "Removed from favorites"}), 200
     except Exception as e:
         db.session.rollback()
@@ -93,11 +109,11 @@ def remove_favourite(favourite_id):
 @login_required
 def check_favourite(fragrance_id):
     """Check if a fragrance is in the user's favorites"""
-    user = get_current_user()
+    user_id = get_current_user_id()
     
     
     favorite = Favorite.query.filter_by(
-        user_id=user.id, 
+        user_id=user_id, 
         fragrance_id=fragrance_id
     ).first()
     
@@ -115,7 +131,7 @@ def check_favourite(fragrance_id):
 @login_required
 def dislike_fragrance():
     """Handle user dislike for a fragrance"""
-    user = get_current_user()
+    user_id = get_current_user_id()
     data = request.json
     fragrance_id = data.get('fragrance_id')
 
@@ -123,6 +139,6 @@ def dislike_fragrance():
         return jsonify({'error': 'Fragrance ID is required'}), 400
 
    
-    print(f"User {user.id} disliked fragrance {fragrance_id}")
+    print(f"User {user_id} disliked fragrance {fragrance_id}")
 
     return jsonify({'message': 'Fragrance disliked'}), 200
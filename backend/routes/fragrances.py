@@ -1,57 +1,149 @@
-from flask import Blueprint, request, jsonify
-import pandas as pd
-import pickle
-import os
-from sklearn.metrics.pairwise import cosine_similarity
-from models import db, Fragrance
+from flask import Blueprint, request, jsonify, current_app, g
+import re
+import threading
+import numpy as np
+from sqlalchemy import func, literal_column, select, table, text, tuple_
+from models import db, Fragrance, CatalogImport
+from cache import LRUCache
+from cursors import encode_cursor, decode_cursor
 from auth import login_required
+from search_index import get_search_index, RESULT_COLUMNS
+from fast_json import json_response
+from http_cache import conditional
+from fieldsets import parse_fields, catalog_columns, fragrance_columns, CATALOG_FIELDS
 
 # Create a Blueprint for fragrance routes
 fragrances_bp = Blueprint('fragrances', __name__)
 
-# Load the TF-IDF search model
-def load_search_data():
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    
-    # Load perfume dataset
-    df_path = os.path.join(base_dir, 'perfume_data_clean.csv')
-    df = pd.read_csv(df_path)
-    
-    # Load TF-IDF matrix and vectorizer
-    tfidf_matrix_path = os.path.join(base_dir, 'tfidf_matrix_search.pkl')  # Fixed from fidf_matrix_path
-    vectorizer_path = os.path.join(base_dir, 'vectorizer.pkl')  # Fixed from .pk1
-    
-    if os.path.exists(tfidf_matrix_path) and os.path.exists(vectorizer_path):
-        tfidf_matrix = pickle.load(open(tfidf_matrix_path, 'rb'))
-        vectorizer = pickle.load(open(vectorizer_path, 'rb'))
+# Listing order: best rated first, ties by newest id, unrated fragrances last
+# (SQLite sorts NULL lowest). Pages seek past the last (rating_value, id)
+# instead of skipping rows with OFFSET
+RATING_ORDER = (Fragrance.rating_value.desc(), Fragrance.id.desc())
+
+# Totals per (catalog import, gender, min_rating, full-text match)
+FRAGRANCE_TOTAL_CACHE_SIZE = 256
+_total_cache = LRUCache(FRAGRANCE_TOTAL_CACHE_SIZE)
+
+def invalidate_fragrance_totals():
+    """Forget cached listing totals after the fragrances table changed"""
+    _total_cache.clear()
+
+# Search results (row positions) per normalized query: at most this many
+# entries and bytes, each kept for at most SEARCH_CACHE_TTL seconds
+SEARCH_CACHE_SIZE = 4096
+SEARCH_CACHE_BYTES = 4 * 1024 * 1024
+SEARCH_CACHE_TTL = 600
+
+def _search_entry_size(key, rows):
+    # Query text and rows, plus a rough allowance for the Python objects around them
+    return len(key[2]) + rows.nbytes + 256
+
+_search_cache = LRUCache(SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL,
+                         maxbytes=SEARCH_CACHE_BYTES, sizeof=_search_entry_size)
+_search_cache_version = None
+_search_cache_lock = threading.Lock()
+
+def clear_search_cache():
+    _search_cache.clear()
+
+# Browser and proxy cache lifetimes; after that clients revalidate with If-None-Match
+FRAGRANCE_LIST_MAX_AGE = 60
+FRAGRANCE_DETAIL_MAX_AGE = 300
+
+@fragrances_bp.before_app_request
+def forget_catalog_version():
+    g.pop('catalog_import_version', None)
+
+def catalog_import_version():
+    """ID of the latest catalog import, read at most once per request"""
+    if 'catalog_import_version' not in g:
+        g.catalog_import_version = db.session.query(func.max(CatalogImport.id)).scalar()
+    return g.catalog_import_version
+
+def _fts_terms(words):
+    """FTS5 query requiring every word, the last one as a prefix"""
+    words = re.findall(r'\w+', words.lower())
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+def fts_match(text_query=None, brand=None):
+    """MATCH expression for the listing's `q` and `brand` filters, or None without either"""
+    parts = []
+    terms = _fts_terms(text_query or '')
+    if terms:
+        parts.append(f'({terms})')
+    terms = _fts_terms(brand or '')
+    if terms:
+        parts.append(f'brand : ({terms})')
+    return ' AND '.join(parts) or None
+
+def rating_cursor(fragrance):
+    """Cursor for the listing page that starts after `fragrance`"""
+    return encode_cursor([fragrance.rating_value, fragrance.id])
+
+def decode_rating_cursor(cursor):
+    """(rating_value, id) of a listing cursor; raises ValueError if it is malformed"""
+    position = decode_cursor(cursor)
+    if (not isinstance(position, list) or len(position) != 2
+            or not isinstance(position[1], int)
+            or not (position[0] is None or isinstance(position[0], (int, float)))):
+        raise ValueError("Invalid cursor")
+    return position[0], position[1]
+
+def rating_page(query, position, limit):
+    """One page of a listing query in RATING_ORDER, starting after `position`"""
+    rating_value, fragrance_id = position
+    unrated = query.filter(Fragrance.rating_value.is_(None))
+    if rating_value is None:
+        return unrated.filter(Fragrance.id < fragrance_id).order_by(Fragrance.id.desc()).limit(limit).all()
+
+    # A row-value comparison lets SQLite seek in the rating index; unrated rows
+    # never satisfy it and are read separately once the rated ones run out
+    rated = query.filter(tuple_(Fragrance.rating_value, Fragrance.id) < (rating_value, fragrance_id))
+    fragrances = rated.order_by(*RATING_ORDER).limit(limit).all()
+    if len(fragrances) < limit:
+        fragrances += unrated.order_by(Fragrance.id.desc()).limit(limit - len(fragrances)).all()
+    return fragrances
+
+def normalize_query(user_query):
+    """Search text as both engines see it: lower case, single spaces"""
+    return ' '.join(user_query.lower().split())
+
+def search_rows(user_query, search_index, backend='tfidf', top_n=5):
+    """Row positions of the best matches, best first, and whether they came from the cache.
+
+    Results are cached per normalized query until they expire or the search
+    index is reloaded; a new index version empties the cache.
+    """
+    global _search_cache_version
+    if _search_cache_version != search_index.version:
+        with _search_cache_lock:
+            if _search_cache_version != search_index.version:
+                _search_cache.clear()
+                _search_cache_version = search_index.version
+
+    key = (search_index.version, backend, normalize_query(user_query), top_n)
+    rows = _search_cache.get(key)
+    if rows is not None:
+        return rows, True
+
+    if backend == 'bm25':
+        rows, _ = search_index.bm25.search(user_query, top_n)
+    elif search_index.available:
+        rows = search_index.top_matches(user_query, top_n)
     else:
-        print("Warning: Search files not found. Search functionality may not work correctly.")
-        tfidf_matrix = None
-        vectorizer = None
-    
-    return df, tfidf_matrix, vectorizer
+        rows = np.empty(0, dtype=np.int64)
+    rows = np.asarray(rows, dtype=np.int64)
+    rows.flags.writeable = False  # Shared by every request for the same query
+    _search_cache.set(key, rows)
+    return rows, False
 
-# TF-IDF search function
-def search_based_recommendation_tfidf(user_query, df, tfidf_matrix, vectorizer, top_n=5):
-    """Search for fragrances using TF-IDF similarity"""
-    if tfidf_matrix is None or vectorizer is None:
-        return pd.DataFrame()  # Return empty DataFrame if search data is not available
-    
-    # Transform user query using the vectorizer
-    query_vec = vectorizer.transform([user_query])
-    
-    # Compute cosine similarity
-    similarities = cosine_similarity(query_vec, tfidf_matrix).flatten()
-    
-    # Add similarity scores to DataFrame
-    df_with_sim = df.copy()
-    df_with_sim["similarity"] = similarities
-    
-    # Get top recommendations
-    recommended = df_with_sim.sort_values(by="similarity", ascending=False).head(top_n)
-    
-    return recommended[['Name', 'Gender', 'Rating Value', 'Rating Count',
-                      'Main Accords', 'Perfumers', 'Description', 'url']]
+def search_cache_stats():
+    """Hit, miss and eviction counters of the search result cache"""
+    return {**_search_cache.stats(), 'index_version': _search_cache_version}
 
 @fragrances_bp.route('/search', methods=['GET'])
 def search_fragrance():
@@ -61,31 +153,57 @@ def search_fragrance():
     
     if not query:
         return jsonify({"error": "Query parameter is required"}), 400
+    try:
+        fields = parse_fields(request.args.get('fields'), CATALOG_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    # Load the search data
-    df, tfidf_matrix, vectorizer = load_search_data()
+    # Get search results from the shared, process-wide index, or the result cache
+    search_index = get_search_index()
+    backend = 'bm25' if current_app.config.get('SEARCH_BACKEND') == 'bm25' else 'tfidf'
+    rows, cached = search_rows(query, search_index, backend)
     
-    # Get search results
-    results = search_based_recommendation_tfidf(query, df, tfidf_matrix, vectorizer)
-    
-    if results.empty:
-        return jsonify({"message": "No fragrances found matching your search", "results": []}), 200
+    if len(rows) == 0:
+        response = jsonify({"message": "No fragrances found matching your search", "results": []})
+    else:
+        # Return the results as JSON, joined from cached per-row fragments
+        response = json_response({
+            "message": f"Found {len(rows)} fragrances matching your search", 
+            "results": search_index.record_encoder(catalog_columns(fields, RESULT_COLUMNS)).encode(rows)
+        })
+    response.headers['X-Search-Cache'] = 'hit' if cached else 'miss'
+    return response, 200
+
+@fragrances_bp.route('/search/stats', methods=['GET'])
+def search_stats():
+    """Counters of the search result cache"""
+    return jsonify({"cache": search_cache_stats()}), 200
+
+@fragrances_bp.route('/search/suggest', methods=['GET'])
+def suggest_fragrances():
+    """Typeahead suggestions for a partial query, without running the full search"""
+    prefix = request.args.get('prefix', '')
+    limit = request.args.get('limit', 8, type=int)
     
-    # Return the results as JSON
-    return jsonify({
-        "message": f"Found {len(results)} fragrances matching your search", 
-        "results": results.to_dict(orient='records')
-    }), 200
+    suggestions = get_search_index().suggest.suggest(prefix, limit)
+    return jsonify({"prefix": prefix, "suggestions": suggestions}), 200
 
 @fragrances_bp.route('/fragrances', methods=['GET'])
+@conditional(catalog_import_version, FRAGRANCE_LIST_MAX_AGE)
 def get_fragrances():
     """Get all fragrances with optional filtering"""
     # Parse query parameters for filtering
     gender = request.args.get('gender')
     min_rating = request.args.get('min_rating')
     brand = request.args.get('brand')
+    text_query = request.args.get('q', '').strip()
     limit = request.args.get('limit', 20, type=int)
     offset = request.args.get('offset', 0, type=int)
+    cursor = request.args.get('cursor')
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     # Start with a base query
     query = Fragrance.query
@@ -95,33 +213,67 @@ def get_fragrances():
         query = query.filter(Fragrance.gender == gender)
     
     if min_rating:
-        query = query.filter(Fragrance.rating_value >= float(min_rating))
+        min_rating = float(min_rating)
+        query = query.filter(Fragrance.rating_value >= min_rating)
+    else:
+        min_rating = None
     
-    if brand:
-        query = query.filter(Fragrance.brand.ilike(f'%{brand}%'))
+    # Text filters are answered by the full-text index instead of scanning with LIKE
+    match = fts_match(text_query, brand)
+    if match:
+        query = query.filter(Fragrance.id.in_(
+            select(literal_column('rowid')).select_from(table('fragrances_fts'))
+            .where(text('fragrances_fts MATCH :match').bindparams(match=match))
+        ))
     
-    # Get the total count of matching fragrances
-    total_count = query.count()
+    # Get the total count of matching fragrances, cached per filter combination
+    # and catalog import, so an import from another process is seen too
+    # min_rating=0 still drops unrated rows, so it must not share the unfiltered key
+    total_key = (catalog_import_version(), gender or None, min_rating, match)
+    total_count = _total_cache.get(total_key)
+    if total_count is None:
+        total_count = query.count()
+        _total_cache.set(total_key, total_count)
     
-    # Apply pagination
-    fragrances = query.order_by(Fragrance.rating_value.desc()).offset(offset).limit(limit).all()
+    # Read only the requested columns, plus the ones the cursor is built from
+    columns = fragrance_columns(fields, Fragrance.rating_value)
+    if columns is not None:
+        query = query.options(columns)
+    
+    # Apply pagination: seek past the cursor's row, or skip `offset` rows
+    if cursor:
+        try:
+            position = decode_rating_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+        fragrances = rating_page(query, position, limit)
+        offset = None
+    else:
+        fragrances = query.order_by(*RATING_ORDER).offset(offset).limit(limit).all()
     
     # Convert to dictionary
-    fragrance_list = [f.to_dict() for f in fragrances]
+    fragrance_list = [f.to_dict(fields) for f in fragrances]
     
     return jsonify({
         "total": total_count,
         "offset": offset,
         "limit": limit,
-        "fragrances": fragrance_list
+        "fragrances": fragrance_list,
+        "next_cursor": rating_cursor(fragrances[-1]) if fragrances and len(fragrances) == limit else None
     }), 200
 
 @fragrances_bp.route('/fragrances/<int:fragrance_id>', methods=['GET'])
+@conditional(catalog_import_version, FRAGRANCE_DETAIL_MAX_AGE, precompress=True)
 def get_fragrance(fragrance_id):
     """Get a specific fragrance by ID"""
-    fragrance = Fragrance.query.get(fragrance_id)
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    columns = fragrance_columns(fields)
+    fragrance = db.session.get(Fragrance, fragrance_id, options=[columns] if columns is not None else None)
     
     if not fragrance:
         return jsonify({"error": f"Fragrance with ID {fragrance_id} not found"}), 404
     
-    return jsonify(fragrance.to_dict()), 200
\ No newline at end of file
+    return jsonify(fragrance.to_dict(fields)), 200
\ No newline at end of file
@@ -1,10 +1,14 @@
 from flask import Blueprint, request, jsonify
 import pandas as pd
+import numpy as np
 import json
 import ast  # New import for safer string evaluation
 from models import db, QuizResult
-from auth import login_required, get_current_user
-import os
+from auth import login_required, get_current_user_id
+from accords import AccordIndex
+from catalog import get_catalog
+from routes.recommendations import invalidate_recommendations
+from fast_json import json_response
 
 # Blueprint setup
 quiz_bp = Blueprint('quiz', __name__)
@@ -12,18 +16,19 @@ quiz_bp = Blueprint('quiz', __name__)
 # Dataset loading with error handling
 def get_df():
     try:
-        csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'perfume_data_clean.csv')
-        df = pd.read_csv(csv_path)
-
-        # Convert string representations to actual lists
-        df['Main Accords'] = df['Main Accords'].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else [])
-        df['Perfumers'] = df['Perfumers'].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else [])
-
-        return df
+        return get_catalog().frame
     except Exception as e:
         print(f"Error loading dataset: {str(e)}")
         return pd.DataFrame()
 
+def _literal_list(value):
+    return ast.literal_eval(value) if isinstance(value, str) and value else []
+
+# Columns of a quiz recommendation, and the ones sent as parsed lists
+QUIZ_COLUMNS = ('Name', 'Gender', 'Rating Value', 'Rating Count',
+                'Main Accords', 'Perfumers', 'Description', 'url')
+QUIZ_LIST_COLUMNS = {'Main Accords': _literal_list, 'Perfumers': _literal_list}
+
 # Experience-based question branching
 def get_questions_by_level(experience_level):
     questions = {
@@ -55,7 +60,7 @@ def get_questions_by_level(experience_level):
 @login_required
 def start_quiz():
     """Handle initial experience level selection"""
-    user = get_current_user()
+    user_id = get_current_user_id()
     data = request.json
     experience_level = data.get('experience_level')
 
@@ -64,16 +69,17 @@ def start_quiz():
 
     # Save initial selection
     quiz_data = {"experience_level": experience_level}
-    existing_result = QuizResult.query.filter_by(user_id=user.id).first()
+    existing_result = QuizResult.query.filter_by(user_id=user_id).first()
 
     if existing_result:
         existing_result.preferences = json.dumps(quiz_data)
     else:
-        new_result = QuizResult(user_id=user.id, preferences=json.dumps(quiz_data))
+        new_result = QuizResult(user_id=user_id, preferences=json.dumps(quiz_data))
         db.session.add(new_result)
 
     try:
         db.session.commit()
+        invalidate_recommendations(user_id)
         questions = get_questions_by_level(experience_level)
         return jsonify({"questions": questions}), 200
     except Exception as e:
@@ -84,7 +90,7 @@ def start_quiz():
 @login_required
 def submit_quiz():
     """Handle quiz submission and provide recommendations"""
-    user = get_current_user()
+    user_id = get_current_user_id()
     data = request.json
     answers = data.get('answers')
 
@@ -92,7 +98,7 @@ def submit_quiz():
         return jsonify({"error": "Answers are required"}), 400
 
     # Get existing quiz data
-    result = QuizResult.query.filter_by(user_id=user.id).first()
+    result = QuizResult.query.filter_by(user_id=user_id).first()
     if not result:
         return jsonify({"error": "Quiz not started"}), 400
 
@@ -103,36 +109,43 @@ def submit_quiz():
         # Save updated preferences
         result.preferences = json.dumps(preferences)
         db.session.commit()
+        invalidate_recommendations(user_id)
 
         # Get recommendations
         df = get_df()
         if df.empty:
             return jsonify({"error": "Dataset not available"}), 500
 
-        recommendations = get_recommendations(df, preferences)
-        return jsonify({
-            "recommendations": recommendations.to_dict(orient='records'),
+        catalog = get_catalog()
+        rows = recommended_rows(df, preferences, catalog.accord_index)
+        return json_response({
+            "recommendations": catalog.record_encoder(QUIZ_COLUMNS, QUIZ_LIST_COLUMNS).encode(rows),
             "message": "Recommendations based on your preferences"
         }), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
-def get_recommendations(df, preferences):
-    """Improved recommendation logic"""
+def recommended_rows(df, preferences, accord_index=None):
+    """Index labels of the top 5 quiz matches"""
+    if accord_index is None:
+        accord_index = AccordIndex.from_series(df['Main Accords'])
     # Filter by experience level first
     exp_level = preferences.get('experience_level', 'Beginner')
 
     # Base filters
-    filtered = df.copy()
+    mask = np.ones(len(df), dtype=bool)
 
     # Gender filter
     if preferences.get('gender'):
-        filtered = filtered[filtered['Gender'] == preferences['gender']]
+        mask &= (df['Gender'] == preferences['gender']).to_numpy()
 
     # Rating filter
     min_rating = float(preferences.get('min_rating', 3.5))
-    filtered = filtered[filtered['Rating Value'] >= min_rating]
+    mask &= (df['Rating Value'] >= min_rating).to_numpy()
+
+    # Accord scores are computed for every item with one product, then filtered
+    score = None
 
     # Experience-specific filtering
     if exp_level == 'Beginner':
@@ -145,30 +158,22 @@ def get_recommendations(df, preferences):
                 'Light and subtle': ['Floral', 'Citrus', 'Powdery']
             }
             desired_accords = vibe_map.get(preferences['vibe'], [])
-            filtered['score'] = filtered['Main Accords'].apply(
-                lambda accords: sum(1 for accord in accords if accord in desired_accords)
-            )
+            score = accord_index.match_counts(desired_accords)
 
     elif exp_level == 'Intermediate':
         # More advanced filtering
         if preferences.get('note'):
-            filtered['score'] = filtered['Main Accords'].apply(
-                lambda accords: 1 if preferences['note'] in accords else 0
-            )
+            score = accord_index.has_accord(preferences['note']).astype(np.int64)
 
     else:  # Advanced
         # Most sophisticated filtering
         if preferences.get('top_notes') and preferences.get('base_notes'):
-            filtered['top_score'] = filtered['Main Accords'].apply(
-                lambda accords: 1 if preferences['top_notes'] in accords else 0
-            )
-            filtered['base_score'] = filtered['Main Accords'].apply(
-                lambda accords: 1 if preferences['base_notes'] in accords else 0
-            )
-            filtered['score'] = filtered['top_score'] + filtered['base_score']
+            score = (accord_index.has_accord(preferences['top_notes']).astype(np.int64)
+                     + accord_index.has_accord(preferences['base_notes']).astype(np.int64))
+
+    filtered = df[mask]
+    if score is not None:
+        filtered = filtered.assign(score=score[mask])
 
     # Sort and return top 5
-    return filtered.sort_values('score', ascending=False).head(5)[[
-        'Name', 'Gender', 'Rating Value', 'Rating Count',
-        'Main Accords', 'Perfumers', 'Description', 'url'
-    ]]
+    return filtered.sort_values('score', ascending=False).head(5).index
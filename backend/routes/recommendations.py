@@ -1,5 +1,4 @@
 from flask import Blueprint, request, jsonify
-import pandas as pd
 import pickle
 import os
 import numpy as np
@@ -8,37 +7,96 @@ from sklearn.metrics.pairwise import cosine_similarity
 from scipy.sparse import csr_matrix
 from functools import lru_cache
 import gzip
-from auth import login_required, get_current_user
-from models import db, User, QuizResult, Favorite
+import threading
+import uuid
+from auth import login_required, get_current_user_id
+from models import db, QuizResult, Favorite
+from neighbor_store import NeighborStore, NEIGHBOR_STORE_FILENAME, row_topk
+from name_index import normalize_name
+from catalog import get_catalog
+from fast_json import json_response
+from http_cache import conditional
+from fieldsets import parse_fields, catalog_columns, CATALOG_FIELDS
+from cache import LRUCache
+from cursors import encode_cursor, decode_cursor
+from hybrid import (
+    ScoreVector, add_quiz_signal, CONTENT_WEIGHT, FAVORITE_WEIGHT, POPULAR_WEIGHT
+)
 
 recommendations_bp = Blueprint('recommendations', __name__)
 
 # Global variables to store data
 _df = None
 _cosine_sim = None
+_neighbor_store = None
+_name_index = None
+_accord_index = None
+
+# Maximum number of seeds accepted by the batch similar endpoint
+MAX_SIMILAR_BATCH = 50
+
+# Browser and proxy cache lifetime of similar-fragrance responses, which only
+# change with the catalog
+SIMILAR_MAX_AGE = 300
+
+# Materialized rankings: snapshot id -> (user_id, ranked rows). Cursors point
+# into a snapshot, so a user paging through it keeps a stable order even after
+# their quiz answers or favourites change
+RANKED_CACHE_SIZE = 1024
+_ranking_snapshots = LRUCache(RANKED_CACHE_SIZE)
+
+# Current snapshot of each (user_id, generation, title, top_n); a user's
+# generation moves on whenever their quiz answers or favourites change. That
+# only happens in the process that handled the change, so entries also expire
+# after RANKED_CACHE_TTL seconds: other workers serve a stale ranking for at most that long
+RANKED_CACHE_TTL = 60
+_ranked_cache = LRUCache(RANKED_CACHE_SIZE, ttl=RANKED_CACHE_TTL)
+_ranked_generations = {}
+_ranked_cache_lock = threading.Lock()
+
+def _similarity_loaded():
+    return _neighbor_store is not None or _cosine_sim is not None
+
+def load_neighbor_store(base_dir, n_items):
+    """Open the memory-mapped neighbor store, or return None if it is unusable"""
+    store_path = os.path.join(base_dir, NEIGHBOR_STORE_FILENAME)
+    if not os.path.exists(store_path):
+        store_path = NEIGHBOR_STORE_FILENAME  # Try current directory
+    if not os.path.exists(store_path):
+        return None
+
+    try:
+        store = NeighborStore.open(store_path)
+    except (OSError, ValueError) as e:
+        print(f"Error opening neighbor store: {str(e)}")
+        return None
+
+    if store.n_items != n_items:
+        print(f"Neighbor store has {store.n_items} items but dataset has {n_items}, ignoring it")
+        return None
+
+    print(f"Memory-mapped neighbor store from: {store_path} (k={store.k})")
+    return store
 
 def load_recommendation_data():
     """Load dataset and similarity matrix once during startup"""
-    global _df, _cosine_sim
+    global _df, _cosine_sim, _neighbor_store, _name_index, _accord_index
     
-    if _df is None or _cosine_sim is None:
+    if _df is None or not _similarity_loaded():
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         print(f"Base directory: {base_dir}")
 
-        # Load dataset
-        df_path = os.path.join(base_dir, 'perfume_data_clean.csv')
-        print(f"Looking for dataset at: {df_path}")
-        if not os.path.exists(df_path):
-            df_path = 'perfume_data_clean.csv'  # Try current directory
-            print(f"Trying current directory instead: {df_path}")
-        
-        print(f"Loading dataset from: {df_path}")
-        _df = pd.read_csv(df_path)
-        print(f"Successfully loaded dataset with {len(_df)} rows")
+        # Dataset and name/accord indexes come from the shared catalog
+        catalog = get_catalog()
+        _df = catalog.frame
+        _name_index = catalog.name_index
+        _accord_index = catalog.accord_index
+
+        # Prefer the memory-mapped neighbor store; the pickled matrix is only a fallback
+        _neighbor_store = load_neighbor_store(base_dir, len(_df))
 
-        # Fill missing values
-        _df['Description'] = _df['Description'].fillna('')
-        _df['Main Accords'] = _df['Main Accords'].fillna('')
+    if _neighbor_store is None and _cosine_sim is None:
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
         # Try loading pre-computed compressed similarity matrix
         cosine_sim_path = os.path.join(base_dir, 'cosine_sim.pkl.gz')
@@ -68,140 +126,103 @@ def load_recommendation_data():
                     tfidf = TfidfVectorizer(stop_words='english', max_features=1000)
                     tfidf_matrix = tfidf.fit_transform(_df['Description'] + " " + _df['Main Accords'])
                     _cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix, dense_output=False)
-                    
+
+    if _df is not None:
         print(f"Recommendation data loaded: {len(_df)} fragrances")
         print(f"Sample of fragrances: {', '.join(_df['Name'].head().tolist())}")
 
     return _df, _cosine_sim
 
+def _pad_with_unscored(neighbors, idx, top_n):
+    """Fill up to top_n with zero-similarity items in index order, like a full sort would"""
+    missing = top_n - len(neighbors)
+    if missing <= 0:
+        return neighbors
+    candidates = np.arange(min(len(_df), top_n + len(neighbors) + 1))
+    candidates = candidates[(candidates != idx) & ~np.isin(candidates, neighbors)]
+    return np.concatenate((neighbors, candidates[:missing]))
+
+def _matrix_row_neighbors(cols, scores, idx, top_n):
+    """Top-k of one similarity row using only its stored entries, excluding the item itself"""
+    keep = (cols != idx) & (scores > 0)
+    cols, _ = row_topk(cols[keep], scores[keep], top_n)
+    return cols
+
 # Load data at import time
 load_recommendation_data()
 
+def get_similar_indices_batch(indices, top_n=5):
+    """Get similar fragrances for many items at once.
+
+    Returns an int array of shape (len(indices), top_n), best first, padded
+    with -1 only when the catalog has fewer than top_n other items.
+    """
+    indices = np.asarray(indices, dtype=np.int64).ravel()
+    result = np.full((len(indices), top_n), -1, dtype=np.int64)
+    if len(indices) == 0 or top_n <= 0:
+        return result
+
+    if _neighbor_store is not None:
+        # One fancy-indexed read of the memory-mapped rows; one extra column covers self
+        rows = np.asarray(_neighbor_store.indices[indices, :top_n + 1], dtype=np.int64)
+        valid = (rows >= 0) & (rows != indices[:, None])
+        order = np.argsort(~valid, axis=1, kind='stable')
+        rows = np.take_along_axis(rows, order, axis=1)[:, :top_n]
+        valid = np.take_along_axis(valid, order, axis=1)[:, :top_n]
+        result[:, :rows.shape[1]] = np.where(valid, rows, -1)
+    elif hasattr(_cosine_sim, 'indptr'):
+        # One sparse slice for every requested row, then work on stored entries only
+        block = _cosine_sim[indices]
+        for i, idx in enumerate(indices):
+            start, end = block.indptr[i], block.indptr[i + 1]
+            neighbors = _matrix_row_neighbors(block.indices[start:end], block.data[start:end], idx, top_n)
+            result[i, :len(neighbors)] = neighbors
+    else:
+        block = np.asarray(_cosine_sim[indices])
+        for i, idx in enumerate(indices):
+            cols = np.flatnonzero(block[i])
+            neighbors = _matrix_row_neighbors(cols, block[i][cols], idx, top_n)
+            result[i, :len(neighbors)] = neighbors
+
+    # Rows with fewer stored neighbors than requested get zero-score items, as a full sort would
+    for i in np.flatnonzero((result < 0).any(axis=1)):
+        padded = _pad_with_unscored(result[i][result[i] >= 0], indices[i], top_n)
+        result[i, :len(padded)] = padded
+
+    return result
+
 @lru_cache(maxsize=128)
 def get_similar_indices(idx, top_n=5):
     """Get indices of similar fragrances with caching"""
-    global _cosine_sim
-    
-    # For sparse matrices
-    if hasattr(_cosine_sim, 'toarray'):
-        row = _cosine_sim[idx].toarray().flatten()
-    else:
-        row = _cosine_sim[idx]
-    
-    # Get top similar indices (excluding self)
-    sim_scores = list(enumerate(row))
-    sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-    sim_scores = [i for i in sim_scores if i[0] != idx][:top_n]
-    return [i[0] for i in sim_scores]
+    return [int(i) for i in get_similar_indices_batch([idx], top_n)[0] if i >= 0]
 
-def hybrid_recommendations(user_id, title=None, top_n=5, page=1, per_page=5):
-    """Generate recommendations with pagination"""
-    global _df, _cosine_sim
-    
-    # Ensure valid pagination parameters
-    page = max(1, page)  # Minimum page is 1
-    per_page = max(1, min(20, per_page))  # Between 1 and 20
-    
-    # Calculate pagination offsets
-    start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
-    
-    user = User.query.get(user_id)
-    all_recs = []
+def invalidate_recommendations(user_id):
+    """Forget cached rankings of a user whose quiz answers or favourites changed"""
+    with _ranked_cache_lock:
+        _ranked_generations[user_id] = _ranked_generations.get(user_id, 0) + 1
+    _ranked_cache.discard_where(lambda key: key[0] == user_id)
+
+def clear_recommendations():
+    """Forget every cached ranking, e.g. when the database is swapped out"""
+    _ranked_cache.clear()
+    _ranking_snapshots.clear()
+
+def _score_user(user_id, title, top_n):
+    """Combine every recommendation signal for a user into one score vector"""
+    catalog = get_catalog()
+    scores = ScoreVector(len(_df))
 
     # 1. Content-based recommendations if title provided
     if title:
-        title = title.strip().lower()
-        matches = _df[_df['Name'].str.lower().str.strip() == title].index
-        if len(matches) > 0:
-            idx = matches[0]
-            perfume_indices = get_similar_indices(idx, top_n=10)
-            for idx in perfume_indices:
-                if idx < len(_df):
-                    all_recs.append((_df.iloc[idx], 0.8))  # Weight content recs highly
+        idx = _name_index.lookup(title)
+        if idx >= 0:
+            scores.add(get_similar_indices(idx, top_n=10), CONTENT_WEIGHT)  # Weight content recs highly
 
     # 2. Quiz-based recommendations
     quiz_result = QuizResult.query.filter_by(user_id=user_id).first()
     if quiz_result:
         try:
-            prefs = json.loads(quiz_result.preferences)
-            
-            # Map vibe to accords for beginners
-            if prefs.get('experience_level') == 'Beginner' and prefs.get('vibe'):
-                vibe_map = {
-                    'Fresh and clean': ['Fresh', 'Citrus', 'Aquatic', 'Green'],
-                    'Warm and cosy': ['Vanilla', 'Amber', 'Gourmand', 'Woody'],
-                    'Bold and attention-grabbing': ['Spicy', 'Woody', 'Leather', 'Oriental'],
-                    'Light and subtle': ['Floral', 'Citrus', 'Powdery', 'Fresh']
-                }
-                prefs['desired_accords'] = vibe_map.get(prefs['vibe'], [])
-            
-            # Apply lightweight filtering
-            candidates = []
-            
-            if 'gender' in prefs:
-                gender_matches = _df[_df['Gender'] == prefs['gender']]
-                candidates.extend(list(gender_matches.index))
-            
-            # Only do this filtering if we have candidates or no gender filter applied
-            if candidates or 'gender' not in prefs:
-                # Rating filter (simple numeric comparison is fast)
-                if 'min_rating' in prefs:
-                    min_rating = float(prefs['min_rating'])
-                    rating_matches = _df[_df['Rating Value'] >= min_rating]
-                    if candidates:
-                        # Intersection
-                        candidates = [idx for idx in candidates if idx in rating_matches.index]
-                    else:
-                        candidates = list(rating_matches.index)
-                
-                # Accord matching
-                if 'desired_accords' in prefs:
-                    desired_accords = prefs['desired_accords']
-                    if not candidates:
-                        # If no candidates yet, check all fragrances
-                        for idx in range(len(_df)):
-                            accords = _df.iloc[idx]['Main Accords']
-                            if isinstance(accords, str) and accords:
-                                # Convert string representation to list
-                                if accords.startswith('['):
-                                    try:
-                                        accord_list = json.loads(accords)
-                                    except:
-                                        accord_list = accords.strip('[]').replace("'", "").split(',')
-                                else:
-                                    accord_list = [a.strip() for a in accords.split(',')]
-                                
-                                # Count matches between desired accords and fragrance accords
-                                score = sum(1 for accord in desired_accords if any(a.strip().lower() == accord.lower() for a in accord_list))
-                                if score > 0:  # Only add if there's at least one match
-                                    all_recs.append((_df.iloc[idx], score * 0.2 + 0.5))  # Weight by matches
-                    else:
-                        # Check only existing candidates
-                        for idx in candidates:
-                            if idx < len(_df):
-                                accords = _df.iloc[idx]['Main Accords']
-                                if isinstance(accords, str) and accords:
-                                    # Convert string representation to list
-                                    if accords.startswith('['):
-                                        try:
-                                            accord_list = json.loads(accords)
-                                        except:
-                                            accord_list = accords.strip('[]').replace("'", "").split(',')
-                                    else:
-                                        accord_list = [a.strip() for a in accords.split(',')]
-                                    
-                                    # Count matches between desired accords and fragrance accords
-                                    score = sum(1 for accord in desired_accords if any(a.strip().lower() == accord.lower() for a in accord_list))
-                                    if score > 0:  # Only add if there's at least one match
-                                        all_recs.append((_df.iloc[idx], score * 0.2 + 0.5))  # Weight by matches
-            
-            # If we don't have recommendations but have a quiz result, add some default recommendations
-            if not all_recs:
-                top_rated = _df.sort_values('Rating Value', ascending=False).head(5)
-                for _, row in top_rated.iterrows():
-                    all_recs.append((row, 0.5))  # Medium weight
-                    
+            add_quiz_signal(scores, catalog, json.loads(quiz_result.preferences))
         except Exception as e:
             print(f"Error processing quiz preferences: {str(e)}")
 
@@ -212,51 +233,90 @@ def hybrid_recommendations(user_id, title=None, top_n=5, page=1, per_page=5):
         for fav_id in fav_ids[:3]:  # Limit to 3 favorites to avoid too much processing
             try:
                 if fav_id in _df.index:
-                    similar_indices = get_similar_indices(fav_id, top_n=3)
-                    for idx in similar_indices:
-                        if idx < len(_df):
-                            all_recs.append((_df.iloc[idx], 0.7))  # High weight for favorites-based
+                    scores.add(get_similar_indices(fav_id, top_n=3), FAVORITE_WEIGHT)  # High weight for favorites-based
             except Exception as e:
                 print(f"Error processing favorite {fav_id}: {str(e)}")
 
     # If no recommendations found, add default top-rated fragrances
-    if not all_recs:
-        top_rated = _df.sort_values('Rating Value', ascending=False).head(top_n)
-        for _, row in top_rated.iterrows():
-            all_recs.append((row, 0.3))  # Lower weight
-
-    # Remove duplicates by keeping highest score for each fragrance
-    unique_recs = {}
-    for fragrance, score in all_recs:
-        name = fragrance['Name']
-        if name not in unique_recs or unique_recs[name][1] < score:
-            unique_recs[name] = (fragrance, score)
-
-    # Sort by score and apply pagination
-    sorted_recs = sorted(unique_recs.values(), key=lambda x: x[1], reverse=True)
-    paginated_recs = sorted_recs[start_idx:end_idx]
+    if not scores:
+        scores.add(catalog.rating_order[:top_n], POPULAR_WEIGHT)  # Lower weight
+
+    return scores
+
+def ranking_snapshot(user_id, title=None, top_n=5):
+    """(snapshot id, rows) of the user's current ranking, materialized on first use"""
+    generation = _ranked_generations.get(user_id, 0)
+    key = (user_id, generation, title, top_n)
+    snapshot_id = _ranked_cache.get(key)
+    snapshot = _ranking_snapshots.get(snapshot_id) if snapshot_id else None
+    if snapshot is None:
+        # One row per fragrance name, best score first
+        rows = _score_user(user_id, title, top_n).ranked(get_catalog().name_codes, 0, len(_df))
+        rows = rows.astype(np.int32)
+        rows.flags.writeable = False
+        snapshot_id = uuid.uuid4().hex
+        snapshot = (user_id, rows)
+        _ranking_snapshots.set(snapshot_id, snapshot)
+        # A ranking computed while the user's data changed is stored under the
+        # old generation, so it is never served to new requests
+        _ranked_cache.set(key, snapshot_id)
+    return snapshot_id, snapshot[1]
+
+def get_ranking_snapshot(snapshot_id, user_id):
+    """Rows of a snapshot owned by the user, or None once it has been evicted"""
+    snapshot = _ranking_snapshots.get(snapshot_id)
+    if snapshot is None or snapshot[0] != user_id:
+        return None
+    return snapshot[1]
+
+def ranked_recommendations(user_id, title=None, top_n=5):
+    """Every recommended row for a user, best first, cached until their quiz or favourites change"""
+    return ranking_snapshot(user_id, title, top_n)[1]
+
+def hybrid_recommendations(user_id, title=None, top_n=5, page=1, per_page=5):
+    """Generate recommendations with pagination"""
+    # Ensure valid pagination parameters
+    page = max(1, page)  # Minimum page is 1
+    per_page = max(1, min(20, per_page))  # Between 1 and 20
     
-    # Extract just the fragrances (without scores)
-    result = [rec[0] for rec in paginated_recs]
+    # Calculate pagination offsets
+    start_idx = (page - 1) * per_page
+    end_idx = start_idx + per_page
     
-    return pd.DataFrame(result)
+    # Pages are slices of the user's cached ranking
+    rows = ranked_recommendations(user_id, title, top_n)
+    return _df.iloc[rows[start_idx:end_idx]]
+
+def _records(recommendations, fields=None):
+    """Catalog rows as a JSON array of records, joined from cached per-row fragments.
+
+    With `fields`, only their columns are read and encoded.
+    """
+    columns = None if fields is None else catalog_columns(fields, _df.columns)
+    return get_catalog().record_encoder(columns).encode(recommendations.index)
 
 @recommendations_bp.route('/quiz', methods=['POST', 'OPTIONS'])  
 def get_recommendations():
-    user = get_current_user()
+    user_id = get_current_user_id()
+    if user_id is None:
+        return jsonify({"error": "Authentication required"}), 401
     title = request.args.get('title', '').strip()
     page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 5))
+    try:
+        fields = parse_fields(request.args.get('fields'), CATALOG_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     try:
-        recommendations = hybrid_recommendations(user.id, title if title else None, 
+        recommendations = hybrid_recommendations(user_id, title if title else None, 
                                                top_n=20, page=page, per_page=per_page)
         
         if recommendations.empty:
             return jsonify({"message": "No recommendations found. Try exploring more fragrances!"}), 200
             
-        return jsonify({
-            "recommendations": recommendations.to_dict(orient='records'),
+        return json_response({
+            "recommendations": _records(recommendations, fields),
             "type": "hybrid",
             "count": len(recommendations),
             "page": page,
@@ -271,21 +331,46 @@ def get_recommendations():
 @recommendations_bp.route('/recommendations/personalized', methods=['GET'])
 @login_required
 def personalized_recommendations():
-    user = get_current_user()
+    user_id = get_current_user_id()
+    cursor = request.args.get('cursor')
     page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 5))
     
+    per_page = max(1, min(20, per_page))  # Between 1 and 20
     try:
-        recommendations = hybrid_recommendations(user.id, page=page, per_page=per_page)
-        if recommendations.empty:
+        fields = parse_fields(request.args.get('fields'), CATALOG_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        if cursor:
+            # Continue an earlier ranking from where the last page stopped
+            try:
+                snapshot_id, offset = decode_cursor(cursor)
+                if not isinstance(snapshot_id, str) or not isinstance(offset, int) or offset < 0:
+                    raise ValueError("Invalid cursor")
+            except (TypeError, ValueError):
+                return jsonify({"error": "Invalid cursor"}), 400
+            rows = get_ranking_snapshot(snapshot_id, user_id)
+            if rows is None:
+                return jsonify({"error": "Cursor has expired, start again without a cursor"}), 410
+        else:
+            snapshot_id, rows = ranking_snapshot(user_id)
+            offset = (max(1, page) - 1) * per_page
+
+        recommendations = _df.iloc[rows[offset:offset + per_page]]
+        if recommendations.empty and not cursor:
             recommendations = _df.sort_values('Rating Value', ascending=False).head(per_page)
-            
-        return jsonify({
-            "recommendations": recommendations.to_dict(orient='records'),
+
+        end = offset + per_page
+        return json_response({
+            "recommendations": _records(recommendations, fields),
             "type": "personalized",
             "count": len(recommendations),
+            "total": len(rows),
             "page": page,
-            "per_page": per_page
+            "per_page": per_page,
+            "next_cursor": encode_cursor([snapshot_id, end]) if end < len(rows) else None
         }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -293,28 +378,33 @@ def personalized_recommendations():
 @recommendations_bp.route('/api/quiz', methods=['POST'])
 @login_required
 def handle_quiz_submission():
-    user = get_current_user()
+    user_id = get_current_user_id()
     data = request.get_json()
     if not data or 'preferences' not in data:
         return jsonify({
             "success": False,
             "error": "Invalid quiz data format"
         }), 400
+    try:
+        fields = parse_fields(request.args.get('fields'), CATALOG_FIELDS)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
 
     try:
-        QuizResult.query.filter_by(user_id=user.id).delete()
+        QuizResult.query.filter_by(user_id=user_id).delete()
         quiz_result = QuizResult(
-            user_id=user.id,
+            user_id=user_id,
             preferences=json.dumps(data['preferences'])
         )
         db.session.add(quiz_result)
         db.session.commit()
+        invalidate_recommendations(user_id)
 
         # Get first page of recommendations
-        recommendations = hybrid_recommendations(user.id, page=1, per_page=5)
-        return jsonify({
+        recommendations = hybrid_recommendations(user_id, page=1, per_page=5)
+        return json_response({
             "success": True,
-            "recommendations": recommendations.to_dict(orient='records')
+            "recommendations": _records(recommendations, fields)
         })
 
     except Exception as e:
@@ -325,66 +415,65 @@ def handle_quiz_submission():
             "error": "Failed to process quiz. Please try again."
         }), 500
 
+def resolve_fragrance_names(names):
+    """Resolve many fragrance names to dataset rows, -1 where nothing matches"""
+    return np.array([_name_index.lookup(name) for name in names], dtype=np.int64)
+
+# Fields of a similar-fragrance payload: (catalog column, conversion, value if the column is missing)
+SIMILAR_FIELDS = {
+    'name': ('Name', str, None),
+    'brand': ('Brand', str, ''),
+    'gender': ('Gender', str, ''),
+    'rating_value': ('Rating Value', float, 0),
+    'rating_count': ('Rating Count', int, 0),
+    'main_accords': ('Main Accords', str, ''),
+    'description': ('Description', str, ''),
+    'url': ('url', str, ''),
+}
+
+def _similar_fragrance_payload(i, fields=None):
+    """Payload of one dataset row, reading only the columns of `fields` (all by default)"""
+    payload = {'id': int(i)}
+    for field in SIMILAR_FIELDS if fields is None else fields:
+        column, convert, missing = SIMILAR_FIELDS[field]
+        payload[field] = convert(_df[column].iat[i] if column in _df.columns else missing)
+    return payload
+
+def _ensure_recommendation_data():
+    global _df, _cosine_sim
+    if _df is None or not _similarity_loaded():
+        print("Loading recommendation data...")
+        _df, _cosine_sim = load_recommendation_data()
+        print("Data loaded successfully")
+
 @recommendations_bp.route('/recommendations/similar', methods=['GET'])
+@conditional(lambda: get_catalog().version, SIMILAR_MAX_AGE)
 def get_similar_fragrances():
     name = request.args.get('name', '').strip()
     print(f"Received request for similar fragrances to: '{name}'")
+    try:
+        fields = parse_fields(request.args.get('fields'), tuple(SIMILAR_FIELDS))
+    except ValueError as e:
+        return jsonify({"error": str(e), "recommendations": []}), 400
     
     try:
         # Load data if not already loaded
-        global _df, _cosine_sim
-        if _df is None or _cosine_sim is None:
-            print("Loading recommendation data...")
-            _df, _cosine_sim = load_recommendation_data()
-            print("Data loaded successfully")
-        
-        print(f"Looking for fragrance in dataset of {len(_df)} items")
-        
-        # Clean up the name for comparison
-        search_name = name.lower().strip()
-        # Remove common suffixes that might be part of the name
-        search_name = search_name.replace('for women and men', '').strip()
-        search_name = search_name.replace('for men', '').strip()
-        search_name = search_name.replace('for women', '').strip()
-        
-        print(f"Searching for cleaned name: '{search_name}'")
-        
-        # Try exact match first
-        matches = _df[_df['Name'].str.lower().str.strip() == search_name].index
-        
-        # If no exact match, try partial match
-        if len(matches) == 0:
-            print(f"No exact match found, trying partial match")
-            partial_matches = _df[_df['Name'].str.lower().str.strip().str.contains(search_name, na=False)]
-            if not partial_matches.empty:
-                print(f"Found {len(partial_matches)} partial matches")
-                matches = [partial_matches.index[0]]
-                print(f"Using first match: {partial_matches.iloc[0]['Name']}")
-            else:
-                print(f"No matches found for: {search_name}")
-                return jsonify({"message": "Fragrance not found", "recommendations": []}), 404
-
-        idx = matches[0]
+        _ensure_recommendation_data()
+
+        idx = resolve_fragrance_names([name])[0]
+        if idx < 0:
+            print(f"No matches found for: {normalize_name(name)}")
+            return jsonify({"message": "Fragrance not found", "recommendations": []}), 404
+
         print(f"Found fragrance at index {idx}: {_df.iloc[idx]['Name']}")
         
-        indices = get_similar_indices(idx, top_n=5)
+        indices = get_similar_indices(int(idx), top_n=5)
         print(f"Found similar indices: {indices}")
         
         similar_fragrances = []
         for i in indices:
             try:
-                fragrance = _df.iloc[i]
-                similar_fragrances.append({
-                    'id': int(i),
-                    'name': str(fragrance['Name']),
-                    'brand': str(fragrance.get('Brand', '')),
-                    'gender': str(fragrance.get('Gender', '')),
-                    'rating_value': float(fragrance.get('Rating Value', 0)),
-                    'rating_count': int(fragrance.get('Rating Count', 0)),
-                    'main_accords': str(fragrance.get('Main Accords', '')),
-                    'description': str(fragrance.get('Description', '')),
-                    'url': str(fragrance.get('url', ''))
-                })
+                similar_fragrances.append(_similar_fragrance_payload(i, fields))
             except Exception as e:
                 print(f"Error processing fragrance at index {i}: {str(e)}")
                 continue
@@ -401,3 +490,62 @@ def get_similar_fragrances():
         print(f"Error in get_similar_fragrances:")
         print(traceback.format_exc())
         return jsonify({"error": str(e), "recommendations": []}), 500
+
+@recommendations_bp.route('/recommendations/similar/batch', methods=['POST'])
+def get_similar_fragrances_batch():
+    """Similar fragrances for several names or dataset IDs in one round trip"""
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "items must be a non-empty list of fragrance names or IDs"}), 400
+    if len(items) > MAX_SIMILAR_BATCH:
+        return jsonify({"error": f"At most {MAX_SIMILAR_BATCH} items are allowed per request"}), 400
+    if any(isinstance(item, bool) or not isinstance(item, (str, int)) for item in items):
+        return jsonify({"error": "items must be fragrance names (strings) or IDs (integers)"}), 400
+
+    try:
+        top_n = max(1, min(20, int(data.get('top_n', 5))))
+    except (TypeError, ValueError):
+        return jsonify({"error": "top_n must be an integer"}), 400
+    try:
+        fields = parse_fields(request.args.get('fields'), tuple(SIMILAR_FIELDS))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        _ensure_recommendation_data()
+
+        # IDs are used as-is; names go through the name index one lookup each
+        seeds = np.full(len(items), -1, dtype=np.int64)
+        name_positions = [i for i, item in enumerate(items) if isinstance(item, str)]
+        if name_positions:
+            seeds[name_positions] = resolve_fragrance_names([items[i] for i in name_positions])
+        for i, item in enumerate(items):
+            if isinstance(item, int) and 0 <= item < len(_df):
+                seeds[i] = item
+
+        found = np.flatnonzero(seeds >= 0)
+        neighbors = get_similar_indices_batch(seeds[found], top_n=top_n)
+
+        # Build each fragrance payload once even if it is similar to several seeds
+        payloads = {int(i): _similar_fragrance_payload(i, fields) for i in np.unique(neighbors[neighbors >= 0])}
+
+        # Aligned with the input rather than keyed by it: the name "12" and the ID 12 are different items
+        results = [None] * len(items)
+        for row, position in zip(neighbors, found):
+            results[position] = [payloads[int(i)] for i in row if i >= 0]
+        not_found = [items[i] for i in np.flatnonzero(seeds < 0)]
+
+        return jsonify({
+            "results": results,
+            "not_found": not_found,
+            "type": "similar",
+            "count": len(found)
+        }), 200
+
+    except Exception as e:
+        import traceback
+        print(f"Error in get_similar_fragrances_batch:")
+        print(traceback.format_exc())
+        return jsonify({"error": str(e), "results": []}), 500
@@ -0,0 +1,205 @@
+import re
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer, ENGLISH_STOP_WORDS
+
+# Per-field term frequency weights (a simplified BM25F): a hit in the name
+# or brand says more about the fragrance than a word in its description.
+FIELD_WEIGHTS = {
+    'Name': 3,
+    'Brand': 3,
+    'Main Accords': 2,
+    'Description': 1,
+}
+
+# Postings are cut into blocks so lists that only refine existing candidates
+# can skip straight to the blocks that hold them.
+BLOCK_SIZE = 128
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase word tokens with English stop words removed"""
+    if not isinstance(text, str):
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in ENGLISH_STOP_WORDS]
+
+
+_UINT_DTYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+
+def _narrowest_uints(max_values):
+    """Narrowest unsigned dtype holding each of `max_values`"""
+    limits = np.array([np.iinfo(dtype).max for dtype in _UINT_DTYPES[:-1]], dtype=np.uint64)
+    codes = np.searchsorted(limits, max_values.astype(np.uint64))
+    return [_UINT_DTYPES[code] for code in codes]
+
+
+class _Postings:
+    """Compressed posting list of one term.
+
+    Doc ids are stored as gaps from the first doc of their block, in the
+    narrowest unsigned dtype that fits; term frequencies likewise.
+    """
+
+    __slots__ = ('df', 'block_first', 'block_last', 'gaps', 'tfs', 'max_score')
+
+    def __init__(self, block_first, block_last, gaps, tfs, max_score):
+        self.df = len(gaps)
+        self.block_first = block_first
+        self.block_last = block_last
+        self.gaps = gaps
+        self.tfs = tfs
+        self.max_score = max_score
+
+    def decode(self, blocks=None):
+        """Doc ids and term frequencies, for every block or only the given ones"""
+        if blocks is None:
+            positions = np.arange(self.df)
+        else:
+            positions = (blocks[:, None] * BLOCK_SIZE + np.arange(BLOCK_SIZE)).ravel()
+            positions = positions[positions < self.df]
+        gaps = self.gaps[positions].astype(np.int64)
+        block_ids = positions // BLOCK_SIZE
+        # Cumulative sum of gaps, restarted at every block boundary
+        totals = np.cumsum(gaps)
+        restart = np.flatnonzero(np.diff(block_ids, prepend=-1))
+        totals -= np.repeat(totals[restart] - gaps[restart], np.diff(np.append(restart, len(gaps))))
+        docs = self.block_first[block_ids].astype(np.int64) + totals
+        return docs, self.tfs[positions].astype(np.float64)
+
+
+class BM25Index:
+    """Inverted index over fragrance name, brand, accords and description"""
+
+    def __init__(self, df, k1=1.2, b=0.75, field_weights=None):
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(df)
+        field_weights = field_weights or FIELD_WEIGHTS
+        fields = [(df[column].fillna('').astype(str), weight)
+                  for column, weight in field_weights.items() if column in df.columns]
+
+        # Same tokens as tokenize(), counted by sklearn instead of a Python loop.
+        # All fields are stacked so the vocabulary is fitted in a single pass.
+        counter = CountVectorizer(token_pattern=_TOKEN_RE.pattern, stop_words=list(ENGLISH_STOP_WORDS),
+                                  dtype=np.int64)
+        stacked = counter.fit_transform(pd.concat([values for values, _ in fields], ignore_index=True))
+        counts = sum(stacked[i * self.n_docs:(i + 1) * self.n_docs] * weight
+                     for i, (_, weight) in enumerate(fields)).tocsc()
+        counts.sort_indices()
+
+        doc_lengths = np.asarray(counts.sum(axis=1)).ravel().astype(np.float64)
+        avg_length = doc_lengths.mean() if self.n_docs else 0.0
+        # Per-document part of the BM25 denominator, shared by every term
+        self.doc_norms = k1 * (1 - b + b * doc_lengths / avg_length) if avg_length else np.full(self.n_docs, k1)
+
+        self.postings = {}
+        doc_freqs = np.diff(counts.indptr)
+        terms = np.flatnonzero(doc_freqs)
+        if not len(terms):
+            return
+        starts, doc_freqs = counts.indptr[terms], doc_freqs[terms]
+
+        # Best score each term can contribute, for MaxScore pruning
+        idf = np.log(1 + (self.n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5))
+        docs = counts.indices.astype(np.int64)
+        tfs = counts.data
+        entry_scores = np.repeat(idf, doc_freqs) * tfs * (k1 + 1) / (tfs + self.doc_norms[docs])
+        max_scores = np.maximum.reduceat(entry_scores, starts)
+
+        # Gap-encode every posting list at once: the offset of an entry inside
+        # its list decides where blocks start and end
+        offsets = np.arange(len(docs)) - np.repeat(starts, doc_freqs)
+        block_starts = offsets % BLOCK_SIZE == 0
+        block_ends = (offsets % BLOCK_SIZE == BLOCK_SIZE - 1) | (offsets == np.repeat(doc_freqs, doc_freqs) - 1)
+        gaps = np.diff(docs, prepend=0)
+        gaps[block_starts] = 0
+        block_first = docs[block_starts].astype(np.int32)
+        block_last = docs[block_ends].astype(np.int32)
+        block_indptr = np.concatenate(([0], np.cumsum(-(-doc_freqs // BLOCK_SIZE))))
+
+        gap_dtypes = _narrowest_uints(np.maximum.reduceat(gaps, starts))
+        tf_dtypes = _narrowest_uints(np.maximum.reduceat(tfs, starts))
+        gaps_as = {dtype: gaps.astype(dtype) for dtype in set(gap_dtypes)}
+        tfs_as = {dtype: tfs.astype(dtype) for dtype in set(tf_dtypes)}
+
+        vocabulary = counter.get_feature_names_out()
+        for i, column in enumerate(terms):
+            start, end = starts[i], starts[i] + doc_freqs[i]
+            first_block, last_block = block_indptr[i], block_indptr[i + 1]
+            self.postings[vocabulary[column]] = _Postings(
+                block_first[first_block:last_block].copy(),
+                block_last[first_block:last_block].copy(),
+                gaps_as[gap_dtypes[i]][start:end].copy(),
+                tfs_as[tf_dtypes[i]][start:end].copy(),
+                float(max_scores[i]),
+            )
+
+    def idf(self, postings):
+        return np.log(1 + (self.n_docs - postings.df + 0.5) / (postings.df + 0.5))
+
+    def _term_scores(self, postings, docs, tfs):
+        return self.idf(postings) * tfs * (self.k1 + 1) / (tfs + self.doc_norms[docs])
+
+    @staticmethod
+    def _merge(docs, scores, new_docs, new_scores):
+        """Union of two (sorted doc ids, scores) sets, summing scores of shared docs"""
+        all_docs = np.concatenate((docs, new_docs))
+        all_scores = np.concatenate((scores, new_scores))
+        order = np.argsort(all_docs, kind='stable')
+        all_docs, all_scores = all_docs[order], all_scores[order]
+        unique_docs, starts = np.unique(all_docs, return_index=True)
+        return unique_docs, np.add.reduceat(all_scores, starts) if len(all_docs) else all_scores
+
+    @staticmethod
+    def _kth_score(scores, k):
+        if len(scores) < k:
+            return -np.inf
+        return np.partition(scores, len(scores) - k)[len(scores) - k]
+
+    def search(self, query, top_n=10, exhaustive=False):
+        """Top-n (doc ids, scores) by BM25, best first, ties by lowest doc id.
+
+        Terms are visited in decreasing order of their best possible score
+        (MaxScore). Once the k-th best score found so far beats what all
+        remaining terms could add together, unseen documents can no longer
+        enter the top-n: the remaining lists only refine current candidates,
+        decoding just the blocks that contain them.
+        """
+        terms = [self.postings[t] for t in dict.fromkeys(tokenize(query)) if t in self.postings]
+        terms.sort(key=lambda p: p.max_score, reverse=True)
+        remaining = np.cumsum([p.max_score for p in terms][::-1])[::-1] if terms else []
+
+        docs = np.empty(0, dtype=np.int64)
+        scores = np.empty(0, dtype=np.float64)
+        threshold = -np.inf
+        for i, postings in enumerate(terms):
+            if not exhaustive and threshold > remaining[i]:
+                # Drop candidates that cannot reach the current top-n anymore
+                keep = scores + remaining[i] >= threshold
+                docs, scores = docs[keep], scores[keep]
+                blocks = np.unique(np.searchsorted(postings.block_last, docs))
+                blocks = blocks[blocks < len(postings.block_first)]
+                term_docs, tfs = postings.decode(blocks)
+                hits = np.searchsorted(term_docs, docs)
+                found = hits < len(term_docs)
+                found[found] = term_docs[hits[found]] == docs[found]
+                scores[found] += self._term_scores(postings, docs[found], tfs[hits[found]])
+            else:
+                term_docs, tfs = postings.decode()
+                docs, scores = self._merge(docs, scores, term_docs, self._term_scores(postings, term_docs, tfs))
+            threshold = self._kth_score(scores, top_n)
+
+        if len(docs) > top_n:
+            kth = self._kth_score(scores, top_n)
+            keep = scores >= kth
+            docs, scores = docs[keep], scores[keep]
+        order = np.lexsort((docs, -scores))[:top_n]
+        return docs[order], scores[order]
+
+    def postings_bytes(self):
+        """Memory held by the compressed posting lists"""
+        return sum(p.gaps.nbytes + p.tfs.nbytes + p.block_first.nbytes + p.block_last.nbytes
+                   for p in self.postings.values())
@@ -0,0 +1,136 @@
+import os
+import pickle
+import threading
+import uuid
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.preprocessing import normalize
+from search_bm25 import BM25Index
+from search_suggest import PrefixIndex
+from catalog import FragranceCatalog, get_catalog
+from cache import LRUCache
+from fast_json import RecordEncoder, RECORD_PROJECTION_CACHE_SIZE
+
+# Columns of a search result
+RESULT_COLUMNS = ('Name', 'Gender', 'Rating Value', 'Rating Count',
+                  'Main Accords', 'Perfumers', 'Description', 'url')
+
+
+class SearchIndex:
+    """TF-IDF search data, loaded once per process and shared across requests"""
+
+    def __init__(self, df, tfidf_matrix, vectorizer):
+        self.df = df
+        self.vectorizer = vectorizer
+        # Identifies this build of the index; cached search results are only valid for it
+        self.version = uuid.uuid4().hex
+        # Rows are L2-normalized once here so a query is a single sparse dot product
+        self.normalized_matrix = normalize(csr_matrix(tfidf_matrix)) if tfidf_matrix is not None else None
+        self._bm25 = None
+        self._suggest = None
+        self._record_encoder = None
+        self._projections = LRUCache(RECORD_PROJECTION_CACHE_SIZE)
+        self._build_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, base_dir=None):
+        """Read the TF-IDF matrix and vectorizer from disk for the shared catalog"""
+        if base_dir is None:
+            base_dir = os.path.dirname(os.path.abspath(__file__))
+            df = get_catalog().frame
+        else:
+            df = FragranceCatalog.load(base_dir).frame
+
+        # Load TF-IDF matrix and vectorizer
+        tfidf_matrix_path = os.path.join(base_dir, 'tfidf_matrix_search.pkl')
+        vectorizer_path = os.path.join(base_dir, 'vectorizer.pkl')
+
+        if os.path.exists(tfidf_matrix_path) and os.path.exists(vectorizer_path):
+            with open(tfidf_matrix_path, 'rb') as f:
+                tfidf_matrix = pickle.load(f)
+            with open(vectorizer_path, 'rb') as f:
+                vectorizer = pickle.load(f)
+        else:
+            print("Warning: Search files not found. Search functionality may not work correctly.")
+            tfidf_matrix = None
+            vectorizer = None
+
+        return cls(df, tfidf_matrix, vectorizer)
+
+    @property
+    def available(self):
+        return self.normalized_matrix is not None and self.vectorizer is not None
+
+    @property
+    def bm25(self):
+        """Inverted BM25 index over the same rows, built on first use"""
+        if self._bm25 is None:
+            with self._build_lock:
+                if self._bm25 is None:
+                    self._bm25 = BM25Index(self.df)
+        return self._bm25
+
+    @property
+    def suggest(self):
+        """Typeahead prefix index over names, brands and accords, built on first use"""
+        if self._suggest is None:
+            with self._build_lock:
+                if self._suggest is None:
+                    self._suggest = PrefixIndex.from_dataframe(self.df)
+        return self._suggest
+
+    def record_encoder(self, columns=RESULT_COLUMNS):
+        """Cached JSON records of search results with these columns, built on first use.
+
+        Other column sets than RESULT_COLUMNS are projections of that encoder,
+        and only the last few are kept since clients choose them.
+        """
+        if self._record_encoder is None:
+            with self._build_lock:
+                if self._record_encoder is None:
+                    self._record_encoder = RecordEncoder(self.df, RESULT_COLUMNS)
+        key = tuple(columns)
+        if key == RESULT_COLUMNS:
+            return self._record_encoder
+        projection = self._projections.get(key)
+        if projection is None:
+            projection = self._record_encoder.project(columns)
+            self._projections.set(key, projection)
+        return projection
+
+    def top_matches(self, user_query, top_n=5):
+        """Row positions of the top_n cosine matches for a query, best first"""
+        query_vec = normalize(self.vectorizer.transform([user_query]))
+        similarities = (self.normalized_matrix @ query_vec.T).toarray().ravel()
+
+        top_n = min(top_n, len(similarities))
+        if top_n <= 0:
+            return np.empty(0, dtype=np.int64)
+        kth = len(similarities) - top_n
+        candidates = np.flatnonzero(similarities >= np.partition(similarities, kth)[kth])
+        # Best score first, lowest row first on ties
+        order = np.lexsort((candidates, -similarities[candidates]))[:top_n]
+        return candidates[order]
+
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """Return the process-wide search index, loading it on first use"""
+    global _search_index
+    if _search_index is None:
+        with _search_index_lock:
+            if _search_index is None:
+                _search_index = SearchIndex.load()
+    return _search_index
+
+
+def reload_search_index():
+    """Reload the search index from disk, e.g. after the search files were rebuilt"""
+    global _search_index
+    index = SearchIndex.load()
+    with _search_index_lock:
+        _search_index = index
+    return index
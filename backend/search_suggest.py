@@ -0,0 +1,103 @@
+import re
+from bisect import bisect_left
+import numpy as np
+from name_index import normalize_name
+
+# Upper bound on suggestions per request; short prefixes cache this many
+MAX_SUGGESTIONS = 20
+
+# Prefixes up to this length match most of the catalog, so their results are memoized
+SHORT_PREFIX_LENGTH = 2
+
+_ACCORD_RE = re.compile(r"[^,\[\]'\"]+")
+
+
+def _brand(name, brand):
+    """Brand column if the dataset has one, otherwise the first word of the name like db_setup"""
+    if isinstance(brand, str) and brand.strip():
+        return brand.strip()
+    return name.split(' ')[0] if ' ' in name else None
+
+
+def _accords(value):
+    if not isinstance(value, str):
+        return []
+    return [a.strip() for a in _ACCORD_RE.findall(value) if a.strip()]
+
+
+def _word_suffixes(text):
+    """Keys for every word start, so 'blue' finds 'Light Blue'"""
+    words = text.split()
+    return [' '.join(words[i:]) for i in range(len(words))]
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over fragrance names, brands and accords.
+
+    Every suggestion has a precomputed popularity weight. Entries are ranked
+    once by (weight desc, text), so a lookup is a bisect for the key range
+    plus a partial sort of integer ranks within it.
+    """
+
+    def __init__(self, entries):
+        # entries: iterable of (text, type, weight, keys)
+        entries = sorted(entries, key=lambda e: (-e[2], e[0].lower(), e[1]))
+        self.texts = [text for text, _, _, _ in entries]
+        self.types = [kind for _, kind, _, _ in entries]
+
+        pairs = sorted((key, rank) for rank, (_, _, _, keys) in enumerate(entries) for key in set(keys))
+        self.keys = [key for key, _ in pairs]
+        self.key_ranks = np.array([rank for _, rank in pairs], dtype=np.int32)
+        # Most keys any single entry has; bounds duplicates inside one key range
+        self.max_keys_per_entry = max((len(set(keys)) for _, _, _, keys in entries), default=1)
+        self._short_prefixes = {}
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Names weighted by rating count, brands and accords by the total of their fragrances"""
+        popularity = df['Rating Count'].fillna(0).to_numpy(dtype=np.float64) if 'Rating Count' in df else np.zeros(len(df))
+        brand_column = df['Brand'] if 'Brand' in df else [None] * len(df)
+        accord_column = df['Main Accords'] if 'Main Accords' in df else [None] * len(df)
+
+        names, brands, accords = {}, {}, {}
+        for name, brand, accord_list, weight in zip(df['Name'].astype(str).str.strip(), brand_column,
+                                                    accord_column, popularity):
+            names[name] = max(names.get(name, 0), weight)
+            brand = _brand(name, brand)
+            if brand:
+                brands[brand] = brands.get(brand, 0) + weight
+            for accord in _accords(accord_list):
+                accords[accord] = accords.get(accord, 0) + weight
+
+        entries = [(name, 'fragrance', weight, _word_suffixes(normalize_name(name))) for name, weight in names.items()]
+        entries += [(brand, 'brand', weight, _word_suffixes(brand.lower())) for brand, weight in brands.items()]
+        entries += [(accord, 'accord', weight, [accord.lower()]) for accord, weight in accords.items()]
+        return cls(entries)
+
+    def _top_ranks(self, prefix, limit):
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + '\uffff')
+        ranks = self.key_ranks[lo:hi]
+        # An entry shows up once per matching key, so over-fetch before dropping duplicates
+        fetch = limit * self.max_keys_per_entry
+        if len(ranks) > fetch:
+            ranks = np.partition(ranks, fetch - 1)[:fetch]
+        return np.unique(ranks)[:limit]
+
+    def suggest(self, prefix, limit=10):
+        """Up to `limit` suggestions whose name, brand or accord has a word starting with `prefix`"""
+        prefix = ' '.join(str(prefix).lower().split())
+        limit = max(1, min(limit, MAX_SUGGESTIONS))
+        if not prefix:
+            return []
+
+        if len(prefix) <= SHORT_PREFIX_LENGTH:
+            ranks = self._short_prefixes.get(prefix)
+            if ranks is None:
+                ranks = self._top_ranks(prefix, MAX_SUGGESTIONS)
+                self._short_prefixes[prefix] = ranks
+            ranks = ranks[:limit]
+        else:
+            ranks = self._top_ranks(prefix, limit)
+
+        return [{'text': self.texts[rank], 'type': self.types[rank]} for rank in ranks]
@@ -3,6 +3,10 @@ import os
 import tempfile
 from main import create_app
 from models import db, User
+from db_setup import populate_fragrances
+from routes.recommendations import clear_recommendations
+from routes.fragrances import invalidate_fragrance_totals
+from http_cache import clear_precompressed
 import bcrypt
 import uuid
 
@@ -22,6 +26,14 @@ def app():
     # Create the database and load test data
     with app.app_context():
         db.create_all()
+    populate_fragrances(app)
+
+    # User ids restart in every test database, so cached rankings must not carry over
+    clear_recommendations()
+    # So are catalog import ids, which key the cached fragrance totals
+    invalidate_fragrance_totals()
+    # Import ids restart too, and compressed pages are cached by an ETag derived from them
+    clear_precompressed()
     
     yield app
     
@@ -0,0 +1,30 @@
+import numpy as np
+from accords import AccordIndex, parse_accords
+
+ACCORDS = [
+    "['citrus', 'fresh', 'aquatic']",
+    '["Vanilla", "amber"]',
+    'woody, citrus',
+    '',
+    None,
+]
+
+def test_parse_accords():
+    """Test list literals, JSON lists and comma-separated strings all parse"""
+    assert parse_accords(ACCORDS[0]) == ['citrus', 'fresh', 'aquatic']
+    assert parse_accords(ACCORDS[1]) == ['Vanilla', 'amber']
+    assert parse_accords(ACCORDS[2]) == ['woody', 'citrus']
+    assert parse_accords(ACCORDS[4]) == []
+    assert parse_accords("['broken") == ['broken']
+
+def test_accord_index_scores():
+    """Test desired-accord scores for all items at once"""
+    index = AccordIndex.from_series(ACCORDS)
+    assert index.counts.shape == (5, 6)
+    # Exact names, counting the item's accords that are desired
+    assert index.match_counts(['citrus', 'amber', 'Fresh']).tolist() == [1, 1, 1, 0, 0]
+    assert index.has_accord('Vanilla').tolist() == [False, True, False, False, False]
+    assert not index.has_accord('rose').any()
+    # Case-insensitive, counting every desired entry the item has
+    assert index.desired_matches(['CITRUS', 'vanilla', 'Citrus']).tolist() == [2, 1, 2, 0, 0]
+    assert np.array_equal(index.desired_matches([]), np.zeros(5))
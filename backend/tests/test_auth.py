@@ -2,6 +2,7 @@ import pytest
 from flask import session
 from models import User, db
 import bcrypt
+from passwords import configure_password_hasher
 import json
 import uuid
 
@@ -146,4 +147,24 @@ def test_me_endpoint(test_client):
         # Test /me when not logged in
         test_client.post('/api/logout')
         response = test_client.get('/api/me')
-        assert response.status_code == 401 
\ No newline at end of file
+        assert response.status_code == 401
+
+
+def test_login_rehashes_at_configured_cost(test_client, auth_user):
+    """A successful login upgrades a hash made at another cost"""
+    configure_password_hasher(rounds=4, workers=1)
+    response = test_client.post('/api/login', json={'email': auth_user.email, 'password': 'testpass123'})
+    assert response.status_code == 200
+    with test_client.application.app_context():
+        user = db.session.get(User, auth_user.id)
+        assert user.password.startswith(b'$2b$04$')
+    response = test_client.post('/api/login', json={'email': auth_user.email, 'password': 'testpass123'})
+    assert response.status_code == 200
+
+
+def test_login_busy_when_hash_queue_full(test_client, auth_user):
+    """Logins beyond the hashing cap are turned away instead of queueing"""
+    configure_password_hasher(rounds=4, workers=1, max_pending=0)
+    response = test_client.post('/api/login', json={'email': auth_user.email, 'password': 'testpass123'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
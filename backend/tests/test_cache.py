@@ -0,0 +1,35 @@
+from cache import LRUCache
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.set('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert len(cache) == 2
+
+def test_lru_cache_discard_where():
+    cache = LRUCache()
+    for key in [(1, 'x'), (1, 'y'), (2, 'x')]:
+        cache.set(key, key)
+    cache.discard_where(lambda key: key[0] == 1)
+    assert len(cache) == 1 and cache.get((2, 'x')) == (2, 'x')
+    assert cache.get((1, 'x'), 'missing') == 'missing'
+
+def test_lru_cache_ttl_and_byte_bound():
+    now = [0.0]
+    cache = LRUCache(maxsize=10, ttl=60, maxbytes=10, sizeof=lambda key, value: len(value), clock=lambda: now[0])
+    cache.set('a', 'xxxx')
+    cache.set('b', 'yyyy')
+    assert cache.get('a') == 'xxxx'
+    cache.set('c', 'zzzz')  # 12 bytes: 'b' is least recently used
+    assert 'b' not in cache and cache.nbytes == 8
+    cache.set('huge', 'x' * 11)  # Never fits
+    assert 'huge' not in cache
+
+    now[0] = 61
+    assert cache.get('a') is None and 'c' not in cache
+    assert cache.stats() == {'entries': 1, 'bytes': 4, 'hits': 1, 'misses': 1,
+                             'evictions': 1, 'expirations': 1}
@@ -0,0 +1,43 @@
+import pytest
+import numpy as np
+import pandas as pd
+from catalog import FragranceCatalog, get_catalog
+
+def _frame():
+    return pd.DataFrame({
+        'Name': ['Light Blue', 'Sauvage for men'],
+        'Gender': ['Women', None],
+        'Rating Value': [4.1, None],
+        'Rating Count': [120, None],
+        'Main Accords': ["['citrus', 'fresh']", None],
+        'Description': [None, 'Spicy and fresh'],
+    })
+
+def test_catalog_columns_are_typed_and_read_only():
+    """Test the snapshot exposes typed, immutable columns"""
+    catalog = FragranceCatalog(_frame())
+    assert len(catalog) == 2
+    assert catalog.ids.tolist() == [0, 1]
+    assert catalog.rating_counts.dtype == np.int64 and catalog.rating_counts.tolist() == [120, 0]
+    assert np.isnan(catalog.rating_values[1])
+    assert catalog.genders.tolist() == ['Women', '']
+    assert catalog.descriptions[0] == ''
+    with pytest.raises(ValueError):
+        catalog.rating_values[0] = 5.0
+
+def test_catalog_indexes_built_once():
+    """Test derived indexes are built lazily and then reused"""
+    catalog = FragranceCatalog(_frame())
+    assert catalog.name_index is catalog.name_index
+    assert catalog.name_index.lookup('sauvage') == 1
+    assert catalog.accord_index.has_accord('citrus').tolist() == [True, False]
+
+def test_blueprints_share_one_catalog(test_client):
+    """Test search, quiz and recommendations read the same loaded dataset"""
+    from routes import recommendations, quiz
+    from search_index import get_search_index
+    test_client.get('/api/search?query=citrus')
+    frame = get_catalog().frame
+    assert recommendations._df is frame
+    assert quiz.get_df() is frame
+    assert get_search_index().df is frame
@@ -0,0 +1,54 @@
+import json
+import os
+import pandas as pd
+from catalog import FragranceCatalog, CATALOG_FILENAME
+from catalog_snapshot import write_snapshot, SNAPSHOT_DIRNAME, MANIFEST_FILENAME
+
+def _write_csv(directory):
+    frame = pd.DataFrame({
+        'Name': ['Light Blue', 'Noir "Extreme"', 'Ébène'],
+        'Gender': ['Women', None, 'Men'],
+        'Rating Value': [4.1, None, 3.9],
+        'Rating Count': [120, 5, 42],
+        'Main Accords': ["['citrus', 'fresh']", None, "['woody', 'Citrus']"],
+        'Perfumers': ["['Olivier Cresp']", None, '[]'],
+        'Description': ['Fresh, bright\nand clear', None, 'Woody'],
+    })
+    path = os.path.join(directory, CATALOG_FILENAME)
+    frame.to_csv(path, index=False)
+    return path
+
+def test_snapshot_roundtrip_matches_csv(tmp_path):
+    """Test the snapshot loads the same frame and accords as parsing the CSV"""
+    csv_path = _write_csv(tmp_path)
+    write_snapshot(csv_path, os.path.join(tmp_path, SNAPSHOT_DIRNAME))
+
+    from_csv = FragranceCatalog.load(str(tmp_path), use_snapshot=False)
+    from_snapshot = FragranceCatalog.load(str(tmp_path))
+    assert from_snapshot.source.endswith(SNAPSHOT_DIRNAME)
+    assert from_snapshot.checksum == from_csv.checksum
+    pd.testing.assert_frame_equal(from_snapshot.frame, from_csv.frame)
+    assert from_snapshot.accord_index.vocabulary == from_csv.accord_index.vocabulary
+    assert (from_snapshot.accord_index.counts != from_csv.accord_index.counts).nnz == 0
+    assert from_snapshot.accord_index.desired_matches(['citrus']).tolist() == [1, 0, 1]
+
+def test_stale_or_corrupt_snapshot_falls_back_to_csv(tmp_path):
+    """Test a snapshot built from another CSV, or with a bad manifest, is ignored"""
+    csv_path = _write_csv(tmp_path)
+    snapshot_dir = os.path.join(tmp_path, SNAPSHOT_DIRNAME)
+    write_snapshot(csv_path, snapshot_dir)
+
+    with open(csv_path, 'a') as f:
+        f.write('Added,Men,4.0,1,[],[],New\n')
+    catalog = FragranceCatalog.load(str(tmp_path))
+    assert catalog.source == csv_path
+    assert len(catalog) == 4
+
+    write_snapshot(csv_path, snapshot_dir)
+    manifest_path = os.path.join(snapshot_dir, MANIFEST_FILENAME)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest['format_version'] = 999
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f)
+    assert FragranceCatalog.load(str(tmp_path)).source == csv_path
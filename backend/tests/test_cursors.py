@@ -0,0 +1,11 @@
+import pytest
+from cursors import encode_cursor, decode_cursor
+
+def test_cursor_round_trip():
+    token = encode_cursor(['3f2a', 40])
+    assert '=' not in token and '/' not in token
+    assert decode_cursor(token) == ['3f2a', 40]
+
+def test_malformed_cursor():
+    with pytest.raises(ValueError):
+        decode_cursor('%%%')
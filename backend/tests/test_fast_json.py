@@ -0,0 +1,75 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+import fast_json
+from fast_json import RecordEncoder, RawJSON, dumps
+from catalog import get_catalog
+
+def _frame():
+    return pd.DataFrame({
+        'Name': ['Aqua Verde', 'Nuit d’Ambre', 'Cedar'],
+        'Rating Value': [4.25, np.nan, 3.0],
+        'Rating Count': [120, 8, 0],
+        'Main Accords': ["['citrus', 'fresh']", "['amber']", None],
+    })
+
+@pytest.fixture(params=fast_json.BACKENDS)
+def backend(request):
+    previous = fast_json.use_backend(request.param)
+    yield request.param
+    fast_json.use_backend(previous)
+
+def test_records_match_to_dict(backend):
+    """Cached fragments decode to the to_dict records, with missing numbers as null"""
+    frame = _frame()
+    encoder = RecordEncoder(frame, converters={'Main Accords': lambda value: value.strip('[]').split(', ') if value else []})
+    records = json.loads(encoder.encode([2, 0, 1]))
+    expected = frame.iloc[[2, 0, 1]].to_dict(orient='records')
+    for record in expected:
+        record['Main Accords'] = record['Main Accords'].strip('[]').split(', ') if record['Main Accords'] else []
+        if np.isnan(record['Rating Value']):
+            record['Rating Value'] = None
+    assert records == expected
+    assert encoder.fragment(0) is encoder.fragment(0)  # Encoded once
+
+def test_backends_write_identical_bytes():
+    payload = {'b': [1, 2.5, None], 'a': 'café', 'rows': RawJSON(b'[{"x":1}]'), 'n': np.int64(3)}
+    outputs = []
+    for name in fast_json.BACKENDS:
+        previous = fast_json.use_backend(name)
+        outputs.append(dumps(payload))
+        fast_json.use_backend(previous)
+    assert outputs[0] == outputs[1]
+    assert json.loads(outputs[0]) == {'a': 'café', 'b': [1, 2.5, None], 'n': 3, 'rows': [{'x': 1}]}
+    assert list(json.loads(outputs[0])) == ['a', 'b', 'n', 'rows']
+
+def test_quiz_response_records(auth_client):
+    """The quiz endpoint sends parsed accord lists from the catalog rows"""
+    auth_client.post('/api/quiz/start', json={'experience_level': 'Beginner'})
+    response = auth_client.post('/api/quiz/submit', json={'answers': {'vibe': 'Fresh and clean', 'min_rating': 0}})
+    assert response.status_code == 200
+    records = response.get_json()['recommendations']
+    assert records
+    names = set(get_catalog().frame['Name'])
+    for record in records:
+        assert record['Name'] in names
+        assert isinstance(record['Main Accords'], list)
+
+def test_projections_share_values_and_are_bounded(backend):
+    """Client-chosen column sets are projections of one encoder, and only the last few are kept"""
+    frame = _frame()
+    encoder = RecordEncoder(frame)
+    projection = encoder.project(['Rating Value', 'Name'])
+    assert json.loads(projection.encode([1])) == [{'Name': 'Nuit d’Ambre', 'Rating Value': None}]
+    assert projection._columns['Name'] is encoder._columns['Name']
+
+    catalog = get_catalog()
+    catalog.record_encoder()
+    encoders = len(catalog._record_encoders)
+    columns = list(catalog.frame.columns)
+    for size in range(1, len(columns) + 1):
+        for start in range(len(columns)):
+            catalog.record_encoder(columns[start:start + size])
+    assert len(catalog._projections) <= fast_json.RECORD_PROJECTION_CACHE_SIZE
+    assert len(catalog._record_encoders) == encoders
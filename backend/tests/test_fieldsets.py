@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from fieldsets import parse_fields, CATALOG_FIELDS
+
+def _select_statements(client, url):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(Engine, 'before_cursor_execute', listener)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', listener)
+    return response, [s for s in statements if 'FROM fragrances' in s and 'count(' not in s.lower()]
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields('url, name,,name') == ('name', 'url')
+    with pytest.raises(ValueError, match='brand'):
+        parse_fields('name,brand', CATALOG_FIELDS)
+
+def test_listing_selects_only_requested_columns(test_client):
+    response, selects = _select_statements(test_client, '/api/fragrances?limit=5&fields=name,rating_value')
+    data = response.get_json()
+    assert all(set(fragrance) == {'id', 'name', 'rating_value'} for fragrance in data['fragrances'])
+    assert selects and all('description' not in s and 'perfumers' not in s for s in selects)
+
+    # Cursors still work on a projection and give the same rows as the full listing
+    full = test_client.get('/api/fragrances?limit=5&cursor=' + data['next_cursor']).get_json()
+    page = test_client.get('/api/fragrances?limit=5&fields=name&cursor=' + data['next_cursor']).get_json()
+    assert [f['id'] for f in page['fragrances']] == [f['id'] for f in full['fragrances']]
+
+def test_detail_and_unknown_fields(test_client):
+    response, selects = _select_statements(test_client, '/api/fragrances/1?fields=brand')
+    assert response.get_json().keys() == {'id', 'brand'}
+    assert all('description' not in s for s in selects)
+    response = test_client.get('/api/fragrances/1?fields=name,price')
+    assert response.status_code == 400
+    assert 'price' in response.get_json()['error']
+
+def test_catalog_endpoints_project_columns(test_client, auth_client):
+    results = test_client.get('/api/search?query=fresh citrus&fields=name,rating_value').get_json()['results']
+    assert results and all(set(record) == {'Name', 'Rating Value'} for record in results)
+    assert test_client.get('/api/search?query=fresh&fields=brand').status_code == 400
+
+    recs = auth_client.get('/api/recommendations/personalized?fields=name,main_accords').get_json()['recommendations']
+    assert recs and all(set(record) == {'Name', 'Main Accords'} for record in recs)
+
+    similar = test_client.get('/api/recommendations/similar?name=Light Blue&fields=name').get_json()
+    assert similar['recommendations'] and all(set(r) == {'id', 'name'} for r in similar['recommendations'])
+
+def test_favourites_fields(auth_client):
+    auth_client.post('/api/favourites', json={'fragrance_id': 2})
+    favourites = auth_client.get('/api/favourites?fields=name,url').get_json()['favourites']
+    assert [set(favourite['fragrance']) for favourite in favourites] == [{'id', 'name', 'url'}]
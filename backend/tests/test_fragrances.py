@@ -1,6 +1,9 @@
 import pytest
 import json
 from models import User, Fragrance, Favorite, db
+from routes.fragrances import invalidate_fragrance_totals
+from import_catalog import import_catalog
+from catalog import find_catalog_csv
 
 def test_get_fragrances_pagination(test_client):
     """Test fragrance listing with pagination"""
@@ -36,6 +39,100 @@ def test_get_fragrances_filtering(test_client):
     for fragrance in data['fragrances']:
         assert 'Dior' in fragrance['brand']
 
+def test_get_fragrances_cursor_matches_offset(test_client):
+    """Following next_cursor walks the same listing as offsets, into the unrated tail"""
+    with test_client.application.app_context():
+        unrated = Fragrance(name='Unrated Test', brand='Unrated', gender='Unisex')
+        db.session.add(unrated)
+        db.session.commit()
+        unrated_id = unrated.id
+    invalidate_fragrance_totals()  # Added outside a catalog import
+    try:
+        total = test_client.get('/api/fragrances?limit=1').get_json()['total']
+        by_offset = test_client.get(f'/api/fragrances?limit={total}').get_json()['fragrances']
+
+        by_cursor, cursor = [], None
+        while True:
+            url = '/api/fragrances?limit=7' + (f'&cursor={cursor}' if cursor else '')
+            data = test_client.get(url).get_json()
+            by_cursor.extend(f['id'] for f in data['fragrances'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        assert by_cursor == [f['id'] for f in by_offset]
+        # Unrated fragrances come last, newest first
+        assert unrated_id in by_cursor
+        unrated_tail = [f['id'] for f in by_offset if f['rating_value'] is None]
+        assert by_cursor[-len(unrated_tail):] == sorted(unrated_tail, reverse=True)
+    finally:
+        with test_client.application.app_context():
+            db.session.delete(db.session.get(Fragrance, unrated_id))
+            db.session.commit()
+        invalidate_fragrance_totals()
+
+def test_get_fragrances_invalid_cursor(test_client):
+    """Malformed listing cursors are rejected"""
+    response = test_client.get('/api/fragrances?cursor=WyJ4Il0')
+    assert response.status_code == 400
+
+def test_fragrance_totals_cached_per_filter(test_client):
+    """Totals are counted once per filter combination until the catalog is imported again"""
+    from routes.fragrances import _total_cache
+    invalidate_fragrance_totals()
+    total = test_client.get('/api/fragrances?gender=Unisex&limit=1').get_json()['total']
+    test_client.get('/api/fragrances?gender=Unisex&limit=5')
+    assert len(_total_cache) == 1
+
+    # A new import, even from another process, starts new cache entries
+    with test_client.application.app_context():
+        import_catalog(db.engine, find_catalog_csv(), verbose=False)
+    assert test_client.get('/api/fragrances?gender=Unisex&limit=1').get_json()['total'] == total
+    assert len(_total_cache) == 2
+
+def test_fragrance_totals_zero_min_rating(test_client):
+    """min_rating=0 drops unrated rows, so its total is cached apart from the unfiltered one"""
+    with test_client.application.app_context():
+        unrated = Fragrance.query.filter(Fragrance.rating_value.is_(None)).count()
+    assert unrated > 0
+    for queries in (('', '?min_rating=0'), ('?min_rating=0', '')):
+        invalidate_fragrance_totals()
+        totals = {query: test_client.get(f'/api/fragrances{query}').get_json()['total'] for query in queries}
+        assert totals[''] - totals['?min_rating=0'] == unrated
+
+def test_get_fragrances_text_query(test_client):
+    """q= matches whole words or a final prefix in the text columns, with filters and cursors"""
+    data = test_client.get('/api/fragrances?q=Ocean&gender=Women&limit=100').get_json()
+    assert data['total'] == len(data['fragrances']) > 0
+    for fragrance in data['fragrances']:
+        text = ' '.join(str(fragrance[column]) for column in
+                        ('name', 'brand', 'main_accords', 'perfumers', 'description')).lower()
+        assert 'ocean' in text and fragrance['gender'] == 'Women'
+
+    by_cursor, cursor = [], None
+    while True:
+        url = '/api/fragrances?q=oce&gender=Women&limit=3' + (f'&cursor={cursor}' if cursor else '')
+        page = test_client.get(url).get_json()
+        by_cursor.extend(f['id'] for f in page['fragrances'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert by_cursor == [f['id'] for f in data['fragrances']]
+
+def test_full_text_index_follows_updates(test_client):
+    """Triggers keep the full-text index in step with the fragrances table"""
+    with test_client.application.app_context():
+        fragrance = db.session.get(Fragrance, 1)
+        fragrance.name = 'Zyxwv Special'
+        db.session.commit()
+    ids = [f['id'] for f in test_client.get('/api/fragrances?q=zyxwv').get_json()['fragrances']]
+    assert ids == [1]
+
+    with test_client.application.app_context():
+        db.session.delete(db.session.get(Fragrance, 1))
+        db.session.commit()
+    invalidate_fragrance_totals()
+    assert test_client.get('/api/fragrances?q=zyxwv').get_json()['total'] == 0
+
 def test_get_single_fragrance(test_client):
     """Test getting a single fragrance by ID"""
     # Get first fragrance from list
@@ -150,4 +247,43 @@ def test_check_favorite_status(auth_client, auth_user):
     response = auth_client.get('/api/favourites/check/2')
     assert response.status_code == 200
     data = json.loads(response.data)
-    assert data['is_favorite'] is False 
\ No newline at end of file
+    assert data['is_favorite'] is False 
+
+def test_search_requires_query(test_client):
+    """Test search without a query"""
+    response = test_client.get('/api/search')
+    assert response.status_code == 400
+
+def test_search_reuses_process_index(test_client):
+    """Test search requests share one index until it is explicitly reloaded"""
+    import search_index
+
+    test_client.get('/api/search?query=vanilla')
+    index = search_index.get_search_index()
+    response = test_client.get('/api/search?query=vanilla')
+    assert response.status_code == 200
+    assert 'results' in json.loads(response.data)
+    assert search_index.get_search_index() is index
+
+    reloaded = search_index.reload_search_index()
+    assert reloaded is not index
+    assert search_index.get_search_index() is reloaded
+
+def test_search_results_cached_per_normalized_query(test_client):
+    """Repeated searches are served from the result cache until the index is reloaded"""
+    import search_index
+    from routes.fragrances import clear_search_cache, search_cache_stats
+    clear_search_cache()
+    before = search_cache_stats()
+
+    first = test_client.get('/api/search?query=Vanilla Amber')
+    assert first.headers['X-Search-Cache'] == 'miss'
+    again = test_client.get('/api/search?query=  vanilla   AMBER')
+    assert again.headers['X-Search-Cache'] == 'hit'
+    assert again.get_json() == first.get_json()
+    stats = test_client.get('/api/search/stats').get_json()['cache']
+    assert (stats['hits'] - before['hits'], stats['misses'] - before['misses'], stats['entries']) == (1, 1, 1)
+
+    search_index.reload_search_index()
+    assert test_client.get('/api/search?query=vanilla amber').headers['X-Search-Cache'] == 'miss'
+    assert search_cache_stats()['entries'] == 1
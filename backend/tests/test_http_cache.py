@@ -0,0 +1,64 @@
+import gzip
+from models import db
+from import_catalog import import_catalog
+from catalog import find_catalog_csv
+
+def test_fragrance_detail_not_modified(test_client):
+    """A matching If-None-Match gets a 304 after a single version lookup"""
+    response = test_client.get('/api/fragrances/1')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert not etag.startswith('W/')
+    assert response.headers['Cache-Control'] == 'public, max-age=300'
+
+    response = test_client.get('/api/fragrances/1', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+    assert response.headers['X-SQL-Queries'] == '1'
+
+    # Another fragrance, or the same one after a re-import, is a different representation
+    assert test_client.get('/api/fragrances/2', headers={'If-None-Match': etag}).status_code == 200
+    with test_client.application.app_context():
+        import_catalog(db.engine, find_catalog_csv(), verbose=False)
+    response = test_client.get('/api/fragrances/1', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_listing_gzip_above_threshold(test_client):
+    plain = test_client.get('/api/fragrances?limit=20')
+    assert 'Content-Encoding' not in plain.headers
+    response = test_client.get('/api/fragrances?limit=20', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == plain.data
+    assert response.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+
+    # The compressed representation's ETag revalidates too
+    response = test_client.get('/api/fragrances?limit=20', headers={'Accept-Encoding': 'gzip',
+                                                                    'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+
+    # Small bodies are not worth compressing
+    test_client.application.config['COMPRESS_MIN_SIZE'] = 10 ** 6
+    response = test_client.get('/api/fragrances?limit=20', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+def test_detail_served_precompressed(test_client):
+    """Repeated compressed detail requests come from the cache without loading the fragrance"""
+    test_client.application.config['COMPRESS_MIN_SIZE'] = 0
+    plain = test_client.get('/api/fragrances/3')
+    first = test_client.get('/api/fragrances/3', headers={'Accept-Encoding': 'gzip'})
+    second = test_client.get('/api/fragrances/3', headers={'Accept-Encoding': 'gzip'})
+    assert first.data == second.data
+    assert gzip.decompress(second.data) == plain.data
+    assert second.headers['Content-Encoding'] == 'gzip'
+    assert second.headers['X-SQL-Queries'] == '1'
+    assert test_client.get('/api/fragrances/999999', headers={'Accept-Encoding': 'gzip'}).status_code == 404
+
+def test_similar_not_modified(test_client):
+    response = test_client.get('/api/recommendations/similar?name=Light Blue')
+    assert response.status_code == 200
+    response = test_client.get('/api/recommendations/similar?name=Light Blue',
+                               headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
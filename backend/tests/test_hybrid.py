@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from catalog import FragranceCatalog
+from hybrid import ScoreVector, add_quiz_signal
+
+def _catalog():
+    return FragranceCatalog(pd.DataFrame({
+        'Name': ['A', 'B', 'A', 'C', 'D', 'E'],
+        'Gender': ['Women', 'Men', 'Women', 'Women', 'Men', 'Unisex'],
+        'Rating Value': [4.0, 4.5, 3.0, 4.8, 2.0, 4.5],
+        'Rating Count': [10, 20, 30, 40, 50, 60],
+        'Main Accords': ["['citrus']", "['woody', 'citrus']", "['vanilla']", "['amber']", "['citrus']", '[]'],
+        'Description': [''] * 6,
+    }))
+
+def test_score_vector_keeps_best_score_per_name():
+    """Test one row per name, best score first, ties in first-proposed order"""
+    catalog = _catalog()
+    scores = ScoreVector(len(catalog))
+    scores.add([3, 1], 0.5)
+    scores.add([0, 2], [0.5, 0.9])  # row 2 shares name 'A' with row 0
+    scores.add([3, 5], 0.7)
+    assert scores.ranked(catalog.name_codes, 0, 10).tolist() == [2, 3, 5, 1]
+    assert scores.ranked(catalog.name_codes, 1, 3).tolist() == [3, 5]
+    assert scores.ranked(catalog.name_codes, 4, 6).tolist() == []
+
+def test_score_vector_ties_keep_earliest_row():
+    """Test an equal score later on does not replace the row representing a name"""
+    catalog = _catalog()
+    scores = ScoreVector(len(catalog))
+    scores.add([1], 0.7)
+    scores.add([2, 0], 0.7)
+    assert scores.ranked(catalog.name_codes, 0, 5).tolist() == [1, 2]
+    assert not ScoreVector(3)
+
+def test_quiz_signal():
+    """Test quiz preferences score candidates by matching accords"""
+    catalog = _catalog()
+    scores = ScoreVector(len(catalog))
+    add_quiz_signal(scores, catalog, {'gender': 'Women', 'desired_accords': ['Citrus', 'amber']})
+    assert np.isclose(scores.scores[[0, 3]], 0.7).all()
+    assert np.isinf(scores.scores[[1, 2, 4, 5]]).all()
+
+    # No gender match means no candidates, so the best rated fragrances are used
+    scores = ScoreVector(len(catalog))
+    add_quiz_signal(scores, catalog, {'gender': 'Nobody', 'desired_accords': ['citrus']})
+    assert catalog.rating_order[:5].tolist() == [3, 1, 5, 0, 2]
+    assert scores.ranked(catalog.name_codes, 0, 5).tolist() == [3, 1, 5, 0]  # rows 0 and 2 are both 'A'
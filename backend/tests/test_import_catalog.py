@@ -0,0 +1,75 @@
+import os
+import tempfile
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from models import db
+from import_catalog import import_catalog
+
+@pytest.fixture
+def engine():
+    db_fd, db_path = tempfile.mkstemp()
+    engine = create_engine(f'sqlite:///{db_path}')
+    db.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+    os.close(db_fd)
+    os.unlink(db_path)
+
+def _write_csv(path, rows):
+    columns = ['Name', 'Gender', 'Rating Value', 'Rating Count', 'Main Accords', 'Perfumers', 'Description', 'url']
+    pd.DataFrame(rows, columns=columns).to_csv(path, index=False)
+
+def test_import_is_idempotent_upsert(engine, tmp_path):
+    csv_path = str(tmp_path / 'catalog.csv')
+    rows = [
+        ['Light Blue Dolce', 'Women', 4.1, 100, "['citrus']", "['A']", 'Fresh.', 'u/1'],
+        ['Sauvage', 'Men', None, None, None, None, None, 'u/2'],
+        ['No Url', 'Men', 3.0, 1, None, None, None, None],
+        ['Bleu Chanel', 'Men', 4.5, 50, "['woody']", "['B']", 'Woody.', 'u/3'],
+    ]
+    _write_csv(csv_path, rows)
+
+    first = import_catalog(engine, csv_path, chunk_size=2, verbose=False)
+    assert (first['rows_read'], first['inserted'], first['updated']) == (4, 3, 0)
+    assert import_catalog(engine, csv_path, verbose=False)['inserted'] == 0
+    assert import_catalog(engine, csv_path, verbose=False)['updated'] == 0
+
+    # A changed rating updates the row in place, keeping its id
+    rows[3][2] = 4.6
+    rows.append(['New One', 'Unisex', 3.5, 5, None, None, None, 'u/4'])
+    _write_csv(csv_path, rows)
+    third = import_catalog(engine, csv_path, verbose=False)
+    assert (third['inserted'], third['updated']) == (1, 1)
+
+    with engine.connect() as connection:
+        fragrances = connection.execute(text(
+            "SELECT id, name, brand, rating_value, main_accords FROM fragrances ORDER BY id")).fetchall()
+        imports = connection.execute(text("SELECT COUNT(*) FROM catalog_imports")).scalar()
+    assert fragrances == [
+        (1, 'Light Blue Dolce', 'Light', 4.1, "['citrus']"),
+        (2, 'Sauvage', 'Unknown', None, None),
+        (3, 'Bleu Chanel', 'Bleu', 4.6, "['woody']"),
+        (4, 'New One', 'New', 3.5, None),
+    ]
+    assert imports == 4
+
+def test_repeated_url_across_chunks_keeps_first_row(engine, tmp_path):
+    csv_path = str(tmp_path / 'catalog.csv')
+    rows = [
+        ['Lancome Musk', 'Women', 4.0, 10, None, None, None, 'u/1'],
+        ['Sauvage', 'Men', 4.2, 20, None, None, None, 'u/2'],
+        ['Bleu Chanel', 'Men', 4.5, 50, None, None, None, 'u/3'],
+        ['DUPLICATE', 'Men', 1.0, 1, None, None, None, 'u/1'],
+        ['New One', 'Unisex', 3.5, 5, None, None, None, 'u/4'],
+    ]
+    _write_csv(csv_path, rows)
+
+    first = import_catalog(engine, csv_path, chunk_size=2, verbose=False)
+    assert (first['inserted'], first['updated']) == (4, 0)
+    second = import_catalog(engine, csv_path, chunk_size=2, verbose=False)
+    assert (second['inserted'], second['updated']) == (0, 0)
+
+    with engine.connect() as connection:
+        name = connection.execute(text("SELECT name FROM fragrances WHERE url = 'u/1'")).scalar_one()
+    assert name == 'Lancome Musk'
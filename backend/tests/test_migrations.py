@@ -0,0 +1,112 @@
+import os
+import re
+import tempfile
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from models import db, Favorite, QuizResult, Fragrance
+from migrations import run_migrations
+from routes.fragrances import RATING_ORDER, rating_page
+
+HOT_TABLES = ('favorites', 'quiz_results', 'fragrances')
+
+@pytest.fixture
+def legacy_engine():
+    """A database with the tables as they were before any secondary index"""
+    db_fd, db_path = tempfile.mkstemp()
+    engine = create_engine(f'sqlite:///{db_path}')
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for table in HOT_TABLES:
+            for index in inspect(connection).get_indexes(table):
+                connection.execute(text(f"DROP INDEX {index['name']}"))
+        connection.execute(text("DROP TABLE catalog_imports"))
+    yield engine
+    engine.dispose()
+    os.close(db_fd)
+    os.unlink(db_path)
+
+def test_migrations_add_indexes_once(legacy_engine):
+    with legacy_engine.begin() as connection:
+        connection.execute(text("INSERT INTO users (id, email, password) VALUES (1, 'a@example.com', 'x')"))
+        connection.execute(text("INSERT INTO fragrances (id, name, brand) VALUES (1, 'Light Blue', 'Light')"))
+        for _ in range(3):
+            connection.execute(text("INSERT INTO favorites (user_id, fragrance_id) VALUES (1, 1)"))
+
+    assert run_migrations(legacy_engine) == [1, 2, 3, 4]
+    assert run_migrations(legacy_engine) == []
+
+    with legacy_engine.connect() as connection:
+        indexes = {table: {index['name'] for index in inspect(connection).get_indexes(table)}
+                   for table in HOT_TABLES}
+        # Duplicate favorites were collapsed to the oldest row
+        assert connection.execute(text("SELECT id FROM favorites")).fetchall() == [(1,)]
+        # Rows that predate the full-text index are indexed by the migration
+        assert connection.execute(text(
+            "SELECT rowid FROM fragrances_fts WHERE fragrances_fts MATCH 'light'")).fetchall() == [(1,)]
+    assert indexes == {
+        'favorites': {'ix_favorites_user_fragrance'},
+        'quiz_results': {'ix_quiz_results_user_id'},
+        'fragrances': {'ix_fragrances_gender_rating', 'ix_fragrances_rating_value', 'ix_fragrances_url'},
+    }
+    assert {'catalog_imports', 'fragrances_fts'} <= set(inspect(legacy_engine).get_table_names())
+
+def test_fts_reindexes_only_changed_text(legacy_engine):
+    """Rewriting unchanged text, as a catalog import does on a rating refresh, leaves the index alone"""
+    run_migrations(legacy_engine)
+    with legacy_engine.begin() as connection:
+        connection.execute(text("INSERT INTO fragrances (id, name, brand) VALUES (1, 'Light Blue', 'Light')"))
+
+        def writes(statement):
+            # total_changes() also counts rows written by triggers
+            before = connection.execute(text("SELECT total_changes()")).scalar()
+            connection.execute(text(statement))
+            return connection.execute(text("SELECT total_changes()")).scalar() - before
+
+        assert writes("UPDATE fragrances SET name = 'Light Blue', brand = 'Light', rating_value = 4.1") == 1
+        assert writes("UPDATE fragrances SET name = 'Dark Blue', rating_value = 4.2") > 1
+        assert connection.execute(text(
+            "SELECT rowid FROM fragrances_fts WHERE fragrances_fts MATCH 'dark'")).fetchall() == [(1,)]
+
+def _plan(statement):
+    sql = str(statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    with db.engine.connect() as connection:
+        return [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+def test_hot_queries_use_indexes(app):
+    """Fails if a hot query falls back to a full table scan or a sort"""
+    with app.app_context():
+        run_migrations(db.engine)
+        listing = Fragrance.query.order_by(*RATING_ORDER).limit(20)
+        queries = {
+            'favorite lookup': Favorite.query.filter_by(user_id=1, fragrance_id=1),
+            'favorites by user': Favorite.query.filter_by(user_id=1),
+            'quiz by user': QuizResult.query.filter_by(user_id=1),
+            'listing': listing,
+            'listing by gender': Fragrance.query.filter(Fragrance.gender == 'Unisex').order_by(*RATING_ORDER).limit(20),
+            'listing by rating': Fragrance.query.filter(Fragrance.rating_value >= 4.0).order_by(*RATING_ORDER).limit(20),
+            'listing by gender and rating': Fragrance.query.filter(
+                Fragrance.gender == 'Unisex', Fragrance.rating_value >= 4.0).order_by(*RATING_ORDER).limit(20),
+        }
+
+        # The unfiltered listing walks the rating index in order; everything else must seek
+        ordered_scans = {'listing': 'SCAN fragrances USING INDEX ix_fragrances_rating_value'}
+        for name, query in queries.items():
+            plan = _plan(query.statement)
+            scans = [step for step in plan if re.match(rf"SCAN ({'|'.join(HOT_TABLES)})\b", step)
+                     and step != ordered_scans.get(name)]
+            sorts = [step for step in plan if 'TEMP B-TREE' in step]
+            assert not scans and not sorts, f"{name}: {plan}"
+            if name not in ordered_scans:
+                assert any(step.startswith('SEARCH ') for step in plan), f"{name}: {plan}"
+
+        # Keyset pages seek in the rating index instead of scanning it
+        captured = []
+        listener = lambda conn, cursor, statement, params, context, many: captured.append((statement, params))
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            rating_page(Fragrance.query, (4.0, 100), 20)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        with db.engine.connect() as connection:
+            plan = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {captured[0][0]}", captured[0][1])]
+        assert any(step.startswith('SEARCH fragrances USING INDEX ix_fragrances_rating_value') for step in plan), plan
@@ -0,0 +1,34 @@
+from name_index import NameIndex, normalize_name
+
+NAMES = [
+    'Light Blue',
+    'Light Blue Intense',
+    'Sauvage for men',
+    'Dior Sauvage Elixir',
+    'Bleu de Chanel',
+    'Light Blue',
+]
+
+def test_normalize_name():
+    """Test names are lowercased and lose their gender suffix"""
+    assert normalize_name('  Sauvage for men ') == 'sauvage'
+    assert normalize_name('Alien for women and men') == 'alien'
+
+def test_exact_lookup():
+    """Test exact lookups ignore case and suffixes, first row wins on duplicates"""
+    index = NameIndex(NAMES)
+    assert index.exact('light blue') == 0
+    assert index.exact('SAUVAGE') == 2
+    assert index.exact('Sauvage for women') == 2
+    assert index.exact('Sauvage Elixir') == -1
+
+def test_fuzzy_lookup():
+    """Test partial and misspelled names resolve by trigram similarity"""
+    index = NameIndex(NAMES)
+    # Substring matches rank first, closest name length first
+    assert [row for row, _ in index.fuzzy('blue')][:3] == [0, 5, 1]
+    assert index.lookup('Sauvage Elixir') == 3
+    assert index.lookup('Bleu de Chanell') == 4
+    assert index.lookup('Ligth Blu') == 0
+    assert index.lookup('Completely different') == -1
+    assert index.lookup('') == -1
@@ -0,0 +1,49 @@
+import pytest
+import numpy as np
+from scipy.sparse import csr_matrix
+from neighbor_store import (
+    NeighborStore, topk_from_csr, write_neighbor_store, HEADER_SIZE
+)
+
+def _similarity_matrix():
+    return csr_matrix(np.array([
+        [1.0, 0.5, 0.0, 0.3],
+        [0.5, 1.0, 0.2, 0.2],
+        [0.0, 0.2, 1.0, 0.0],
+        [0.3, 0.2, 0.0, 1.0],
+    ]))
+
+def test_topk_from_csr_excludes_self_and_orders_scores():
+    """Test neighbors are sorted best first, ties by lowest index, without the item itself"""
+    indices, scores = topk_from_csr(_similarity_matrix(), k=2)
+    assert indices.tolist() == [[1, 3], [0, 2], [1, -1], [0, 1]]
+    assert scores[0].tolist() == pytest.approx([0.5, 0.3])
+    assert scores[2, 1] == 0
+
+def test_neighbor_store_round_trip(tmp_path):
+    """Test a written store is memory-mapped back with the same contents"""
+    path = str(tmp_path / 'neighbors.bin')
+    indices, scores = topk_from_csr(_similarity_matrix(), k=3)
+    write_neighbor_store(path, indices, scores, score_dtype=np.float16)
+
+    store = NeighborStore.open(path)
+    assert isinstance(store.indices, np.memmap)
+    assert (store.n_items, store.k) == (4, 3)
+    assert np.array_equal(store.indices, indices)
+    assert store.scores.dtype == np.float16
+    assert store.neighbors(2, 3).tolist() == [1]
+    assert store.neighbors(1, 2).tolist() == [0, 2]
+
+def test_neighbor_store_rejects_bad_files(tmp_path):
+    """Test foreign and truncated files are refused"""
+    foreign = tmp_path / 'foreign.bin'
+    foreign.write_bytes(b'\0' * HEADER_SIZE)
+    with pytest.raises(ValueError):
+        NeighborStore.open(str(foreign))
+
+    path = tmp_path / 'truncated.bin'
+    indices, scores = topk_from_csr(_similarity_matrix(), k=2)
+    write_neighbor_store(str(path), indices, scores)
+    path.write_bytes(path.read_bytes()[:-4])
+    with pytest.raises(ValueError):
+        NeighborStore.open(str(path))
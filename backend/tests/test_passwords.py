@@ -0,0 +1,21 @@
+import pytest
+from passwords import PasswordHasher, PasswordHasherBusy
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_hash_verify_and_rehash(workers):
+    hasher = PasswordHasher(rounds=4, workers=workers)
+    hashed = hasher.hash('s3cret')
+    assert hasher.verify('s3cret', hashed)
+    assert not hasher.verify('wrong', hashed)
+    assert not hasher.needs_rehash(hashed)
+    assert PasswordHasher(rounds=5, workers=0).needs_rehash(hashed)
+    hasher.shutdown()
+
+def test_full_queue_rejects_immediately():
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=1)
+    hasher._slots.acquire()  # One hash already admitted
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash('s3cret')
+    hasher._slots.release()
+    assert hasher.verify('s3cret', hasher.hash('s3cret'))
+    hasher.shutdown()
@@ -0,0 +1,46 @@
+from flask import session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from auth import get_current_user
+
+def _statements(client, method, url, **kwargs):
+    """(response, SQL statements) of one request"""
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(Engine, 'before_cursor_execute', listener)
+    try:
+        response = getattr(client, method)(url, **kwargs)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', listener)
+    assert response.headers['X-SQL-Queries'] == str(len(statements))
+    return response, statements
+
+def test_id_only_endpoints_skip_users_table(auth_client, auth_user):
+    requests = [
+        ('get', '/api/recommendations/personalized', {}),
+        ('post', '/api/favourites', {'json': {'fragrance_id': 3}}),
+        ('get', '/api/favourites/check/3', {}),
+        ('get', '/api/favourites', {}),
+    ]
+    for method, url, kwargs in requests:
+        response, statements = _statements(auth_client, method, url, **kwargs)
+        assert response.status_code < 300
+        assert not [s for s in statements if 'FROM users' in s], url
+
+def test_cached_recommendation_page_runs_no_queries(auth_client, auth_user):
+    auth_client.get('/api/recommendations/personalized')
+    response, statements = _statements(auth_client, 'get', '/api/recommendations/personalized?page=2')
+    assert response.status_code == 200 and statements == []
+
+def test_current_user_loaded_once_per_request(app, auth_user):
+    with app.test_request_context():
+        session['user_id'] = auth_user.id
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(Engine, 'before_cursor_execute', listener)
+        try:
+            assert get_current_user().id == auth_user.id
+            assert get_current_user() is get_current_user()
+        finally:
+            event.remove(Engine, 'before_cursor_execute', listener)
+        assert len(statements) == 1
@@ -1,6 +1,8 @@
 import pytest
 import json
 from models import User, QuizResult, Favorite, db
+from sqlalchemy import text
+from catalog import get_catalog
 
 def test_recommendations_unauthorized(test_client):
     """Test getting recommendations without authentication"""
@@ -134,4 +136,141 @@ def test_recommendations_by_fragrance(auth_client, auth_user):
     assert response.status_code == 200
     data = json.loads(response.data)
     assert 'recommendations' in data
-    assert len(data['recommendations']) > 0 
\ No newline at end of file
+    assert len(data['recommendations']) > 0 
+
+def test_similar_indices_batch_matches_single_lookups():
+    """Test the batch neighbor lookup agrees with per-item lookups"""
+    from routes.recommendations import get_similar_indices, get_similar_indices_batch
+
+    seeds = [0, 1, 2]
+    batch = get_similar_indices_batch(seeds, top_n=5)
+    assert batch.shape == (3, 5)
+    for row, idx in zip(batch, seeds):
+        assert idx not in row
+        assert [int(i) for i in row if i >= 0] == get_similar_indices(idx, top_n=5)
+
+def test_similar_batch(test_client):
+    """Test similar fragrances for several names and IDs in one request"""
+    response = test_client.post('/api/recommendations/similar/batch', json={
+        'items': ['Light Blue', 0, 'Definitely Not A Real Fragrance'],
+        'top_n': 3
+    })
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert len(data['results']) == 3 and data['count'] == 2
+    assert data['results'][2] is None
+    assert data['not_found'] == ['Definitely Not A Real Fragrance']
+    assert len(data['results'][1]) == 3
+    assert all(rec['id'] != 0 for rec in data['results'][1])
+
+    # Same neighbors as the single-item endpoint
+    single = json.loads(test_client.get('/api/recommendations/similar?name=Light Blue').data)
+    batch = json.loads(test_client.post('/api/recommendations/similar/batch', json={
+        'items': ['Light Blue']
+    }).data)
+    assert [r['id'] for r in batch['results'][0]] == [r['id'] for r in single['recommendations']]
+
+def test_similar_batch_name_and_id_do_not_collide(test_client):
+    """A name that looks like an ID gets its own result next to that ID"""
+    data = test_client.post('/api/recommendations/similar/batch', json={'items': ['12', 12]}).get_json()
+    assert data['results'][0] is None and data['not_found'] == ['12']
+    assert data['results'][1]
+
+def test_similar_batch_invalid(test_client):
+    """Test the batch endpoint rejects malformed or oversized requests"""
+    assert test_client.post('/api/recommendations/similar/batch', json={}).status_code == 400
+    assert test_client.post('/api/recommendations/similar/batch', json={'items': [None]}).status_code == 400
+    response = test_client.post('/api/recommendations/similar/batch', json={'items': ['x'] * 51})
+    assert response.status_code == 400
+
+def test_similar_fuzzy_name(test_client):
+    """Test a misspelled name resolves to the same fragrance as the exact one"""
+    exact = json.loads(test_client.get('/api/recommendations/similar?name=Light Blue').data)
+    fuzzy = json.loads(test_client.get('/api/recommendations/similar?name=light blu').data)
+    assert [r['id'] for r in fuzzy['recommendations']] == [r['id'] for r in exact['recommendations']]
+
+def test_recommendation_pages_share_cached_ranking(auth_client, auth_user, monkeypatch):
+    """Later pages are slices of one ranking, computed once per user"""
+    from routes import recommendations
+    calls = []
+    score_user = recommendations._score_user
+    monkeypatch.setattr(recommendations, '_score_user',
+                        lambda *args: calls.append(args) or score_user(*args))
+
+    first = json.loads(auth_client.get('/api/recommendations/personalized?page=1&per_page=2').data)
+    second = json.loads(auth_client.get('/api/recommendations/personalized?page=2&per_page=2').data)
+    assert len(calls) == 1
+    full = json.loads(auth_client.get('/api/recommendations/personalized?page=1&per_page=4').data)
+    assert [r['Name'] for r in full['recommendations']] == \
+        [r['Name'] for r in first['recommendations'] + second['recommendations']]
+    assert len(calls) == 1
+
+def test_recommendations_invalidated_by_favourites_and_quiz(auth_client, auth_user):
+    """Adding a favourite or submitting the quiz replaces the cached ranking"""
+    from routes.recommendations import ranked_recommendations
+
+    def ranking():
+        # Served through the endpoint, then compared on the full cached ranking
+        assert auth_client.get('/api/recommendations/personalized').status_code == 200
+        with auth_client.application.app_context():
+            return list(ranked_recommendations(auth_user.id))
+
+    popular = ranking()
+    response = auth_client.post('/api/favourites', json={'fragrance_id': 1})
+    assert response.status_code == 201
+    from_favourite = ranking()
+    assert from_favourite != popular
+
+    auth_client.post('/api/quiz/start', json={'experience_level': 'Beginner'})
+    auth_client.post('/api/quiz/submit', json={'answers': {'vibe': 'Warm and cosy'}})
+    with_quiz = ranking()
+    assert with_quiz != from_favourite
+
+    favourite_id = response.get_json()['favorite_id']
+    assert auth_client.delete(f'/api/favourites/{favourite_id}').status_code == 200
+    assert ranking() != with_quiz
+
+def test_recommendations_expire_after_change_in_another_worker(auth_client, auth_user, monkeypatch):
+    """A favourite added by another process shows up once the cached ranking expires"""
+    import routes.recommendations as recommendations
+    from cache import LRUCache
+    now = [0.0]
+    monkeypatch.setattr(recommendations, '_ranked_cache', LRUCache(
+        recommendations.RANKED_CACHE_SIZE, ttl=recommendations.RANKED_CACHE_TTL, clock=lambda: now[0]))
+
+    with auth_client.application.app_context():
+        popular = list(recommendations.ranked_recommendations(auth_user.id))
+        # Another worker's write; this process is never told
+        with db.engine.begin() as connection:
+            connection.execute(text("INSERT INTO favorites (user_id, fragrance_id) VALUES (:user, 1)"),
+                               {'user': auth_user.id})
+        assert list(recommendations.ranked_recommendations(auth_user.id)) == popular
+        now[0] += recommendations.RANKED_CACHE_TTL
+        assert list(recommendations.ranked_recommendations(auth_user.id)) != popular
+
+def test_recommendations_cursor_pages_are_stable(auth_client, auth_user):
+    """Cursors walk one ranking snapshot, even after the user's favourites change"""
+    from routes.recommendations import ranked_recommendations
+    with auth_client.application.app_context():
+        expected = [int(row) for row in ranked_recommendations(auth_user.id)]
+
+    first = auth_client.get('/api/recommendations/personalized?per_page=2').get_json()
+    assert first['total'] == len(expected)
+    assert auth_client.post('/api/favourites', json={'fragrance_id': 1}).status_code == 201
+
+    names = [r['Name'] for r in first['recommendations']]
+    cursor = first['next_cursor']
+    while cursor:
+        data = auth_client.get(f'/api/recommendations/personalized?per_page=2&cursor={cursor}').get_json()
+        names.extend(r['Name'] for r in data['recommendations'])
+        cursor = data['next_cursor']
+    with auth_client.application.app_context():
+        assert names == list(get_catalog().frame['Name'].iloc[expected])
+
+def test_recommendations_invalid_cursor(auth_client, auth_user):
+    """Malformed cursors are rejected; unknown snapshots have expired"""
+    from cursors import encode_cursor
+    response = auth_client.get('/api/recommendations/personalized?cursor=not-a-cursor')
+    assert response.status_code == 400
+    response = auth_client.get(f"/api/recommendations/personalized?cursor={encode_cursor(['gone', 5])}")
+    assert response.status_code == 410
@@ -0,0 +1,45 @@
+import json
+import numpy as np
+import pandas as pd
+from search_bm25 import BM25Index, BLOCK_SIZE
+
+def _catalog(n_items):
+    rng = np.random.default_rng(0)
+    words = np.array(['citrus', 'vanilla', 'amber', 'rose', 'oud', 'musk', 'cedar', 'fresh', 'sweet', 'smoky'])
+    return pd.DataFrame({
+        'Name': [f"Scent {i}" for i in range(n_items)],
+        'Main Accords': [str(list(rng.choice(words, 2))) for _ in range(n_items)],
+        'Description': [' '.join(rng.choice(words, rng.integers(3, 12))) for _ in range(n_items)],
+    })
+
+def test_bm25_postings_roundtrip():
+    """Test block-compressed postings decode to the original doc ids"""
+    df = _catalog(3 * BLOCK_SIZE + 5)
+    index = BM25Index(df)
+    postings = index.postings['vanilla']
+    docs, tfs = postings.decode()
+    expected = np.flatnonzero(df['Description'].str.contains('vanilla') | df['Main Accords'].str.contains('vanilla'))
+    assert np.array_equal(docs, expected)
+    assert postings.gaps.dtype == np.uint8
+    blocks = np.array([1, 3])
+    partial, _ = postings.decode(blocks)
+    assert np.array_equal(partial, np.concatenate([docs[BLOCK_SIZE:2 * BLOCK_SIZE], docs[3 * BLOCK_SIZE:]]))
+
+def test_bm25_maxscore_matches_exhaustive():
+    """Test MaxScore pruning returns the same ranking as scoring every posting"""
+    index = BM25Index(_catalog(1000))
+    for query in ['vanilla', 'smoky oud', 'fresh citrus musk', 'rose amber cedar sweet', 'scent 42 rose']:
+        docs, scores = index.search(query, 10)
+        all_docs, all_scores = index.search(query, 10, exhaustive=True)
+        assert np.array_equal(docs, all_docs)
+        assert np.allclose(scores, all_scores)
+        assert np.all(np.diff(scores) <= 0)
+    assert len(index.search('unknownword', 10)[0]) == 0
+
+def test_search_bm25_backend(app, test_client):
+    """Test the search endpoint with the BM25 backend enabled"""
+    app.config['SEARCH_BACKEND'] = 'bm25'
+    response = test_client.get('/api/search?query=citrus')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert len(data['results']) <= 5
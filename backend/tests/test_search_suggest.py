@@ -0,0 +1,33 @@
+import json
+from search_suggest import PrefixIndex
+
+ENTRIES = [
+    ('Light Blue', 'fragrance', 900, ['light blue', 'blue']),
+    ('Blue Seduction', 'fragrance', 300, ['blue seduction', 'seduction']),
+    ('Bleu de Chanel', 'fragrance', 1200, ['bleu de chanel', 'de chanel', 'chanel']),
+    ('Chanel', 'brand', 2000, ['chanel']),
+    ('citrus', 'accord', 5000, ['citrus']),
+]
+
+def test_prefix_index_ranks_by_weight():
+    """Test suggestions match any word start and come back most popular first"""
+    index = PrefixIndex(ENTRIES)
+    assert [s['text'] for s in index.suggest('bl')] == ['Bleu de Chanel', 'Light Blue', 'Blue Seduction']
+    assert [s['text'] for s in index.suggest('BLUE ')] == ['Light Blue', 'Blue Seduction']
+    assert [s['text'] for s in index.suggest('ch', limit=1)] == ['Chanel']
+    assert index.suggest('ch')[1] == {'text': 'Bleu de Chanel', 'type': 'fragrance'}
+    assert index.suggest('zz') == []
+    assert index.suggest('') == []
+
+def test_suggest_endpoint(test_client):
+    """Test the typeahead endpoint returns typed suggestions for a prefix"""
+    response = test_client.get('/api/search/suggest?prefix=Light Bl&limit=3')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['prefix'] == 'Light Bl'
+    assert 1 <= len(data['suggestions']) <= 3
+    assert all(s['text'].lower().startswith('light bl') or ' light bl' in s['text'].lower()
+               for s in data['suggestions'])
+
+    response = test_client.get('/api/search/suggest')
+    assert json.loads(response.data)['suggestions'] == []
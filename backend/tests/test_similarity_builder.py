@@ -0,0 +1,175 @@
+import gzip
+import os
+import pickle
+import pytest
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+import sys
+import optimize_cosine_sim
+from optimize_cosine_sim import build_similarity_matrix, update_incrementally, UPDATED, REBUILD, REFIT
+from search_index import SearchIndex
+from benchmarks.synthetic import synthetic_catalog
+from neighbor_store import topk_from_csr, write_neighbor_store, NeighborStore, NEIGHBOR_STORE_FILENAME
+from incremental_similarity import (SimilarityState, changed_rows, count_oov, replace_rows, row_hashes,
+                                    update_neighbors, DRIFT_THRESHOLD, SIMILARITY_STATE_FILENAME,
+                                    SIMILARITY_VECTORIZER_FILENAME)
+
+DESCRIPTIONS = [
+    "fresh citrus bergamot lemon summer",
+    "warm vanilla amber tonka winter",
+    "fresh aquatic marine citrus",
+    "woody cedar vetiver smoky",
+    "sweet vanilla caramel gourmand amber",
+    "floral rose jasmine powdery",
+    "fresh green citrus grass",
+    "spicy pepper woody leather",
+    "rose oud woody amber",
+    "clean musk powdery soft",
+]
+
+def _tfidf():
+    return TfidfVectorizer().fit_transform(DESCRIPTIONS)
+
+def _reference(X, threshold=0.1):
+    """Full matrix followed by thresholding, as the pipeline did before blocking"""
+    sim = csr_matrix(cosine_similarity(X, dense_output=False), copy=True)
+    sim.data[sim.data <= threshold] = 0
+    sim.eliminate_zeros()
+    sim.sort_indices()
+    return sim
+
+@pytest.mark.parametrize('block_size', [1, 3, 100])
+def test_blocked_matrix_matches_full_pipeline(block_size):
+    """Test keeping every neighbor reproduces the unblocked thresholded matrix"""
+    X = _tfidf()
+    blocked = build_similarity_matrix(X, block_size=block_size)
+    blocked.sort_indices()
+    assert (blocked != _reference(X)).nnz == 0
+
+@pytest.mark.parametrize('block_size', [2, 100])
+def test_blocked_topk_matches_full_pipeline(block_size):
+    """Test top-k rows hold the same best neighbors as the full matrix"""
+    X = _tfidf()
+    blocked = build_similarity_matrix(X, top_k=2, block_size=block_size)
+    assert np.diff(blocked.indptr).max() <= 3  # two neighbors plus the item itself
+
+    got_indices, got_scores = topk_from_csr(blocked, 2)
+    want_indices, want_scores = topk_from_csr(_reference(X), 2)
+    assert np.array_equal(got_indices, want_indices)
+    assert np.allclose(got_scores, want_scores)
+
+def test_blocked_topk_process_pool():
+    """Test the process pool produces the same matrix as the serial path"""
+    X = _tfidf()
+    serial = build_similarity_matrix(X, top_k=3, block_size=4)
+    pooled = build_similarity_matrix(X, top_k=3, block_size=4, n_jobs=2)
+    assert (serial != pooled).nnz == 0
+
+def _neighbors(X, k):
+    return topk_from_csr(build_similarity_matrix(X, top_k=k), k)
+
+@pytest.mark.parametrize('k', [2, 4])
+def test_incremental_update_matches_full_rebuild(k):
+    """Test patching neighbor lists for changed and appended rows gives the rebuilt lists"""
+    vectorizer = TfidfVectorizer().fit(DESCRIPTIONS)
+    X = normalize(vectorizer.transform(DESCRIPTIONS[:8]))
+    indices, scores = _neighbors(X, k)
+
+    edited = list(DESCRIPTIONS)
+    edited[0] = "warm vanilla amber tonka woody"  # was a fresh citrus
+    edited[5] = "floral rose jasmine powdery musk"
+    rows = [0, 5, 8, 9]
+    X_new, got_indices, got_scores, stats = update_neighbors(
+        X, indices, scores, rows, vectorizer.transform([edited[row] for row in rows]), 0.1, block_size=3)
+
+    want_indices, want_scores = _neighbors(vectorizer.transform(edited), k)
+    assert np.array_equal(got_indices, want_indices)
+    assert np.allclose(got_scores, want_scores)
+    assert X_new.shape[0] == len(edited)
+    assert stats['changed'] == 4
+
+def test_replace_rows_rejects_gaps():
+    """Test appended rows must follow the existing ones"""
+    X = csr_matrix(np.eye(3))
+    with pytest.raises(ValueError):
+        replace_rows(X, np.array([4]), csr_matrix(np.ones((1, 3))))
+
+def _write_build(vectorizer, text_data, k=3):
+    """What a full optimize_cosine_sim.py run leaves behind, in the current directory"""
+    with open('vectorizer.pkl', 'wb') as f:
+        pickle.dump(vectorizer, f)
+    X = vectorizer.transform(text_data)
+    write_neighbor_store(NEIGHBOR_STORE_FILENAME, *_neighbors(X, k))
+    SimilarityState(normalize(X), row_hashes(text_data), 0.1, *count_oov(vectorizer, text_data)).save(
+        SIMILARITY_STATE_FILENAME)
+
+def test_update_incrementally_patches_store(tmp_path, monkeypatch):
+    """Test an incremental run rewrites the store and state for new and changed rows only"""
+    monkeypatch.chdir(tmp_path)
+    vectorizer = TfidfVectorizer().fit(DESCRIPTIONS)
+    _write_build(vectorizer, pd.Series(DESCRIPTIONS[:9]))
+
+    edited = pd.Series(DESCRIPTIONS[:9] + ["rose musk powdery"])
+    edited[3] = "woody cedar leather smoky"
+    assert changed_rows(SimilarityState.load(SIMILARITY_STATE_FILENAME), row_hashes(edited)).tolist() == [3, 9]
+    assert update_incrementally(edited) == UPDATED
+
+    store = NeighborStore.open(NEIGHBOR_STORE_FILENAME)
+    want_indices, _ = _neighbors(vectorizer.transform(edited), 3)
+    assert np.array_equal(store.indices, want_indices)
+    state = SimilarityState.load(SIMILARITY_STATE_FILENAME)
+    assert state.n_items == 10 and len(changed_rows(state, row_hashes(edited))) == 0
+    with gzip.open('cosine_sim.pkl.gz', 'rb') as f:
+        assert pickle.load(f).shape == (10, 10)
+
+def test_update_incrementally_asks_for_rebuild_on_drift(tmp_path, monkeypatch):
+    """Test mostly unseen vocabulary makes the incremental run give up for a full rebuild"""
+    monkeypatch.chdir(tmp_path)
+    vectorizer = TfidfVectorizer().fit(DESCRIPTIONS)
+    _write_build(vectorizer, pd.Series(DESCRIPTIONS))
+
+    edited = pd.Series(DESCRIPTIONS + ["saffron oud incense labdanum myrrh"])
+    state = SimilarityState.load(SIMILARITY_STATE_FILENAME)
+    assert state.drift(*count_oov(vectorizer, edited[10:])) > DRIFT_THRESHOLD
+    assert update_incrementally(edited) == REFIT
+    assert NeighborStore.open(NEIGHBOR_STORE_FILENAME).n_items == 10
+
+def test_update_incrementally_needs_previous_build(tmp_path, monkeypatch):
+    """Test there is nothing to patch without a previous full build"""
+    monkeypatch.chdir(tmp_path)
+    assert update_incrementally(pd.Series(DESCRIPTIONS)) == REBUILD
+
+def _run_builder(monkeypatch, *args):
+    monkeypatch.setattr(sys, 'argv', ['optimize_cosine_sim.py', '--top-k', '3', *args])
+    optimize_cosine_sim.main()
+
+@pytest.mark.parametrize('drift', [False, True])
+def test_incremental_fallback_keeps_search_vectorizer(tmp_path, monkeypatch, drift):
+    """Test a fallback rebuild never replaces the vectorizer the search matrix was built with"""
+    monkeypatch.chdir(tmp_path)
+    df = synthetic_catalog(30, description_words=6)
+    df.to_csv('perfume_data_clean.csv', index=False)
+    text_data = df['Description'] + " " + df['Main Accords']
+    vectorizer = TfidfVectorizer(stop_words='english', max_features=5000).fit(text_data)
+    with open('vectorizer.pkl', 'wb') as f:
+        pickle.dump(vectorizer, f)
+    with open('tfidf_matrix_search.pkl', 'wb') as f:
+        pickle.dump(vectorizer.transform(text_data), f)
+
+    if drift:
+        _run_builder(monkeypatch)
+        extra = df.iloc[:1].copy()
+        extra['Description'] = 'saffron labdanum myrrh incense frankincense styrax'
+        pd.concat([df, extra]).to_csv('perfume_data_clean.csv', index=False)
+    _run_builder(monkeypatch, '--incremental')
+
+    with open('vectorizer.pkl', 'rb') as f:
+        assert pickle.load(f).vocabulary_ == vectorizer.vocabulary_
+    assert os.path.exists(SIMILARITY_VECTORIZER_FILENAME) == drift
+    index = SearchIndex.load(str(tmp_path))
+    assert len(index.top_matches(df['Main Accords'][0], top_n=3)) == 3
+    assert NeighborStore.open(NEIGHBOR_STORE_FILENAME).n_items == len(index.df)
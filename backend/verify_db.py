@@ -1,7 +1,6 @@
 from main import create_app
 from models import db, Fragrance
-import pandas as pd
-import os
+from db_setup import populate_fragrances
 from sqlalchemy import inspect
 
 def verify_database():
@@ -23,29 +22,7 @@ def verify_database():
         
         if fragrance_count == 0:
             # Load and populate fragrances
-            csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perfume_data_clean.csv')
-            if os.path.exists(csv_path):
-                print("Loading fragrance data from CSV...")
-                df = pd.read_csv(csv_path)
-                
-                for _, row in df.iterrows():
-                    fragrance = Fragrance(
-                        name=row['Name'],
-                        brand=row['Brand'] if 'Brand' in row else row['Name'].split(' ')[0],
-                        gender=row.get('Gender', None),
-                        rating_value=row.get('Rating Value', None),
-                        rating_count=row.get('Rating Count', None),
-                        main_accords=str(row.get('Main Accords', '')),
-                        perfumers=str(row.get('Perfumers', '')),
-                        description=row.get('Description', ''),
-                        url=row.get('url', '')
-                    )
-                    db.session.add(fragrance)
-                
-                db.session.commit()
-                print(f"Imported {len(df)} fragrances into the database.")
-            else:
-                print(f"Warning: {csv_path} not found!")
+            populate_fragrances(app)
         
         # Verify fragrance data
         sample_fragrance = Fragrance.query.first()
@@ -111,10 +111,16 @@ export const getLoggedInUser = async () => {
   }
 };
 
-// Fragrance requests
-export const getAllFragrances = async (page = 1, limit = 20) => {
+// Fields shown on the fragrance and recommendation cards; the rest is left out of list pages
+const FRAGRANCE_CARD_FIELDS = 'name,brand,rating_value,rating_count,description';
+const RECOMMENDATION_CARD_FIELDS = 'name,rating_value,rating_count,main_accords,description';
+
+// Fragrance requests; pass the previous response's next_cursor for the next page
+export const getAllFragrances = async (cursor = null, limit = 20) => {
   try {
-    const response = await api.get(`/api/fragrances?page=${page}&limit=${limit}`);
+    const params = { limit, fields: FRAGRANCE_CARD_FIELDS };
+    if (cursor) params.cursor = cursor;
+    const response = await api.get('/api/fragrances', { params });
     return response.data;
   } catch (error) {
     handleError(error);
@@ -130,6 +136,15 @@ export const searchFragrances = async (query) => {
   }
 };
 
+export const getSearchSuggestions = async (prefix, limit = 8) => {
+  try {
+    const response = await api.get(`/api/search/suggest?prefix=${encodeURIComponent(prefix)}&limit=${limit}`);
+    return response.data;
+  } catch (error) {
+    handleError(error);
+  }
+};
+
 export const getFragrance = async (id) => {
   try {
     const response = await api.get(`/api/fragrances/${id}`);
@@ -165,14 +180,17 @@ export const getQuizResults = async () => {
   }
 };
 
-// Get personalized recommendations (with pagination)
-export const getRecommendations = async (page = 1, perPage = 6) => {
+// Get personalized recommendations, one page at a time; pass the previous
+// response's next_cursor to continue the same ranking
+export const getRecommendations = async (cursor = null, perPage = 6) => {
   try {
-    const response = await api.get(`/api/recommendations/personalized?page=${page}&per_page=${perPage}`);
+    const params = { per_page: perPage, fields: RECOMMENDATION_CARD_FIELDS };
+    if (cursor) params.cursor = cursor;
+    const response = await api.get('/api/recommendations/personalized', { params });
     return response.data;
   } catch (error) {
     console.error("Error fetching recommendations:", error);
-    return { recommendations: [], count: 0, page: 1 };
+    return { recommendations: [], count: 0, next_cursor: null };
   }
 };
 
@@ -227,4 +245,15 @@ export const getSimilarFragrances = async (fragranceName) => {
     console.error("Error fetching similar fragrances:", error);
     return [];
   }
-};
\ No newline at end of file
+};
+
+// Similar fragrances for several names or IDs in one round trip, in input order (null when not found)
+export const getSimilarFragrancesBatch = async (items, topN = 5) => {
+  try {
+    const response = await api.post('/api/recommendations/similar/batch', { items, top_n: topN });
+    return response.data.results || [];
+  } catch (error) {
+    console.error("Error fetching similar fragrances:", error);
+    return [];
+  }
+};
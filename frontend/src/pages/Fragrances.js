@@ -6,20 +6,21 @@ const Fragrances = () => {
   const [fragrances, setFragrances] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
-  const [page, setPage] = useState(1);
+  const [nextCursor, setNextCursor] = useState(null);
   const [hasMore, setHasMore] = useState(true);
 
   useEffect(() => {
     fetchFragrances();
-  }, [page]);
+  }, []);
 
-  const fetchFragrances = async () => {
+  const fetchFragrances = async (cursor = null) => {
     try {
       setLoading(true);
-      const data = await getAllFragrances(page);
+      const data = await getAllFragrances(cursor);
       if (data?.fragrances) {
         setFragrances(prev => [...prev, ...data.fragrances]);
-        setHasMore(data.fragrances.length === 20);
+        setNextCursor(data.next_cursor);
+        setHasMore(Boolean(data.next_cursor));
       } else {
         setHasMore(false);
       }
@@ -30,7 +31,7 @@ const Fragrances = () => {
     }
   };
 
-  const loadMore = () => setPage(prev => prev + 1);
+  const loadMore = () => fetchFragrances(nextCursor);
 
   const safeDescription = (desc) =>
     (desc || '').replace(/([a-z])([A-Z])/g, '$1 $2').substring(0, 150);
@@ -68,7 +69,7 @@ const Fragrances = () => {
     }
   };
 
-  if (loading && page === 1) return <div className="text-center py-5">Loading...</div>;
+  if (loading && fragrances.length === 0) return <div className="text-center py-5">Loading...</div>;
   if (error) return <div className="alert alert-danger py-5">{error}</div>;
 
   return (
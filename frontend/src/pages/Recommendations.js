@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef, useCallback } from 'react';
 import { useLocation, useNavigate } from 'react-router-dom';
 import {
   Container,
@@ -13,7 +13,6 @@ import {
   Rating,
   Alert,
   Divider,
-  Pagination,
   CircularProgress
 } from '@mui/material';
 import { Star, StarBorder } from '@mui/icons-material';
@@ -24,69 +23,71 @@ const Recommendations = () => {
   const navigate = useNavigate();
   const { quizAnswers, recommendations: initialRecommendations, error: initialError } = location.state || {};
   
-  const [recommendations, setRecommendations] = useState(initialRecommendations || []);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(initialError || '');
-  const [page, setPage] = useState(1);
-  const [totalPages, setTotalPages] = useState(1);
   const [displayedRecs, setDisplayedRecs] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const sentinelRef = useRef(null);
   
-  // Number of recommendations to display per page
+  // Number of recommendations loaded per scroll step
   const itemsPerPage = 6;
+  const hasInitial = initialRecommendations?.length > 0;
+  const hasMore = hasInitial
+    ? displayedRecs.length < initialRecommendations.length
+    : Boolean(nextCursor);
   
   useEffect(() => {
-    // If we have recommendations from quiz, paginate them client-side
-    if (initialRecommendations?.length > 0) {
-      const totalPgs = Math.ceil(initialRecommendations.length / itemsPerPage);
-      setTotalPages(totalPgs || 1);
-      
-      // Initial display
-      updateDisplayedRecommendations(initialRecommendations, 1);
+    // If we have recommendations from quiz, reveal them client-side
+    if (hasInitial) {
+      setDisplayedRecs(initialRecommendations.slice(0, itemsPerPage));
     } else {
-      // Otherwise fetch recommendations from API
+      // Otherwise fetch the first page of the ranking from the API
       fetchRecommendations();
     }
   }, []);
   
-  const updateDisplayedRecommendations = (allRecs, currentPage) => {
-    const startIndex = (currentPage - 1) * itemsPerPage;
-    const endIndex = startIndex + itemsPerPage;
-    setDisplayedRecs(allRecs.slice(startIndex, endIndex));
-  };
-  
-  const handlePageChange = async (event, newPage) => {
-    setPage(newPage);
-    
-    if (initialRecommendations?.length > 0) {
-      // Client-side pagination if we have all recommendations
-      updateDisplayedRecommendations(initialRecommendations, newPage);
+  const fetchRecommendations = async (cursor = null) => {
+    if (cursor) {
+      setLoadingMore(true);
     } else {
-      // Server-side pagination
-      await fetchRecommendations(newPage);
+      setLoading(true);
     }
-    
-    // Scroll to top of recommendations
-    window.scrollTo({
-      top: document.getElementById('recommendations-top').offsetTop - 20,
-      behavior: 'smooth'
-    });
-  };
-  
-  const fetchRecommendations = async (pageNum = 1) => {
-    setLoading(true);
     try {
-      const response = await getRecommendations(pageNum, itemsPerPage);
-      setRecommendations(response.recommendations || []);
-      setDisplayedRecs(response.recommendations || []);
-      setTotalPages(Math.ceil(response.count / itemsPerPage) || 1);
+      // Each cursor continues the same ranking, so pages never repeat or skip items
+      const response = await getRecommendations(cursor, itemsPerPage);
+      const page = response.recommendations || [];
+      setDisplayedRecs((previous) => (cursor ? [...previous, ...page] : page));
+      setNextCursor(response.next_cursor || null);
       setError('');
     } catch (err) {
       console.error("Error fetching recommendations:", err);
       setError('Failed to load recommendations. Please try again later.');
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
+  
+  const loadMore = useCallback(() => {
+    if (loading || loadingMore || !hasMore) return;
+    if (hasInitial) {
+      setDisplayedRecs(initialRecommendations.slice(0, displayedRecs.length + itemsPerPage));
+    } else {
+      fetchRecommendations(nextCursor);
+    }
+  }, [loading, loadingMore, hasMore, hasInitial, displayedRecs.length, nextCursor]);
+  
+  // Load the next page when the sentinel below the grid scrolls into view
+  useEffect(() => {
+    const sentinel = sentinelRef.current;
+    if (!sentinel || !hasMore) return undefined;
+    const observer = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting) loadMore();
+    }, { rootMargin: '200px' });
+    observer.observe(sentinel);
+    return () => observer.disconnect();
+  }, [loadMore, hasMore]);
 
   const formatAccords = (accords) => {
     if (!accords) return [];
@@ -279,27 +280,10 @@ const Recommendations = () => {
             ))}
           </Grid>
           
-          {/* Pagination */}
-          {totalPages > 1 && (
-            <Box sx={{ display: 'flex', justifyContent: 'center', mt: 4 }}>
-              <Pagination 
-                count={totalPages} 
-                page={page} 
-                onChange={handlePageChange} 
-                variant="outlined" 
-                shape="rounded"
-                sx={{
-                  '& .MuiPaginationItem-root': {
-                    color: '#FFD700',
-                    borderColor: '#444',
-                  },
-                  '& .Mui-selected': {
-                    backgroundColor: 'rgba(255, 215, 0, 0.2) !important',
-                  }
-                }}
-              />
-            </Box>
-          )}
+          {/* Infinite scroll */}
+          <Box ref={sentinelRef} sx={{ display: 'flex', justifyContent: 'center', mt: 4, minHeight: 40 }}>
+            {loadingMore && <CircularProgress size={28} sx={{ color: '#FFD700' }} />}
+          </Box>
         </>
       ) : (
         <Box
@@ -1,10 +1,11 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { searchFragrances } from '../api/requests';
+import { searchFragrances, getSearchSuggestions } from '../api/requests';
 import {
   Container,
   Typography,
   TextField,
+  Autocomplete,
   Button,
   CircularProgress,
   Grid,
@@ -46,11 +47,29 @@ const SearchPage = () => {
   const [results, setResults] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  const [suggestions, setSuggestions] = useState([]);
   const navigate = useNavigate();
 
-  const handleSearch = async (e) => {
-    e.preventDefault();
-    if (!query.trim()) {
+  // Typeahead: ask the prefix index once typing pauses, never the full search
+  useEffect(() => {
+    const prefix = query.trim();
+    if (prefix.length < 2) {
+      setSuggestions([]);
+      return;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        const data = await getSearchSuggestions(prefix);
+        setSuggestions(data?.suggestions || []);
+      } catch (err) {
+        setSuggestions([]);
+      }
+    }, 150);
+    return () => clearTimeout(timer);
+  }, [query]);
+
+  const runSearch = async (term) => {
+    if (!term.trim()) {
       setError('Please enter a search term');
       return;
     }
@@ -60,9 +79,9 @@ const SearchPage = () => {
     setResults([]);
     
     try {
-      const { results: data } = await searchFragrances(query);
+      const { results: data } = await searchFragrances(term);
       if (!data || data.length === 0) {
-        setError(`No fragrances found matching "${query}"`);
+        setError(`No fragrances found matching "${term}"`);
       }
       setResults(data || []);
     } catch (err) {
@@ -73,6 +92,11 @@ const SearchPage = () => {
     }
   };
 
+  const handleSearch = (e) => {
+    e.preventDefault();
+    runSearch(query);
+  };
+
   const handleFragranceClick = (fragranceId) => {
     navigate(`/fragrance/${fragranceId}`);
   };
@@ -100,20 +124,36 @@ const SearchPage = () => {
           <form onSubmit={handleSearch}>
             <Grid container spacing={2} alignItems="center">
               <Grid item xs={12} md={9}>
-                <TextField
-                  fullWidth
-                  variant="outlined"
-                  placeholder="Search fragrances..."
-                  value={query}
-                  onChange={(e) => {
-                    setQuery(e.target.value);
+                <Autocomplete
+                  freeSolo
+                  options={suggestions}
+                  getOptionLabel={(option) => (typeof option === 'string' ? option : option.text)}
+                  filterOptions={(options) => options}
+                  inputValue={query}
+                  onInputChange={(e, value) => {
+                    setQuery(value);
                     setError(null);
                   }}
-                  error={!!error}
-                  helperText={error}
-                  InputProps={{
-                    style: { backgroundColor: 'white', borderRadius: '4px' }
+                  onChange={(e, option) => {
+                    if (option && typeof option !== 'string') {
+                      setQuery(option.text);
+                      runSearch(option.text);
+                    }
                   }}
+                  renderInput={(params) => (
+                    <TextField
+                      {...params}
+                      fullWidth
+                      variant="outlined"
+                      placeholder="Search fragrances..."
+                      error={!!error}
+                      helperText={error}
+                      InputProps={{
+                        ...params.InputProps,
+                        style: { backgroundColor: 'white', borderRadius: '4px' }
+                      }}
+                    />
+                  )}
                 />
               </Grid>
               <Grid item xs={12} md={3}>